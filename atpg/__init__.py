@@ -1,13 +1,75 @@
 from .atpg import ATPG, Objective, Fault, SequentialATPG
 from .parser import Parser
-from .utils import GIN, ERR, TST
+from .cache import NetlistCache
+from .netlist import Netlist, GateType
+from . import logic
+from .simulator import BitParallelSimulator, NumpySimulator
+from .seqsim import SequentialSimulator
+from .codegen import compile_netlist, generate_source
+from .implication import ImplicationEngine
+from .reachability import ReachabilityIndex
+from .scoap import Scoap, compute_scoap
+from .faults import generate_faults, fault_universe
+from .faultsim import PPSFPSimulator, ConcurrentFaultSimulator, FaultSimResult
+from .parallel import ParallelATPG, ATPGResult
+from .metrics import ATPGMetrics, FaultMetrics
+from .flow import ATPGFlow, random_phase
+from .scan import FullScanATPG, ScanPattern
+from .timeframe import TimeFrameATPG
+from .compaction import (
+    dynamic_compaction,
+    merge_cubes,
+    reverse_order_compaction,
+    compact_result,
+)
+from .batch import read_vectors, simulate_vectors, simulate_file
+from .vcd import VcdWriter, select_signals
+from .utils import configure_logging, get_logger, GIN, ERR, TST
 
 __all__ = [
     "ATPG",
     "Parser",
+    "NetlistCache",
+    "Netlist",
+    "GateType",
+    "logic",
+    "ImplicationEngine",
+    "ReachabilityIndex",
+    "Scoap",
+    "compute_scoap",
+    "BitParallelSimulator",
+    "NumpySimulator",
+    "SequentialSimulator",
+    "compile_netlist",
+    "generate_source",
+    "PPSFPSimulator",
+    "ConcurrentFaultSimulator",
+    "FaultSimResult",
+    "generate_faults",
+    "fault_universe",
     "Objective",
     "Fault",
     "SequentialATPG",
+    "ParallelATPG",
+    "ATPGResult",
+    "ATPGMetrics",
+    "FaultMetrics",
+    "ATPGFlow",
+    "random_phase",
+    "FullScanATPG",
+    "ScanPattern",
+    "TimeFrameATPG",
+    "dynamic_compaction",
+    "merge_cubes",
+    "reverse_order_compaction",
+    "compact_result",
+    "read_vectors",
+    "simulate_vectors",
+    "simulate_file",
+    "VcdWriter",
+    "select_signals",
+    "configure_logging",
+    "get_logger",
     "GIN",
     "ERR",
     "TST",
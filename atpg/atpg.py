@@ -1,3 +1,4 @@
+import logging
 import re
 import time
 import sys
@@ -10,10 +11,15 @@ import textwrap
 
 
 from atpg.parser import Parser
-from atpg.utils import GIN, ERR, TST
+from atpg.netlist import Netlist, GateType
+from atpg.implication import ImplicationEngine
+from atpg.metrics import ATPGMetrics, FaultMetrics
+from atpg.reachability import ReachabilityIndex
+from atpg.scoap import compute_scoap
+from atpg.logic import X, D
+from atpg.utils import get_logger, GIN, ERR, TST
 
-
-inversion = {"D": "~D", "~D": "D", "x": "x"}
+log = get_logger("atpg")
 
 
 class Objective:
@@ -24,9 +30,38 @@ class Objective:
 
 
 class Fault:
-    def __init__(self, gate_no, error):
+    """
+    A single stuck-at fault.
+
+    Attributes:
+        gate_no (str): The faulty wire.
+        error (str): "D" for stuck-at-0 (good 1 / faulty 0), "~D" for stuck-at-1.
+        branch: Gate number of the reading gate for a fanout-branch fault, or
+            None for a fault on the wire stem.
+    """
+
+    def __init__(self, gate_no, error, branch=None):
         self.gate_no = gate_no
         self.error = error
+        self.branch = branch
+
+    @property
+    def stuck_at(self):
+        """The stuck value, 0 or 1."""
+        return 0 if self.error == "D" else 1
+
+    def _key(self):
+        return (self.gate_no, self.error, self.branch)
+
+    def __eq__(self, other):
+        return isinstance(other, Fault) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        site = self.gate_no if self.branch is None else f"{self.gate_no}->{self.branch}"
+        return f"Fault({site} s-a-{self.stuck_at})"
 
 
 class ATPG:
@@ -40,6 +75,14 @@ class ATPG:
         wires_map (dict): Maps wires to circuit connections.
         PI (list): Primary inputs.
         PO (list): Primary outputs.
+        netlist (Netlist): Compiled integer-indexed view of the same circuit.
+        engine (ImplicationEngine): Incremental implication state used by the search.
+        reach (ReachabilityIndex): PI support and PO reachability of every wire.
+        scoap (Scoap): SCOAP measures guiding the backtrace and D-frontier choice.
+        backtrack_limit (int): Backtracks allowed per propagation search.
+        aborted (bool): True when the last generate_test hit backtrack_limit.
+        metrics (ATPGMetrics): Search statistics of every try_sensitize and
+            try_propagate_to_pos call since enable_metrics, or None.
 
     Methods:
         get_objective: Determines the fault detection objective for a gate.
@@ -58,20 +101,121 @@ class ATPG:
         primary_inputs,
         primary_outputs,
         state_vars,
+        netlist=None,
     ):
         self.gate_level_map = gate_level_map
         self.gates_map = gates_map
         self.wires_map = wires_map
-        self.wires_val = {}
+        if netlist is None:
+            netlist = Netlist.from_maps(
+                gates_map, wires_map, primary_inputs, primary_outputs
+            )
+        self.netlist = netlist
         self.objective = {}
 
         self.PI = primary_inputs
         self.PO = primary_outputs
         self.max_levels = max([i for i in self.gate_level_map])
         self.state_vars = state_vars
+        self.engine = ImplicationEngine(netlist, state_vars)
+        self.reach = ReachabilityIndex(netlist)
+        self.scoap = compute_scoap(netlist)
+        self._pi_ids = set(netlist.pis)
+        self.backtrack_limit = 1000
+        self.aborted = False
+        self._backtracks = 0
+        self.metrics = None
+        self._record = None
+        self._record_start = None
+
+    @classmethod
+    def from_netlist(cls, netlist, state_vars=None):
+        """
+        Build an ATPG instance from a compiled Netlist alone, rebuilding the
+        gates, wires and level maps from it. Used where only the compact
+        netlist is shipped, e.g. to worker processes.
+        """
+        gates_map = {}
+        wires_map = {name: {} for name in netlist.wire_names}
+        gate_level_map = defaultdict(list)
+        for g in netlist.order:
+            gate_no = netlist.gate_nos[g]
+            out = netlist.gate_output[g]
+            inputs = [netlist.wire_names[w] for w in netlist.fanin_of(g)]
+            outputs = [netlist.wire_names[out]] if out >= 0 else []
+            gates_map[gate_no] = {
+                "gate_type": GateType(netlist.gate_type[g]).name,
+                "inputs": inputs,
+                "outputs": outputs,
+            }
+            for wire in inputs:
+                wires_map[wire][str(gate_no)] = "input"
+            for wire in outputs:
+                wires_map[wire][str(gate_no)] = "output"
+            gate_level_map[netlist.level[g]].append(gate_no)
+
+        return cls(
+            dict(gate_level_map),
+            gates_map,
+            wires_map,
+            [netlist.wire_names[w] for w in netlist.pis],
+            [netlist.wire_names[w] for w in netlist.pos],
+            state_vars or {},
+            netlist=netlist,
+        )
 
-        for wire in self.wires_map:
-            self.wires_val[wire] = "x"
+    def enable_metrics(self):
+        """
+        Record search statistics from now on (see atpg.metrics).
+
+        Returns:
+            ATPGMetrics: The collection the records are added to.
+        """
+        self.metrics = ATPGMetrics()
+        return self.metrics
+
+    def _open_record(self, fault):
+        """Start recording a search, unless metrics are off or one is open."""
+        if self.metrics is None or self._record is not None:
+            return False
+        self._record = FaultMetrics(fault)
+        self._record_start = (time.perf_counter(), self.engine.evaluations)
+        return True
+
+    def _close_record(self, status, abort_reason=None):
+        record = self._record
+        start, evaluations = self._record_start
+        record.status = status
+        record.abort_reason = abort_reason
+        record.evaluations = self.engine.evaluations - evaluations
+        record.times["total"] = time.perf_counter() - start
+        self.metrics.add(record)
+        self._record = None
+
+    def _timed(self, phase, function, *args):
+        """Call function, adding its run time to phase of the open record."""
+        record = self._record
+        if record is None:
+            return function(*args)
+        start = time.perf_counter()
+        result = function(*args)
+        record.times[phase] += time.perf_counter() - start
+        return result
+
+    def _decide(self, wire, value):
+        """Assign a primary input as a search decision and imply it."""
+        record = self._record
+        if record is None:
+            self.engine.assign(wire, value)
+            return
+        start = time.perf_counter()
+        record.implications += self.engine.assign(wire, value)
+        record.times["implication"] += time.perf_counter() - start
+        record.decisions += 1
+
+    def _dead_end(self, cause):
+        if self._record is not None:
+            self._record.dead_ends[cause] += 1
 
     def get_objective(self, gate_no, error):
         """Returns the objective for the gate"""
@@ -90,49 +234,21 @@ class ATPG:
         Returns:
             List of primary input (PI) gates connected to the given location (Objective Gate_No)
         """
-        cs_gates = []
-        primary_gates = []
-        for pi in self.PI:
-            for gate in self.wires_map[pi]:
-                if self.wires_map[pi][gate] == "input":
-                    primary_gates.append(int(gate))
-
-        # print("[INFO]: backtrace: PI Gates: ", primary_gates)
+        net = self.netlist
+        values = self.engine.values
+        support = self.reach.pi_support[net.wire_id(objective.Gate_No)]
+
         primary_inputs = []
-        l = objective.Gate_No
-        for gate in self.wires_map[l]:
-            if self.wires_map[l][gate] == "output":
-                cs_gates.append(int(gate))
-
-        while len(cs_gates) > 0:
-            # print("[INFO]: backtrace: Current State Gates: ", cs_gates)
-
-            for gate in cs_gates:
-                inputs = self.gates_map[gate]["inputs"]
-
-                if gate in primary_gates:
-                    for i in inputs:
-                        if (
-                            self.wires_val[i] == "x"
-                            and i not in primary_inputs
-                            and i in self.PI
-                        ):
-                            primary_inputs.append(i)
-
-                for i in inputs:
-                    new_gates = [
-                        int(g)
-                        for g in self.wires_map[i]
-                        if self.wires_map[i][g] == "output"
-                    ]
-                    cs_gates.extend(new_gates)
-                cs_gates.remove(gate)
+        for i, w in enumerate(net.pis):
+            if support >> i & 1 and values[w] == X:
+                primary_inputs.append(net.wire_names[w])
 
         return primary_inputs
 
     def x_path_check(self, location):
         """
-        Check if there exists an X-path (fault propagation path) from the given wire location to any primary output.
+        Check if there exists an X-path (fault propagation path) from the given wire location to any primary output,
+        under the current assignment of the implication engine.
 
         Args:
             location (int): The wire number where the X-path check starts.
@@ -144,47 +260,18 @@ class ATPG:
                 - False if no such path exists.
 
         """
-        cs_gates = []
-
-        po_gates = []
-
-        for po in self.PO:
-            for gate in self.wires_map[po]:
-                if self.wires_map[po][gate] == "output":
-                    po_gates.append(int(gate))
-        # print("[INFO]: X-path: PO Gates: ", po_gates)
-        l = location
-        for gate in self.wires_map[l]:
-            if self.wires_map[l][gate] == "input":
-                cs_gates.append(int(gate))
-
-        while len(cs_gates) > 0:
-            # print("[Info] X-path: Current State Gates: ", cs_gates)
-            for gate in cs_gates:
-                # print(self.gates_map)
-                op = self.gates_map[gate]["outputs"][0]
-
-                op_val = self.wires_val[op]
-
-                if gate in po_gates and op_val == "x":
-                    return True
-
-                l = op
-
-                cs_gates_to_add = [
-                    int(g) for g in self.wires_map[l] if self.wires_map[l][g] == "input"
-                ]
-                # print("[Info] X-path: Gates to Add: ", cs_gates_to_add)
-
-                cs_gates.remove(gate)
-
-                if cs_gates_to_add:
-                    cs_gates.extend(cs_gates_to_add)
-        return False
-
-    def try_sensitize(
-        self, fault, fault_location, pi_values, pis, value, i=0, results=None
-    ):
+        return self._site_observable(self.netlist.wire_id(location))
+
+    def _x_po_bits(self):
+        """PO bitset of the primary outputs currently at 'x' in the engine."""
+        values = self.engine.values
+        mask = 0
+        for j, po in enumerate(self.netlist.pos):
+            if values[po] == X:
+                mask |= 1 << j
+        return mask
+
+    def try_sensitize(self, fault, fault_location, pi_values, pis, value, results=None):
         """
         Recursively try to sensitize the fault by assigning '1' and '0' to the inputs.
 
@@ -194,57 +281,153 @@ class ATPG:
             pi_values (dict): Dictionary of current primary input values.
             pis (list): List of primary inputs to test from the backtrace.
             value (str): The desired value at the fault location ('1' for 'D', '0' for '~D').
-            i (int): The current index of the primary input to process (default is 0).
+            results (list): List the assignments are appended to (default: a new one).
 
         Returns:
-            dict: Updated pi_values if fault is sensitized, None otherwise.
+            list: PI assignments (dicts) which set the fault location to value.
         """
-        # Base case: If we have processed all inputs, return None (no solution found)
-        #
-        if not results:
+        if results is None:
             results = []
+        opened = self._open_record(fault)
+
+        # Start from the good machine with the given assignment applied; each
+        # decision below is then implied incrementally and undone on backtrack.
+        self._timed("implication", self._apply, None, pi_values)
+        self._sensitize_search(fault_location, dict(pi_values), pis, value, results)
+        if opened:
+            self._close_record("test" if results else "untestable")
+        return results
 
-        print(GIN, "ATPG.try_sensitize: current PIs vals", pi_values)
-        print(
-            GIN, "ATPG.try_sensitize: Fault Location and Value: ", fault_location, value
-        )
-        if i >= len(pis):
-            return None
+    def _apply(self, fault, assignment):
+        """Reset the engine with a fault and assign the given input values."""
+        engine = self.engine
+        engine.reset(fault)
+        for wire, value in assignment.items():
+            if value != "x":
+                engine.assign(wire, value)
+
+    def _sensitize_search(self, fault_location, pi_values, pis, value, results):
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "ATPG.try_sensitize: current PIs vals %s, fault location %s = %s",
+                pi_values,
+                fault_location,
+                value,
+                extra={"fields": {"pi_values": pi_values, "location": fault_location}},
+            )
+        remaining = [pi for pi in pis if pi_values.get(pi, "x") == "x"]
+        if not remaining:
+            self._dead_end("no_input")
+            return
+
+        engine = self.engine
+        # PODEM decision: backtrace the objective along SCOAP-guided inputs and
+        # try the value it asks for first.
+        choice = self._timed("backtrace", self.backtrace_objective, fault_location, value)
+        if choice is not None and choice[0] in remaining:
+            input_pi, first_value = choice
+        else:
+            input_pi, first_value = remaining[0], "1"
+
+        for pi_value in (first_value, "0" if first_value == "1" else "1"):
+            mark = engine.mark()
+            self._decide(input_pi, pi_value)
+            new_pi_values = dict(pi_values)
+            new_pi_values[input_pi] = pi_value
+
+            site_value = engine.value(fault_location)
+            if str(site_value) == value:
+                results.append(new_pi_values)
+            elif site_value == "x":
+                self._sensitize_search(
+                    fault_location, new_pi_values, pis, value, results
+                )
+            else:
+                self._dead_end("conflict")
+            engine.undo(mark)
 
-        input_pi = pis[i]
+    def backtrace_objective(self, wire, value):
+        """
+        PODEM backtrace of the objective (wire, value) to a primary input,
+        one Scoap.backtrace_step per gate.
 
-        # Try setting the PI to "1" first
-        new_pi_values = pi_values.copy()
-        new_pi_values[input_pi] = "1"
+        Returns:
+            tuple: (primary input, value) to try, or None if the objective cannot
+            be traced to an unassigned primary input.
+        """
+        net = self.netlist
+        values = self.engine.values
+        w = net.wire_id(wire)
+        v = int(value)
+
+        while net.driver[w] >= 0:
+            g = net.driver[w]
+            gate_type = net.gate_type[g]
+            if gate_type >= GateType.DFF:
+                return None
+            step = self.scoap.backtrace_step(gate_type, net.fanin_of(g), values, v)
+            if step is None:
+                return None
+            w, v = step
+
+        if w not in self._pi_ids:
+            return None
+        return net.wire_names[w], str(v)
 
-        simulated_values = self.implication_with_fault(new_pi_values, fault=None)
+    def d_frontier(self):
+        """
+        Gate ids with D or ~D on an input and 'x' on the output. The gate read
+        by an activated branch fault counts as well, since its error is only
+        seen on that gate's input pin.
 
-        if str(simulated_values[fault_location]) == value:
-            pi_values[input_pi] = "1"
-            pi_values_to_add = [pi_values]
-            results.extend(pi_values_to_add)
+        Only the readers of the wires the engine currently holds at D or ~D
+        are looked at, so the cost follows the fault effect, not the cone.
+        """
+        net = self.netlist
+        engine = self.engine
+        values = engine.values
+        fault = engine.fault
+        candidates = set()
+        if fault is not None and fault.branch is not None:
+            if values[net.wire_id(fault.gate_no)] == 1 - fault.stuck_at:
+                candidates.add(net.gate_index[fault.branch])
+        for w in engine.errors:
+            candidates.update(net.fanout_of(w))
+
+        frontier = []
+        for g in sorted(candidates):
+            out = net.gate_output[g]
+            if out >= 0 and values[out] == X and net.gate_type[g] < GateType.DFF:
+                frontier.append(g)
+        return frontier
+
+    def select_d_frontier(self):
+        """The D-frontier gate whose output is the most observable (lowest CO)."""
+        frontier = self.d_frontier()
+        if not frontier:
+            return None
+        co = self.scoap.co
+        return min(frontier, key=lambda g: co[self.netlist.gate_output[g]])
 
-        elif simulated_values[fault_location] == "x":
-            pi_values = self.try_sensitize(
-                fault, fault_location, new_pi_values, pis, value, i + 1, results
-            )
-            if pi_values:
-                results.extend(pi_values)
-
-        new_pi_values[input_pi] = "0"
-        simulated_values = self.implication_with_fault(new_pi_values, fault=None)
-
-        if str(simulated_values[fault_location]) == value:
-            # pi_values[input_pi] = "0"
-            results.extend([new_pi_values])
-        elif simulated_values[fault_location] == "x":
-            pi_values = self.try_sensitize(
-                fault, fault_location, new_pi_values, pis, value, i + 1, results
-            )
-            if pi_values:
-                results.extend(pi_values)
+    def propagation_objective(self):
+        """
+        Backtrace the objective of moving the fault effect through the most
+        observable D-frontier gate: one of its 'x' inputs at the non-controlling
+        value.
 
-        return results
+        Returns:
+            tuple: (primary input, value) or None.
+        """
+        g = self.select_d_frontier()
+        if g is None:
+            return None
+        net = self.netlist
+        gate_type = GateType(net.gate_type[g]).name
+        for w in net.fanin_of(g):
+            if self.engine.values[w] == X:
+                value = ATPG.give_objective(gate_type)[0]
+                return self.backtrace_objective(net.wire_names[w], value)
+        return None
 
     def sensitize_fault(self, fault_location, fault_value):
         """
@@ -264,19 +447,29 @@ class ATPG:
         po_values = {po: "x" for po in self.PO}
 
         objectives = {}
-
-        if self.x_path_check(fault_location):
-            pis = self.backtrace(
+        found = False
+        opened = self._open_record(fault)
+
+        self._timed("implication", self._apply, None, pi_values)
+        if self._timed("x_path_check", self.x_path_check, fault_location):
+            pis = self._timed(
+                "backtrace",
+                self.backtrace,
                 Objective(
                     fault_location, fault_value, "D" if fault_value == "D" else "~D"
-                )
+                ),
             )
 
             value = "1" if fault_value == "D" else "0"
             objectives[fault_location] = value
 
             pi_values = self.try_sensitize(fault, fault_location, pi_values, pis, value)
+            found = bool(pi_values)
+        else:
+            self._dead_end("no_x_path")
 
+        if opened:
+            self._close_record("test" if found else "untestable")
         return pi_values
 
     def implication_with_fault(self, pi_values, fault=None):
@@ -284,20 +477,16 @@ class ATPG:
         Implication with fault: Propagate the fault to the primary outputs to determine if the fault is detectable.
 
         """
-
-        dict_inputs = pi_values.copy()
-        primary_inputs = self.PI
-        if fault is not None:
-            dict_inputs[fault.gate_no] = fault.error
-        gate_level_map = copy.deepcopy(self.gate_level_map)
-        gates_map = copy.deepcopy(self.gates_map)
-
-        state_vars = self.state_vars
-
-        simulated_values = Parser.evaluate_graph(
-            primary_inputs, gate_level_map, gates_map, dict_inputs, state_vars
+        engine = self.engine
+        engine.reset(fault)
+        for pi, value in pi_values.items():
+            if value != "x":
+                engine.assign(pi, value)
+
+        simulated_values = engine.values_dict()
+        log.debug(
+            "ATPG.implication_with_fault: Simulated Values: %s", simulated_values
         )
-        print(GIN, "ATPG.implication_with_fault: Simulated Values: ", simulated_values)
 
         return simulated_values
 
@@ -310,41 +499,129 @@ class ATPG:
 
         for inputs in sensitization_inputs:
             if self.try_propagate_to_pos(fault, inputs):
-                print(
-                    GIN,
-                    "ATPG.propagate_values_to_pos: Fault successfully propagated with inputs:",
+                log.info(
+                    "ATPG.propagate_values_to_pos: Fault successfully propagated with inputs: %s",
                     inputs,
+                    extra={"fields": {"fault": repr(fault), "vector": inputs}},
                 )
                 return inputs  # Return the successful input configuration
 
-        print(
-            ERR,
+        log.error(
             "ATPG.propagate_values_to_pos: Unable to propagate fault to primary outputs",
+            extra={"fields": {"fault": repr(fault)}},
         )
         return None  # If propagation is not successful
 
-    def try_propagate_to_pos(self, fault, inputs):
-        """
-        Attempt to propagate the fault by changing the 'x' values in the input.
-        First try setting each 'x' to '0', and if that fails, try '1'.
+    def generate_test(self, fault):
         """
+        Generate a test cube for a single stem or branch fault.
 
-        for wire, value in inputs.items():
-            if value == "x":
-                inputs[wire] = "0"
-                simulated_values = self.implication_with_fault(inputs, fault)
-                if self.check_primary_output_fault_propagation(simulated_values):
-                    return True
+        Runs the PODEM search from an all-'x' assignment; the fault is
+        activated and propagated by the same search.
 
-                inputs[wire] = "1"
-                simulated_values = self.implication_with_fault(inputs, fault)
-                if self.check_primary_output_fault_propagation(simulated_values):
-                    return True
+        Returns:
+            dict: {pi: '0'/'1'/'x'} detecting the fault, or None if the fault is
+            untestable or the search was aborted (see self.aborted).
+        """
+        inputs = {pi: "x" for pi in self.PI}
+        found = self.try_propagate_to_pos(fault, inputs)
+        self.aborted = not found and self._backtracks > self.backtrack_limit
+        return inputs if found else None
 
-                inputs[wire] = "x"
+    def try_propagate_to_pos(self, fault, inputs):
+        """
+        Attempt to propagate the fault by changing the 'x' values in the input.
 
+        PODEM search: the next input and value come from backtracing the most
+        observable D-frontier gate, and the search backtracks as soon as the
+        D-frontier is empty or no X-path is left. The inputs dict is updated
+        with the successful assignment.
+        """
+        opened = self._open_record(fault)
+        self._timed("implication", self._apply, fault, inputs)
+
+        self._backtracks = 0
+        found = self._propagate_search(fault, inputs)
+        if opened:
+            if found:
+                self._close_record("test")
+            elif self._backtracks > self.backtrack_limit:
+                self._close_record("aborted", "backtrack_limit")
+            else:
+                self._close_record("untestable")
+        return found
+
+    def _propagate_search(self, fault, inputs):
+        engine = self.engine
+        record = self._record
+        if engine.fault_at_po():
+            return True
+
+        site = self.netlist.wire_id(fault.gate_no)
+        site_value = engine.values[site]
+        if fault.branch is None and site_value >= D:
+            activated = True
+        else:
+            activated = site_value == 1 - fault.stuck_at
+
+        if activated:
+            if not self._timed("x_path_check", self._fault_effect_observable):
+                self._dead_end("no_x_path")
+                return False
+            suggestion = self._timed("backtrace", self.propagation_objective)
+        elif site_value == X:
+            if not self._timed("x_path_check", self._site_observable, site):
+                self._dead_end("no_x_path")
+                return False
+            suggestion = self._timed(
+                "backtrace",
+                self.backtrace_objective,
+                fault.gate_no,
+                str(1 - fault.stuck_at),
+            )
+        else:
+            self._dead_end("conflict")
+            return False
+
+        if suggestion is not None and inputs.get(suggestion[0]) == "x":
+            wire, first = suggestion
+        else:
+            free = [w for w, value in inputs.items() if value == "x"]
+            if not free:
+                self._dead_end("no_input")
+                return False
+            wire, first = free[0], "0"
+
+        for trial in (first, "0" if first == "1" else "1"):
+            mark = engine.mark()
+            self._decide(wire, trial)
+            inputs[wire] = trial
+            if self._propagate_search(fault, inputs):
+                return True
+            engine.undo(mark)
+            inputs[wire] = "x"
+
+            self._backtracks += 1
+            if record is not None:
+                record.backtracks += 1
+            if self._backtracks > self.backtrack_limit:
+                return False
         return False
 
+    def _site_observable(self, site):
+        """True while the unactivated fault site has an X-path to a PO."""
+        return bool(self.reach.po_reach[site] & self._x_po_bits())
+
+    def _fault_effect_observable(self):
+        """True while some D-frontier gate still has an X-path to a PO."""
+        x_pos = self._x_po_bits()
+        if not x_pos:
+            return False
+        po_reach = self.reach.po_reach
+        return any(
+            po_reach[self.netlist.gate_output[g]] & x_pos for g in self.d_frontier()
+        )
+
     def check_primary_output_fault_propagation(self, simulated_values):
         pos = self.PO
 
@@ -354,6 +631,7 @@ class ATPG:
 
         return False
 
+    @staticmethod
     def give_objective(gate_type):
         if gate_type == "AND":
             return ["1"]
@@ -373,7 +651,7 @@ class ATPG:
             f"gate_level_map: {self.gate_level_map}",
             f"gates_map: {self.gates_map}",
             f"wires_map: {self.wires_map}",
-            f"wires_val: {self.wires_val}",
+            f"wires_val: {self.engine.values_dict()}",
             f"objective: {self.objective}",
             f"primary_inputs: {self.PI}",
             f"primary_outputs: {self.PO}",
@@ -389,6 +667,14 @@ class ATPG:
 
 
 class SequentialATPG(ATPG):
+    """
+    Sequential ATPG on a circuit unrolled sequential_depth times.
+
+    The unrolled copy (circuit) is only built when first used: it holds a new
+    dict per wire and gate for every frame. TimeFrameATPG (see time_frames)
+    expands frames lazily over the compiled netlist instead.
+    """
+
     def __init__(
         self,
         gate_level_map,
@@ -407,8 +693,26 @@ class SequentialATPG(ATPG):
             state_vars,
         )
         self.state_vars = state_vars
+        self._circuit = None
+
+    @property
+    def circuit(self):
+        """(gates_map, wires_map) of the unrolled circuit, built on first use."""
+        if self._circuit is None:
+            self._circuit = self.unroll_circuit()
+        return self._circuit
+
+    def time_frames(self, **options):
+        """
+        TimeFrameATPG on the compiled netlist, starting from state_vars.
+
+        Args:
+            options: Keyword arguments for TimeFrameATPG (max_frames,
+                backtrack_limit).
+        """
+        from atpg.timeframe import TimeFrameATPG
 
-        self.circuit = self.unroll_circuit()
+        return TimeFrameATPG(self.sequentialATPG.netlist, self.state_vars, **options)
 
     @staticmethod
     def sequential_depth(gate_level_map, gates_map):
@@ -505,7 +809,8 @@ class SequentialATPG(ATPG):
 
                 next_inputs = temp_next_inputs
 
-        print(GIN, "SeqATPG.unroll_circuit: new_wires_map: \n", new_wires_map)
-        print(GIN, "SeqATPG.unroll_circuit: new_gates_map: \n", new_gates_map)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("SeqATPG.unroll_circuit: new_wires_map: \n%s", new_wires_map)
+            log.debug("SeqATPG.unroll_circuit: new_gates_map: \n%s", new_gates_map)
 
         return new_gates_map, new_wires_map
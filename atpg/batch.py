@@ -0,0 +1,242 @@
+"""Non-interactive simulation of stimulus files."""
+
+import copy
+import csv
+import json
+import os
+import re
+
+from .utils import get_logger
+from .vcd import VcdWriter, select_signals
+
+log = get_logger("batch")
+
+VALUES = {"0": 0, "1": 1, "x": "x", "X": "x", "D": "D", "~D": "~D"}
+
+_separator = re.compile(r"[\s,]+")
+_compact = re.compile(r"(?:~D|[01xXD])+")
+
+
+def _parse_value(token, path, line_no):
+    try:
+        return VALUES[token]
+    except KeyError:
+        raise ValueError(
+            f"{path}:{line_no}: invalid value {token!r} (expected 0, 1, x, D or ~D)"
+        ) from None
+
+
+def read_vectors(path, pi_names):
+    """
+    Lazily read stimulus vectors from a file, one vector per line.
+
+    A line is either a whitespace or comma separated list of values, or the
+    values written back to back (e.g. ``01x~D``). Values are 0, 1, x, D and
+    ~D. Blank lines and lines starting with ``#`` or ``//`` are ignored.
+
+    A file may start with a table header naming the inputs (optionally
+    prefixed by ``#``), e.g. ``b a carryin``; the columns of the following
+    lines are then mapped by name and any input left out of the header is
+    driven to 'x'. Without a header, columns follow pi_names.
+
+    Args:
+        path (str): The stimulus file.
+        pi_names (list): Primary input names of the design.
+
+    Yields:
+        tuple: (line number, {pi: value}) for every vector.
+    """
+    known = set(pi_names)
+    columns = list(pi_names)
+    seen_data = False
+
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("//"):
+                continue
+
+            tokens = [t for t in _separator.split(line.lstrip("#")) if t]
+            if not seen_data and tokens and all(t in known for t in tokens):
+                # Table header. Checked before comments so "# a b c" works too.
+                if len(set(tokens)) != len(tokens):
+                    raise ValueError(f"{path}:{line_no}: duplicate input in header")
+                columns = tokens
+                continue
+            if line.startswith("#"):
+                continue
+
+            if len(tokens) == 1 and len(columns) > 1:
+                if _compact.fullmatch(tokens[0]) is None:
+                    raise ValueError(f"{path}:{line_no}: invalid vector {line!r}")
+                tokens = re.findall(r"~D|.", tokens[0])
+
+            if len(tokens) != len(columns):
+                raise ValueError(
+                    f"{path}:{line_no}: expected {len(columns)} values, got {len(tokens)}"
+                )
+
+            seen_data = True
+            vector = dict.fromkeys(pi_names, "x")
+            for name, token in zip(columns, tokens):
+                vector[name] = _parse_value(token, path, line_no)
+            yield line_no, vector
+
+
+def simulate_vectors(parser, vectors, state_vars=None, all_wires=False):
+    """
+    Simulate vectors one clock cycle at a time with Parser.evaluate_graph.
+
+    Flip-flop state is carried from one cycle to the next. Only the current
+    cycle is held in memory, so the input can be an arbitrarily long iterator.
+
+    Args:
+        parser (Parser): A parser on which read_parse_file has been called.
+        vectors (iterable): {pi: value} dicts, in cycle order.
+        state_vars (dict): Initial flip-flop state; a copy of the parser's
+            reset state when None. Updated in place.
+        all_wires (bool): Yield the value of every wire instead of the primary
+            outputs only.
+
+    Yields:
+        tuple: (cycle, inputs, {wire: value}) for every vector.
+    """
+    if state_vars is None:
+        state_vars = copy.deepcopy(parser.state_vars)
+
+    for cycle, vector in enumerate(vectors):
+        wires = parser.evaluate_graph(
+            parser.INPUTS,
+            parser.gate_level_map,
+            parser.gates_map,
+            dict(vector),
+            state_vars,
+        )
+        if not all_wires:
+            wires = {po: wires[po] for po in parser.OUTPUTS}
+        yield cycle, vector, wires
+
+
+class ResultWriter:
+    """
+    Streams simulation results as CSV or JSON lines.
+
+    Every row holds the cycle number, the applied inputs (unless
+    include_inputs is False) and the primary output values.
+
+    Attributes:
+        fmt (str): "csv" or "jsonl".
+        rows (int): Number of rows written so far.
+    """
+
+    FORMATS = ("csv", "jsonl")
+
+    def __init__(
+        self, stream, pi_names, po_names, fmt="csv", include_inputs=True, flush_every=1024
+    ):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r}, expected csv or jsonl")
+        self.stream = stream
+        self.fmt = fmt
+        self.pi_names = list(pi_names) if include_inputs else []
+        self.po_names = list(po_names)
+        self.flush_every = flush_every
+        self.rows = 0
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(stream)
+            self._csv.writerow(["cycle", *self.pi_names, *self.po_names])
+
+    def write(self, cycle, inputs, outputs):
+        if self._csv is not None:
+            self._csv.writerow(
+                [
+                    cycle,
+                    *(inputs[pi] for pi in self.pi_names),
+                    *(outputs[po] for po in self.po_names),
+                ]
+            )
+        else:
+            row = {"cycle": cycle}
+            row.update((pi, inputs[pi]) for pi in self.pi_names)
+            row.update((po, outputs[po]) for po in self.po_names)
+            self.stream.write(json.dumps(row) + "\n")
+
+        self.rows += 1
+        if self.rows % self.flush_every == 0:
+            self.stream.flush()
+
+
+def output_format(path):
+    """Output format implied by a file extension (.csv, .jsonl or .json)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".json", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot infer the output format of {path}; pass fmt")
+
+
+def simulate_file(
+    parser,
+    vector_path,
+    output_path,
+    fmt=None,
+    include_inputs=True,
+    state_vars=None,
+    vcd_path=None,
+    vcd_signals=None,
+):
+    """
+    Simulate a stimulus file and stream the primary outputs to a file.
+
+    Args:
+        parser (Parser): A parser on which read_parse_file has been called.
+        vector_path (str): Stimulus file, see read_vectors.
+        output_path (str): Result file.
+        fmt (str): "csv" or "jsonl"; inferred from output_path when None.
+        include_inputs (bool): Also write the applied inputs on every row.
+        state_vars (dict): Initial flip-flop state, see simulate_vectors.
+        vcd_path (str): Optional VCD waveform file, one time unit per cycle.
+        vcd_signals (list): Wires dumped to the VCD file; the primary inputs,
+            outputs and flip-flop outputs when None (see select_signals).
+
+    Returns:
+        int: Number of vectors simulated.
+    """
+    fmt = fmt or output_format(output_path)
+    vectors = (v for _, v in read_vectors(vector_path, parser.INPUTS))
+
+    vcd_file = open(vcd_path, "w") if vcd_path else None
+    try:
+        vcd = None
+        if vcd_file is not None:
+            if vcd_signals is None:
+                vcd_signals = select_signals(parser)
+            vcd = VcdWriter(vcd_file, vcd_signals)
+
+        with open(output_path, "w", newline="") as out:
+            writer = ResultWriter(
+                out, parser.INPUTS, parser.OUTPUTS, fmt, include_inputs=include_inputs
+            )
+            results = simulate_vectors(
+                parser, vectors, state_vars, all_wires=vcd is not None
+            )
+            for cycle, inputs, wires in results:
+                writer.write(cycle, inputs, wires)
+                if vcd is not None:
+                    vcd.sample(cycle, wires)
+
+        if vcd is not None:
+            vcd.close(writer.rows)
+    finally:
+        if vcd_file is not None:
+            vcd_file.close()
+
+    log.info(
+        "simulate_file: Simulated %d vectors from %s into %s",
+        writer.rows,
+        vector_path,
+        output_path,
+    )
+    return writer.rows
@@ -0,0 +1,107 @@
+"""On-disk cache of parsed and levelized netlists."""
+
+import glob
+import hashlib
+import os
+import pickle
+
+from .utils import get_logger
+
+log = get_logger("cache")
+
+# Bump whenever the parser, levelizer or Netlist layout changes what is stored,
+# so entries written by older versions are ignored and replaced.
+CACHE_VERSION = 2
+
+CACHED_FIELDS = (
+    "gates_map",
+    "wires_map",
+    "INPUTS",
+    "OUTPUTS",
+    "state_vars",
+    "gate_level_map",
+    "netlist",
+)
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class NetlistCache:
+    """
+    Stores the parsed design of a netlist as a pickle keyed by the SHA-256 of the
+    source file and CACHE_VERSION.
+
+    Entries are named ``<file>-<path hash>-<content hash>.pkl``; storing a new
+    entry removes the older ones for the same source, and entries whose version
+    does not match are discarded on load.
+
+    Attributes:
+        cache_dir (str): Directory holding the cache entries.
+    """
+
+    def __init__(self, cache_dir=".atpg_cache"):
+        self.cache_dir = cache_dir
+
+    def _prefix(self, source_path):
+        path_hash = hashlib.sha1(os.path.abspath(source_path).encode()).hexdigest()
+        return os.path.join(
+            self.cache_dir, f"{os.path.basename(source_path)}-{path_hash[:8]}"
+        )
+
+    def entry_path(self, source_path, digest=None):
+        digest = digest or file_digest(source_path)
+        return f"{self._prefix(source_path)}-{digest[:32]}.pkl"
+
+    def load(self, source_path, digest=None):
+        """
+        Args:
+            source_path (str): The netlist file.
+            digest (str): file_digest of the source, if already known.
+
+        Returns:
+            dict: The cached fields for the current contents of the source file,
+            or None if there is no valid entry.
+        """
+        entry = self.entry_path(source_path, digest)
+        if not os.path.exists(entry):
+            return None
+
+        # A truncated or foreign pickle can fail in many ways (UnpicklingError,
+        # EOFError, ImportError, ValueError, ...); any of them means re-parsing.
+        try:
+            with open(entry, "rb") as f:
+                data = pickle.load(f)
+        except Exception as e:
+            log.warning("NetlistCache.load: Ignoring unreadable entry %s (%r)", entry, e)
+            data = None
+
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            os.remove(entry)
+            return None
+        return data["fields"]
+
+    def store(self, source_path, fields, digest=None):
+        """Write the fields for the current contents of the source file."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = self.entry_path(source_path, digest)
+
+        for stale in glob.glob(f"{glob.escape(self._prefix(source_path))}-*.pkl"):
+            if stale != entry:
+                os.remove(stale)
+
+        tmp = f"{entry}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(
+                {"version": CACHE_VERSION, "fields": fields},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp, entry)
+        log.info("NetlistCache.store: Cached parsed netlist in %s", entry)
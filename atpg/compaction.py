@@ -0,0 +1,156 @@
+"""Dynamic and static compaction of ATPG test sets."""
+
+from .faultsim import PPSFPSimulator
+from .utils import get_logger
+
+log = get_logger("compaction")
+
+
+def dynamic_compaction(atpg, cube, faults, max_faults=None, backtrack_limit=64):
+    """
+    Fill the 'x' inputs of a test cube with tests for secondary faults.
+
+    Each secondary fault is targeted by the PODEM search with the inputs
+    already specified in the cube held fixed, so the cube keeps detecting
+    every fault it was built for.
+
+    Args:
+        atpg (ATPG): The test generator.
+        cube (dict): Test cube of the primary fault ({pi: '0'/'1'/'x'}).
+        faults (list): Secondary faults, tried in order.
+        max_faults (int): Stop after this many secondary faults were added.
+        backtrack_limit (int): Backtracks allowed per secondary fault; kept
+            low since a cube which cannot be extended cheaply rarely can.
+
+    Returns:
+        tuple: (extended cube, list of the secondary faults it now targets).
+    """
+    saved_limit = atpg.backtrack_limit
+    atpg.backtrack_limit = backtrack_limit
+    cube = dict(cube)
+    targeted = []
+    try:
+        for fault in faults:
+            if max_faults is not None and len(targeted) >= max_faults:
+                break
+            if "x" not in cube.values():
+                break
+            trial = dict(cube)
+            if atpg.try_propagate_to_pos(fault, trial):
+                cube = trial
+                targeted.append(fault)
+    finally:
+        atpg.backtrack_limit = saved_limit
+    return cube, targeted
+
+
+def cubes_compatible(a, b):
+    """True if no input is specified to different values in the two cubes."""
+    for pi, value in a.items():
+        other = b.get(pi, "x")
+        if value != "x" and other != "x" and str(value) != str(other):
+            return False
+    return True
+
+
+def merge_cubes(cubes):
+    """
+    Greedily merge compatible test cubes.
+
+    Each cube is merged into the first earlier merged cube it is compatible
+    with, or starts a new one. A merged cube detects every fault detected by
+    the cubes it was built from, since specifying more inputs never removes a
+    fault effect which was propagated under 'x'.
+
+    Returns:
+        list: The merged cubes.
+    """
+    merged = []
+    for cube in cubes:
+        for target in merged:
+            if cubes_compatible(target, cube):
+                for pi, value in cube.items():
+                    if value != "x":
+                        target[pi] = value
+                break
+        else:
+            merged.append(dict(cube))
+    return merged
+
+
+def reverse_order_compaction(netlist, vectors, faults, width=64, state=None):
+    """
+    Drop vectors which only detect faults detected by later vectors.
+
+    The vectors are fault simulated from last to first with fault dropping;
+    a vector is kept only if it detects a fault no later vector detects. Tests
+    generated early target easy faults which later, more specific tests tend
+    to cover as well, so this removes most of them.
+
+    Returns:
+        list: The kept vectors, in their original order.
+    """
+    simulator = PPSFPSimulator(netlist, width, state)
+    remaining = list(faults)
+    keep = []
+    end = len(vectors)
+    while end > 0 and remaining:
+        start = max(0, end - width)
+        masks = simulator.detection_masks(vectors[start:end], remaining)
+        for k in reversed(range(end - start)):
+            bit = 1 << k
+            hits = [f for f, m in masks.items() if m & bit]
+            if hits:
+                keep.append(start + k)
+                for f in hits:
+                    del masks[f]
+        remaining = [f for f in remaining if f in masks]
+        end = start
+
+    return [vectors[i] for i in sorted(keep)]
+
+
+def fill_cube(cube, fill=0):
+    """Concrete 0/1 vector from a test cube, with 'x' inputs set to fill."""
+    return {pi: fill if value == "x" else int(value) for pi, value in cube.items()}
+
+
+def compact_result(netlist, result, fill=0, state=None):
+    """
+    Static compaction of an ATPGResult, in place.
+
+    The cubes are merged, filled and reduced by reverse-order fault simulation
+    against the detected faults; result.tests, result.cubes and
+    result.detected are replaced accordingly. Every fault detected before is
+    still detected afterwards.
+
+    Returns:
+        ATPGResult: The same result object.
+    """
+    before = len(result.tests)
+    detected = [f for f in result.faults if f in result.detected]
+    cubes = merge_cubes(result.cubes)
+    tests = [fill_cube(cube, fill) for cube in cubes]
+    num_merged = len(cubes)
+
+    # Some faults may only have been caught thanks to the fill of an original
+    # test; bring those tests back so compaction never loses coverage.
+    graded = PPSFPSimulator(netlist, state=state).run(tests, detected)
+    restore = sorted({result.detected[f] for f in graded.undetected})
+    cubes += [result.cubes[i] for i in restore]
+    tests += [result.tests[i] for i in restore]
+
+    kept = reverse_order_compaction(netlist, tests, detected, state=state)
+    kept_ids = {id(t) for t in kept}
+    result.cubes = [c for c, t in zip(cubes, tests) if id(t) in kept_ids]
+    result.tests = kept
+
+    graded = PPSFPSimulator(netlist, state=state).run(kept, detected)
+    result.detected = graded.detected
+    log.info(
+        "compact_result: %d tests compacted to %d (%d after merging)",
+        before,
+        len(kept),
+        num_merged,
+    )
+    return result
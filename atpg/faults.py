@@ -0,0 +1,183 @@
+"""Stuck-at fault universe generation and fault collapsing."""
+
+from .atpg import Fault
+from .netlist import GateType
+from .utils import get_logger
+
+log = get_logger("faults")
+
+
+# For gate type: (input stuck value, equivalent output stuck value).
+EQUIVALENCE_RULES = {
+    GateType.AND: (0, 0),
+    GateType.NAND: (0, 1),
+    GateType.OR: (1, 1),
+    GateType.NOR: (1, 0),
+}
+
+# For gate type: output stuck value which dominates the input faults of the
+# non-controlling value and can therefore be dropped.
+DOMINANCE_RULES = {
+    GateType.AND: 1,
+    GateType.NAND: 0,
+    GateType.OR: 0,
+    GateType.NOR: 1,
+}
+
+
+def _error(stuck_at):
+    return "D" if stuck_at == 0 else "~D"
+
+
+class _DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # Keep the smallest index as representative so results are stable.
+            if b < a:
+                a, b = b, a
+            self.parent[b] = a
+
+
+def fault_universe(netlist):
+    """
+    Enumerate every single stuck-at fault of the netlist.
+
+    Both stuck-at values are listed for every wire stem and, for wires which
+    fan out to more than one sink (several gates, or a gate and a primary
+    output), for every fanout branch.
+
+    Returns:
+        list: Fault objects in wire id order.
+    """
+    po_ids = set(netlist.pos)
+    faults = []
+    for w, name in enumerate(netlist.wire_names):
+        faults.append(Fault(name, "D"))
+        faults.append(Fault(name, "~D"))
+
+        readers = list(dict.fromkeys(netlist.fanout_of(w)))
+        if len(readers) + (w in po_ids) > 1:
+            for g in readers:
+                gate_no = netlist.gate_nos[g]
+                faults.append(Fault(name, "D", gate_no))
+                faults.append(Fault(name, "~D", gate_no))
+    return faults
+
+
+def generate_faults(netlist, collapse=True, dominance=True, checkpoint=False):
+    """
+    Generate the stuck-at fault list of a netlist.
+
+    Args:
+        netlist (Netlist): The compiled circuit.
+        collapse (bool): Merge structurally equivalent faults (e.g. NAND input
+            s-a-0 and output s-a-1) and keep one representative per class.
+        dominance (bool): With collapse, also drop gate output faults which
+            dominate an input fault (e.g. AND output s-a-1). Only the output
+            fault itself is dropped; its class stays when it holds any other
+            fault. Like checkpoint, this assumes the dominated faults are
+            testable.
+        checkpoint (bool): Only target checkpoint faults, i.e. faults on primary
+            inputs and fanout branches. In an irredundant circuit a test set
+            detecting them detects every stuck-at fault.
+
+    Returns:
+        list: Fault objects, in wire id order.
+    """
+    universe = fault_universe(netlist)
+    index = {fault: i for i, fault in enumerate(universe)}
+
+    def pin_fault(w, g, stuck_at):
+        """The fault seen by gate g on its input wire w."""
+        name = netlist.wire_names[w]
+        branch = Fault(name, _error(stuck_at), netlist.gate_nos[g])
+        if branch in index:
+            return index[branch]
+        return index[Fault(name, _error(stuck_at))]
+
+    if checkpoint:
+        pi_names = {netlist.wire_names[w] for w in netlist.pis}
+        keep = [
+            i
+            for i, f in enumerate(universe)
+            if f.branch is not None or f.gate_no in pi_names
+        ]
+    else:
+        keep = list(range(len(universe)))
+
+    if not collapse:
+        faults = [universe[i] for i in keep]
+        log.info("generate_faults: %d faults (uncollapsed).", len(faults))
+        return faults
+
+    classes = _DisjointSet(len(universe))
+    dropped = set()
+    for g in range(netlist.num_gates):
+        gate_type = netlist.gate_type[g]
+        out = netlist.gate_output[g]
+        if out < 0 or gate_type >= GateType.DFF:
+            continue
+        fanin = netlist.fanin_of(g)
+        out_name = netlist.wire_names[out]
+
+        if gate_type == GateType.BUF or gate_type == GateType.NOT:
+            for v in (0, 1):
+                out_v = v if gate_type == GateType.BUF else 1 - v
+                classes.union(
+                    pin_fault(fanin[0], g, v), index[Fault(out_name, _error(out_v))]
+                )
+            continue
+
+        if gate_type in EQUIVALENCE_RULES:
+            in_v, out_v = EQUIVALENCE_RULES[gate_type]
+            out_fault = index[Fault(out_name, _error(out_v))]
+            for w in fanin:
+                classes.union(pin_fault(w, g, in_v), out_fault)
+
+        if dominance and gate_type in DOMINANCE_RULES and len(fanin) > 1:
+            dropped.add(index[Fault(out_name, _error(DOMINANCE_RULES[gate_type]))])
+
+    # Drop a class only when all of it is dominating output faults: an
+    # equivalence partner from the fanout gate, a primary input fault or a
+    # fanout branch fault can be detected by tests the dominated input
+    # faults never need.
+    pi_names = {netlist.wire_names[w] for w in netlist.pis}
+    members = {}
+    for i in range(len(universe)):
+        members.setdefault(classes.find(i), []).append(i)
+    dropped_classes = {
+        root
+        for root, group in members.items()
+        if all(
+            i in dropped
+            and universe[i].branch is None
+            and universe[i].gate_no not in pi_names
+            for i in group
+        )
+    }
+    seen = set()
+    faults = []
+    for i in keep:
+        root = classes.find(i)
+        if root in seen or root in dropped_classes:
+            continue
+        seen.add(root)
+        faults.append(universe[i])
+
+    log.info(
+        "generate_faults: %d faults collapsed to %d (%.1f%% removed).",
+        len(universe),
+        len(faults),
+        100 * (1 - len(faults) / max(len(universe), 1)),
+    )
+    return faults
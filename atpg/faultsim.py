@@ -0,0 +1,395 @@
+"""Stuck-at fault simulation on a compiled Netlist."""
+
+import heapq
+
+from .faults import generate_faults
+from .netlist import GateType
+from .simulator import (
+    BitParallelSimulator,
+    evaluate_word,
+    next_flop_state,
+    pack_vectors,
+)
+from .utils import get_logger
+
+log = get_logger("faultsim")
+
+
+class FaultSimResult:
+    """
+    Outcome of grading a pattern set against a fault list.
+
+    Attributes:
+        faults (list): The graded faults.
+        detected (dict): Fault -> index of the first pattern detecting it.
+        num_patterns (int): Number of patterns simulated.
+    """
+
+    def __init__(self, faults, detected, num_patterns):
+        self.faults = faults
+        self.detected = detected
+        self.num_patterns = num_patterns
+
+    @property
+    def undetected(self):
+        return [f for f in self.faults if f not in self.detected]
+
+    @property
+    def coverage(self):
+        if not self.faults:
+            return 1.0
+        return len(self.detected) / len(self.faults)
+
+    def __repr__(self):
+        return (
+            f"FaultSimResult(detected={len(self.detected)}/{len(self.faults)}, "
+            f"coverage={self.coverage:.2%}, patterns={self.num_patterns})"
+        )
+
+
+class PPSFPSimulator:
+    """
+    Parallel-pattern single-fault-propagation stuck-at fault simulator.
+
+    The good machine is simulated once per batch of ``width`` patterns. Each
+    remaining fault is then injected in turn and only the gates of its fanout
+    cone whose inputs actually differ from the good machine are re-evaluated, in
+    topological order. A fault is dropped as soon as a pattern detects it.
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        width (int): Patterns per batch.
+        state (dict): Flip-flop output values by gate number (default 0).
+    """
+
+    def __init__(self, netlist, width=64, state=None):
+        self.netlist = netlist
+        self.width = width
+        self.state = state or {}
+        self.pi_names = [netlist.wire_names[w] for w in netlist.pis]
+        self._good = BitParallelSimulator(netlist, width, self.state)
+
+        self._position = [0] * netlist.num_gates
+        for pos, g in enumerate(netlist.order):
+            self._position[g] = pos
+
+        self._gates = [
+            (netlist.gate_type[g], tuple(netlist.fanin_of(g)), netlist.gate_output[g])
+            for g in range(netlist.num_gates)
+        ]
+        # Only combinational readers propagate a fault within a time frame.
+        self._readers = [
+            tuple(
+                g
+                for g in netlist.fanout_of(w)
+                if netlist.gate_type[g] < GateType.DFF
+            )
+            for w in range(netlist.num_wires)
+        ]
+
+    def run(self, vectors, faults=None):
+        """
+        Grade a list or stream of vectors against a fault list.
+
+        Args:
+            vectors: Iterable of vectors (dicts, sequences or strings in PI order).
+            faults (list): Faults to grade. Defaults to the collapsed fault list
+                from generate_faults.
+
+        Returns:
+            FaultSimResult: First detecting pattern per fault and the coverage.
+        """
+        if faults is None:
+            faults = generate_faults(self.netlist)
+
+        remaining = list(faults)
+        detected = {}
+        offset = 0
+        batch = []
+
+        for vector in vectors:
+            batch.append(vector)
+            if len(batch) == self.width:
+                remaining = self._run_batch(batch, offset, remaining, detected)
+                offset += len(batch)
+                batch = []
+            if not remaining:
+                break
+        if batch and remaining:
+            remaining = self._run_batch(batch, offset, remaining, detected)
+            offset += len(batch)
+
+        result = FaultSimResult(list(faults), detected, offset)
+        log.info("PPSFPSimulator.run: %s", result)
+        return result
+
+    def detection_masks(self, vectors, faults):
+        """
+        Which of a batch of vectors detect each fault, without fault dropping.
+
+        Args:
+            vectors (list): Vectors (dicts, sequences or strings in PI order);
+                any number, they are packed into a single word.
+            faults (list): Faults to grade.
+
+        Returns:
+            dict: Fault -> int whose bit k is set when vectors[k] detects it.
+        """
+        mask = (1 << len(vectors)) - 1
+        return self.detection_masks_packed(
+            pack_vectors(vectors, self.pi_names), mask, faults
+        )
+
+    def detection_masks_packed(self, pi_words, mask, faults):
+        """detection_masks for patterns already packed one word per PI."""
+        good = self._good.simulate_words(pi_words, mask)
+        return {fault: self.detect_mask(fault, good, mask) for fault in faults}
+
+    def detect_mask(self, fault, good, mask):
+        """Patterns of the batch (as a bit mask) which detect the fault."""
+        net = self.netlist
+        site = net.wire_index[fault.gate_no]
+        forced = 0 if fault.stuck_at == 0 else mask
+
+        faulty = {}
+        heap = []
+        queued = set()
+
+        if fault.branch is None:
+            if good[site] == forced:
+                return 0
+            faulty[site] = forced
+            for g in self._readers[site]:
+                queued.add(g)
+                heapq.heappush(heap, (self._position[g], g))
+        else:
+            g = net.gate_index[fault.branch]
+            gate_type, fanin, out = self._gates[g]
+            if gate_type >= GateType.DFF or out < 0:
+                return 0
+            words = [forced if w == site else good[w] for w in fanin]
+            value = evaluate_word(gate_type, words, mask)
+            if value == good[out]:
+                return 0
+            faulty[out] = value
+            for reader in self._readers[out]:
+                queued.add(reader)
+                heapq.heappush(heap, (self._position[reader], reader))
+
+        while heap:
+            _, g = heapq.heappop(heap)
+            gate_type, fanin, out = self._gates[g]
+            if out < 0:
+                continue
+            words = [faulty.get(w, good[w]) for w in fanin]
+            value = evaluate_word(gate_type, words, mask)
+            if value == good[out]:
+                continue
+            faulty[out] = value
+            for reader in self._readers[out]:
+                if reader not in queued:
+                    queued.add(reader)
+                    heapq.heappush(heap, (self._position[reader], reader))
+
+        diff = 0
+        for po in net.pos:
+            if po in faulty:
+                diff |= faulty[po] ^ good[po]
+        return diff & mask
+
+    def _run_batch(self, batch, offset, faults, detected):
+        mask = (1 << len(batch)) - 1
+        good = self._good.simulate_words(pack_vectors(batch, self.pi_names), mask)
+
+        remaining = []
+        for fault in faults:
+            diff = self.detect_mask(fault, good, mask)
+            if diff:
+                detected[fault] = offset + (diff & -diff).bit_length() - 1
+            else:
+                remaining.append(fault)
+        return remaining
+
+
+class ConcurrentFaultSimulator:
+    """
+    Concurrent (event-driven) stuck-at fault simulator for sequential circuits.
+
+    Only the good machine is simulated in full. For every wire the simulator
+    keeps the faulty machines whose value differs from the good one, and a gate
+    is re-evaluated for a fault only when one of its inputs diverges or the fault
+    sits on the gate itself. Flip-flops keep the good state plus the divergent
+    states of the fault machines across cycles, so latent faults cost nothing
+    until they reach a primary output.
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        faults (list): The faults being graded.
+        detected (dict): Fault -> cycle in which it first reached a PO.
+        cycle (int): Number of cycles simulated so far.
+    """
+
+    def __init__(self, netlist, faults=None, state_vars=None):
+        self.netlist = netlist
+        self.faults = list(faults) if faults is not None else generate_faults(netlist)
+        self.detected = {}
+        self.cycle = 0
+        self._active = set(range(len(self.faults)))
+
+        self._gates = [
+            (netlist.gate_type[g], tuple(netlist.fanin_of(g)), netlist.gate_output[g])
+            for g in range(netlist.num_gates)
+        ]
+
+        # Faults grouped by the place they are injected.
+        self._stem = {}
+        self._branch = {}
+        for fid, fault in enumerate(self.faults):
+            site = netlist.wire_index[fault.gate_no]
+            if fault.branch is None:
+                self._stem.setdefault(site, []).append((fid, fault.stuck_at))
+            else:
+                g = netlist.gate_index[fault.branch]
+                self._branch.setdefault(g, []).append((fid, site, fault.stuck_at))
+
+        # Good (clock, state) per flip-flop and the divergent fault machines.
+        state_vars = state_vars or {}
+        self._good_state = {}
+        self._fault_state = {}
+        for g in netlist.dffs:
+            saved = state_vars.get(netlist.gate_nos[g], {"C": 0, "D": 0})
+            self._good_state[g] = (int(saved["C"]), int(saved["D"]))
+            self._fault_state[g] = {}
+
+    def step(self, vector):
+        """
+        Simulate one clock cycle for the good machine and all active faults.
+
+        Args:
+            vector: Primary input values (dict, sequence or string in PI order).
+
+        Returns:
+            list: Faults first detected in this cycle.
+        """
+        net = self.netlist
+        if isinstance(vector, dict):
+            vector = [vector[net.wire_names[w]] for w in net.pis]
+
+        good = [0] * net.num_wires
+        diverge = {}
+        for w, value in zip(net.pis, vector):
+            good[w] = int(value)
+            self._inject_stem(w, good[w], {}, diverge)
+
+        for g in net.order:
+            gate_type, fanin, out = self._gates[g]
+            if out < 0:
+                continue
+
+            div = {}
+            if gate_type >= GateType.DFF:
+                _, state = self._good_state[g]
+                good[out] = state
+                for fid, (_, f_state) in self._fault_state[g].items():
+                    if fid in self._active and f_state != state:
+                        div[fid] = f_state
+            else:
+                value = evaluate_word(gate_type, [good[w] for w in fanin], 1)
+                good[out] = value
+                for fid in self._touching(g, fanin, diverge):
+                    f_value = evaluate_word(
+                        gate_type, self._fault_inputs(g, fid, fanin, good, diverge), 1
+                    )
+                    if f_value != value:
+                        div[fid] = f_value
+
+            self._inject_stem(out, good[out], div, diverge)
+
+        newly_detected = []
+        for po in net.pos:
+            for fid in diverge.get(po, ()):
+                if fid in self._active:
+                    self._active.discard(fid)
+                    self.detected[self.faults[fid]] = self.cycle
+                    newly_detected.append(self.faults[fid])
+
+        self._clock_flops(good, diverge)
+        self.cycle += 1
+        return newly_detected
+
+    def run(self, vectors):
+        """
+        Simulate a sequence of cycles, one vector per cycle.
+
+        Returns:
+            FaultSimResult: The cycle of first detection per fault.
+        """
+        for vector in vectors:
+            self.step(vector)
+            if not self._active:
+                break
+
+        result = FaultSimResult(self.faults, self.detected, self.cycle)
+        log.info("ConcurrentFaultSimulator.run: %s", result)
+        return result
+
+    def state_vars(self):
+        """Good-machine flip-flop state in the Parser.state_vars format."""
+        return {
+            self.netlist.gate_nos[g]: {"C": clock, "D": state}
+            for g, (clock, state) in self._good_state.items()
+        }
+
+    def _inject_stem(self, wire, good_value, div, diverge):
+        for fid, stuck in self._stem.get(wire, ()):
+            if fid not in self._active:
+                continue
+            if stuck != good_value:
+                div[fid] = stuck
+            else:
+                div.pop(fid, None)
+        if div:
+            diverge[wire] = div
+
+    def _touching(self, g, fanin, diverge):
+        """Active faults that can make gate g differ from the good machine."""
+        fids = set()
+        for w in fanin:
+            if w in diverge:
+                fids.update(diverge[w])
+        for fid, _, _ in self._branch.get(g, ()):
+            fids.add(fid)
+        return [fid for fid in fids if fid in self._active]
+
+    def _fault_inputs(self, g, fid, fanin, good, diverge):
+        values = [diverge[w].get(fid, good[w]) if w in diverge else good[w] for w in fanin]
+        for b_fid, site, stuck in self._branch.get(g, ()):
+            if b_fid == fid:
+                values = [stuck if w == site else v for w, v in zip(fanin, values)]
+        return values
+
+    def _clock_flops(self, good, diverge):
+        for g in self.netlist.dffs:
+            gate_type, fanin, _ = self._gates[g]
+            clock, state = self._good_state[g]
+            new_good = next_flop_state(
+                gate_type, clock, state, [good[w] for w in fanin]
+            )
+
+            fids = set(self._touching(g, fanin, diverge))
+            fids.update(fid for fid in self._fault_state[g] if fid in self._active)
+
+            new_faulty = {}
+            for fid in fids:
+                f_clock, f_state = self._fault_state[g].get(fid, (clock, state))
+                new_state = next_flop_state(
+                    gate_type,
+                    f_clock,
+                    f_state,
+                    self._fault_inputs(g, fid, fanin, good, diverge),
+                )
+                if new_state != new_good:
+                    new_faulty[fid] = new_state
+
+            self._good_state[g] = new_good
+            self._fault_state[g] = new_faulty
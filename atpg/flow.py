@@ -0,0 +1,196 @@
+"""Complete test generation flow: random patterns first, then PODEM."""
+
+import random
+import time
+
+from .compaction import compact_result
+from .faults import generate_faults
+from .faultsim import PPSFPSimulator
+from .parallel import ATPGResult, ParallelATPG
+from .utils import get_logger
+
+log = get_logger("flow")
+
+
+def random_phase(
+    netlist,
+    faults,
+    seed=0,
+    batch_size=64,
+    min_gain=0.01,
+    max_patterns=8192,
+    state=None,
+):
+    """
+    Grade batches of pseudo-random patterns with PPSFP and drop what they detect.
+
+    Patterns are drawn from random.Random(seed), one packed word per primary
+    input, so a run is reproducible. Within a batch a pattern is kept only if
+    it is the first to detect some fault. The phase stops when a batch
+    detects less than min_gain of the fault list, when max_patterns patterns
+    were applied, or when every fault is detected.
+
+    Args:
+        netlist (Netlist): The compiled circuit.
+        faults (list): Faults to target.
+        seed (int): Seed of the pattern generator.
+        batch_size (int): Patterns simulated per batch.
+        min_gain (float): Minimum fraction of the fault list a batch must
+            detect for the next batch to be applied.
+        max_patterns (int): Upper bound on the patterns applied.
+        state (dict): Flip-flop output values by gate number.
+
+    Returns:
+        tuple: (kept patterns as {pi: 0/1} dicts, {fault: pattern index},
+        number of patterns applied).
+    """
+    rng = random.Random(seed)
+    simulator = PPSFPSimulator(netlist, batch_size, state)
+    pi_names = simulator.pi_names
+    remaining = list(faults)
+    patterns = []
+    detected = {}
+    applied = 0
+
+    while remaining and applied < max_patterns:
+        count = min(batch_size, max_patterns - applied)
+        mask = (1 << count) - 1
+        words = [rng.getrandbits(count) for _ in pi_names]
+        masks = simulator.detection_masks_packed(words, mask, remaining)
+        applied += count
+
+        before = len(detected)
+        for k in range(count):
+            bit = 1 << k
+            hits = [f for f, m in masks.items() if m & bit]
+            if not hits:
+                continue
+            index = len(patterns)
+            patterns.append({pi: w >> k & 1 for pi, w in zip(pi_names, words)})
+            for f in hits:
+                detected[f] = index
+                del masks[f]
+        remaining = [f for f in remaining if f in masks]
+
+        gain = (len(detected) - before) / max(len(faults), 1)
+        if gain < min_gain:
+            break
+
+    return patterns, detected, applied
+
+
+class ATPGFlow:
+    """
+    Test generation for a whole fault list.
+
+    Cheap pseudo-random patterns are applied first (random_phase) and every
+    fault they detect is dropped; only the remaining, random-pattern-resistant
+    faults go through deterministic PODEM with ParallelATPG. The random
+    patterns come first in the resulting test set, followed by the
+    deterministic tests, and the whole set is optionally compacted.
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        state_vars (dict): Flip-flop state.
+        seed (int): Seed of the random pattern generator.
+        batch_size (int): Random patterns per batch.
+        min_gain (float): Random phase stopping threshold, see random_phase.
+        max_random_patterns (int): Upper bound on the random patterns applied.
+        static_compaction (bool): Compact the final test set.
+        atpg_options (dict): Keyword arguments for ParallelATPG.
+    """
+
+    def __init__(
+        self,
+        netlist,
+        state_vars=None,
+        seed=0,
+        batch_size=64,
+        min_gain=0.01,
+        max_random_patterns=8192,
+        static_compaction=False,
+        **atpg_options,
+    ):
+        self.netlist = netlist
+        self.state_vars = state_vars or {}
+        self.seed = seed
+        self.batch_size = batch_size
+        self.min_gain = min_gain
+        self.max_random_patterns = max_random_patterns
+        self.static_compaction = static_compaction
+        self.atpg_options = atpg_options
+        self._state = {
+            gate_no: int(saved.get("D", 0))
+            for gate_no, saved in self.state_vars.items()
+        }
+
+    def run(self, faults=None):
+        """
+        Returns:
+            ATPGResult: Tests for the fault list, with "random",
+            "deterministic" and (if enabled) "compaction" entries in phases.
+        """
+        if faults is None:
+            faults = generate_faults(self.netlist)
+        result = ATPGResult(faults)
+
+        start = time.perf_counter()
+        patterns, detected, applied = random_phase(
+            self.netlist,
+            result.faults,
+            seed=self.seed,
+            batch_size=self.batch_size,
+            min_gain=self.min_gain,
+            max_patterns=self.max_random_patterns,
+            state=self._state,
+        )
+        result.tests = patterns
+        result.cubes = [{pi: str(v) for pi, v in p.items()} for p in patterns]
+        result.detected = detected
+        result.phases["random"] = {
+            "patterns_applied": applied,
+            "tests": len(patterns),
+            "detected": len(detected),
+            "time": time.perf_counter() - start,
+        }
+        log.info(
+            "ATPGFlow.run: %d random patterns detected %d/%d faults (%d kept)",
+            applied,
+            len(detected),
+            len(result.faults),
+            len(patterns),
+        )
+
+        start = time.perf_counter()
+        remaining = [f for f in result.faults if f not in detected]
+        deterministic = ParallelATPG(
+            self.netlist, self.state_vars, **self.atpg_options
+        ).run(remaining)
+        offset = len(result.tests)
+        result.tests += deterministic.tests
+        result.cubes += deterministic.cubes
+        for fault, index in deterministic.detected.items():
+            result.detected[fault] = offset + index
+        result.untestable = deterministic.untestable
+        result.aborted = deterministic.aborted
+        result.metrics = deterministic.metrics
+        result.phases["deterministic"] = {
+            "faults": len(remaining),
+            "tests": len(deterministic.tests),
+            "detected": len(deterministic.detected),
+            "time": time.perf_counter() - start,
+        }
+
+        if self.static_compaction:
+            start = time.perf_counter()
+            before = len(result.tests)
+            fill = self.atpg_options.get("fill", 0)
+            compact_result(self.netlist, result, fill, state=self._state)
+            result.phases["compaction"] = {
+                "tests_before": before,
+                "tests": len(result.tests),
+                "time": time.perf_counter() - start,
+            }
+
+        log.info("ATPGFlow.run: %s", result)
+        return result
@@ -0,0 +1,191 @@
+"""Incremental, event-driven implication for PODEM-style test generation."""
+
+import heapq
+
+from . import logic
+from .logic import ZERO, ONE, X, D, DBAR
+from .netlist import GateType
+
+
+class ImplicationEngine:
+    """
+    Keeps the current five-valued (0, 1, x, D, ~D) value of every wire and
+    updates it incrementally. Values are stored as atpg.logic codes and every
+    gate is evaluated with a single lookup in its precomputed table.
+
+    Assigning a primary input only re-evaluates the gates of its fanout cone
+    whose inputs actually changed, in topological order. Every change is pushed
+    on a trail so a search can backtrack to an earlier ``mark()`` in time
+    proportional to the number of changes being undone.
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        fault (Fault): The injected fault, or None for the good machine.
+        values (list): Current logic code of every wire, indexed by wire id.
+            ZERO and ONE are 0 and 1; use value() or values_dict() for the
+            0/1/'x'/'D'/'~D' form.
+        evaluations (int): Number of gate evaluations performed.
+        errors (set): Ids of the wires currently at D or ~D, kept up to date
+            by assign() and undo() so a D-frontier never needs a full scan.
+    """
+
+    def __init__(self, netlist, state_vars=None):
+        self.netlist = netlist
+        self.state_vars = state_vars or {}
+        self.fault = None
+        self.values = []
+        self.errors = set()
+        self.evaluations = 0
+        self._trail = []
+        self._fault_site = -1
+        self._fault_gate = -1
+
+        self._position = [0] * netlist.num_gates
+        for pos, g in enumerate(netlist.order):
+            self._position[g] = pos
+        self._gates = []
+        for g in range(netlist.num_gates):
+            gate_type = netlist.gate_type[g]
+            fanin = tuple(netlist.fanin_of(g))
+            table = None
+            if gate_type < GateType.DFF and len(fanin) <= logic.MAX_TABLE_ARITY:
+                table = logic.gate_table(gate_type, len(fanin))
+            self._gates.append((gate_type, fanin, netlist.gate_output[g], table))
+        self._readers = [
+            tuple(
+                g for g in netlist.fanout_of(w) if netlist.gate_type[g] < GateType.DFF
+            )
+            for w in range(netlist.num_wires)
+        ]
+        self.reset()
+
+    def reset(self, fault=None):
+        """Set every primary input back to 'x' and inject a new fault (or none)."""
+        net = self.netlist
+        self.fault = fault
+        self._trail = []
+        self._fault_site = -1
+        self._fault_gate = -1
+        if fault is not None:
+            self._fault_site = net.wire_index[fault.gate_no]
+            if fault.branch is not None:
+                self._fault_gate = net.gate_index[fault.branch]
+
+        self.values = [X] * net.num_wires
+        for w in net.pis:
+            self.values[w] = self._stem_value(w, X)
+        for g in net.order:
+            out = self._gates[g][2]
+            if out >= 0:
+                self.values[out] = self._evaluate(g)
+        self.errors = {w for w, code in enumerate(self.values) if code >= D}
+
+    def mark(self):
+        """Return a point the engine can be rolled back to with undo()."""
+        return len(self._trail)
+
+    def undo(self, mark):
+        """Restore every wire changed since the given mark."""
+        trail = self._trail
+        values = self.values
+        errors = self.errors
+        while len(trail) > mark:
+            w, old = trail.pop()
+            values[w] = old
+            if old >= D:
+                errors.add(w)
+            else:
+                errors.discard(w)
+
+    def assign(self, wire, value):
+        """
+        Assign a primary input (by name) and imply the consequences.
+
+        Returns:
+            int: Number of wires whose value changed.
+        """
+        w = self.netlist.wire_index[wire]
+        start = len(self._trail)
+        self._set(w, self._stem_value(w, logic.encode(value)))
+        self._propagate(self._readers[w])
+        return len(self._trail) - start
+
+    def value(self, wire):
+        """Current value (0, 1, 'x', 'D' or '~D') of a wire, by name."""
+        return logic.VALUES[self.values[self.netlist.wire_index[wire]]]
+
+    def values_dict(self):
+        """Current value of every wire, keyed by wire name."""
+        return dict(
+            zip(self.netlist.wire_names, (logic.VALUES[c] for c in self.values))
+        )
+
+    def fault_at_po(self):
+        """True if D or ~D has reached a primary output."""
+        values = self.values
+        return any(values[po] >= D for po in self.netlist.pos)
+
+    def _stem_value(self, w, good):
+        """Compose the good value of wire w with a stem fault on it."""
+        if w != self._fault_site or self._fault_gate >= 0:
+            return good
+        return self._faulty(good)
+
+    def _faulty(self, good):
+        if self.fault.stuck_at == 0:
+            return D if good == ONE else good
+        return DBAR if good == ZERO else good
+
+    def _set(self, w, value):
+        old = self.values[w]
+        if old != value:
+            self._trail.append((w, old))
+            self.values[w] = value
+            if value >= D:
+                self.errors.add(w)
+            elif old >= D:
+                self.errors.discard(w)
+            return True
+        return False
+
+    def _evaluate(self, g):
+        gate_type, fanin, out, table = self._gates[g]
+        if gate_type >= GateType.DFF:
+            gate_no = self.netlist.gate_nos[g]
+            return logic.encode(self.state_vars.get(gate_no, {}).get("D", 0))
+
+        values = self.values
+        if g == self._fault_gate:
+            codes = [
+                self._faulty(values[w]) if w == self._fault_site else values[w]
+                for w in fanin
+            ]
+        else:
+            codes = [values[w] for w in fanin]
+        self.evaluations += 1
+
+        if table is None:
+            code = logic.evaluate_codes(gate_type, codes)
+        else:
+            index = 0
+            for c in codes:
+                index = index * logic.NUM_VALUES + c
+            code = table[index]
+        return self._stem_value(out, code)
+
+    def _propagate(self, gates):
+        position = self._position
+        heap = [(position[g], g) for g in gates]
+        heapq.heapify(heap)
+        queued = set(gates)
+
+        while heap:
+            _, g = heapq.heappop(heap)
+            out = self._gates[g][2]
+            if out < 0:
+                continue
+            if self._set(out, self._evaluate(g)):
+                for reader in self._readers[out]:
+                    if reader not in queued:
+                        queued.add(reader)
+                        heapq.heappush(heap, (position[reader], reader))
@@ -0,0 +1,145 @@
+"""Five-valued (0, 1, x, D, ~D) logic encoded as small integer codes.
+
+Every value is a (good machine, faulty machine) pair: 0 = (0, 0), 1 = (1, 1),
+D = (1, 0), ~D = (0, 1), and x when either machine is unknown. The output of
+a gate is computed on both machines separately, so a gate of arity k is fully
+described by a table of 5**k codes which is built once and indexed with
+``table_index``. ZERO and ONE are the codes 0 and 1, so two-valued results
+can be compared with plain ints.
+"""
+
+from functools import lru_cache
+from itertools import product
+
+from .netlist import GateType
+
+ZERO, ONE, X, D, DBAR = range(5)
+NUM_VALUES = 5
+
+# Value of each code in the string/int form used by Parser and ATPG.
+VALUES = (0, 1, "x", "D", "~D")
+
+CODES = {
+    0: ZERO,
+    1: ONE,
+    "0": ZERO,
+    "1": ONE,
+    "x": X,
+    "X": X,
+    "D": D,
+    "~D": DBAR,
+}
+
+# Largest arity with a precomputed 5**k table. Wider gates are evaluated on
+# the fly: evaluate_codes splits every input code into its good and faulty
+# machine bits and evaluates each machine over all inputs at once.
+MAX_TABLE_ARITY = 4
+
+# (good, faulty) machine values of each code; None is unknown.
+_PAIRS = ((0, 0), (1, 1), (None, None), (1, 0), (0, 1))
+_CODE_OF_PAIR = {(0, 0): ZERO, (1, 1): ONE, (1, 0): D, (0, 1): DBAR}
+
+
+def encode(value):
+    """Code of a value (0, 1, '0', '1', 'x', 'D' or '~D')."""
+    try:
+        return CODES[value]
+    except (KeyError, TypeError):
+        raise ValueError(f"logic.encode: Invalid logic value {value!r}") from None
+
+
+def decode(code):
+    """Value of a code, as 0, 1, 'x', 'D' or '~D'."""
+    return VALUES[code]
+
+
+def _and(bits):
+    if 0 in bits:
+        return 0
+    return None if None in bits else 1
+
+
+def _or(bits):
+    if 1 in bits:
+        return 1
+    return None if None in bits else 0
+
+
+def _xor(bits):
+    if None in bits:
+        return None
+    return sum(bits) & 1
+
+
+def _machine(gate_type, bits):
+    """Three-valued (0, 1, None) output of a gate on one machine."""
+    if gate_type == GateType.BUF or gate_type == GateType.NOT:
+        out = bits[0]
+    elif gate_type == GateType.AND or gate_type == GateType.NAND:
+        out = _and(bits)
+    elif gate_type == GateType.OR or gate_type == GateType.NOR:
+        out = _or(bits)
+    elif gate_type == GateType.XOR or gate_type == GateType.XNOR:
+        out = _xor(bits)
+    else:
+        raise ValueError(f"logic: Cannot evaluate {GateType(gate_type).name}")
+
+    if out is not None and gate_type in (
+        GateType.NOT,
+        GateType.NAND,
+        GateType.NOR,
+        GateType.XNOR,
+    ):
+        out = 1 - out
+    return out
+
+
+def _evaluate_pairs(gate_type, codes):
+    good = _machine(gate_type, [_PAIRS[c][0] for c in codes])
+    faulty = _machine(gate_type, [_PAIRS[c][1] for c in codes])
+    return _CODE_OF_PAIR.get((good, faulty), X)
+
+
+@lru_cache(maxsize=None)
+def gate_table(gate_type, arity):
+    """
+    Output code of a gate for every combination of input codes.
+
+    Returns:
+        tuple: 5**arity codes; the entry for inputs (c0, ..., ck-1) is at
+        table_index((c0, ..., ck-1)).
+    """
+    if arity > MAX_TABLE_ARITY:
+        raise ValueError(f"logic.gate_table: No table above arity {MAX_TABLE_ARITY}")
+    gate_type = GateType(gate_type)
+    return tuple(
+        _evaluate_pairs(gate_type, codes)
+        for codes in product(range(NUM_VALUES), repeat=arity)
+    )
+
+
+def table_index(codes):
+    """Index of a combination of input codes in a gate_table."""
+    index = 0
+    for c in codes:
+        index = index * NUM_VALUES + c
+    return index
+
+
+def evaluate_codes(gate_type, codes):
+    """Output code of a gate for a sequence of input codes."""
+    if len(codes) <= MAX_TABLE_ARITY:
+        return gate_table(gate_type, len(codes))[table_index(codes)]
+    return _evaluate_pairs(GateType(gate_type), codes)
+
+
+def combine(good, faulty):
+    """Code with the good machine of code good and the faulty machine of faulty."""
+    return _CODE_OF_PAIR.get((_PAIRS[good][0], _PAIRS[faulty][1]), X)
+
+
+def evaluate(gate_type, values):
+    """Five-valued output of a gate (GateType or name) for a list of values."""
+    if isinstance(gate_type, str):
+        gate_type = GateType[gate_type]
+    return VALUES[evaluate_codes(gate_type, [encode(v) for v in values])]
@@ -0,0 +1,189 @@
+"""Search statistics of the PODEM test generator.
+
+With metrics enabled (ATPG.enable_metrics, or collect_metrics=True on
+ParallelATPG / ATPGFlow), every search records a ``FaultMetrics``: how many
+decisions, backtracks and implications it took, how many gates the
+implication engine evaluated, the time spent in X-path checks, backtraces and
+implication, and why it stopped. ``ATPGMetrics`` gathers the records of a
+run, sums them up and writes them out as JSON or CSV, which gives something
+to go on when tuning backtrack limits and heuristics.
+"""
+
+import csv
+import json
+import os
+
+COUNTERS = ("decisions", "backtracks", "implications", "evaluations")
+PHASES = ("x_path_check", "backtrace", "implication")
+DEAD_ENDS = ("conflict", "no_x_path", "no_input")
+
+
+class FaultMetrics:
+    """
+    Statistics of one search for one fault.
+
+    Attributes:
+        fault (Fault): The targeted fault.
+        status (str): "test", "untestable" or "aborted".
+        abort_reason (str): Why an aborted search gave up ("backtrack_limit"),
+            None otherwise.
+        decisions (int): Primary input assignments tried.
+        backtracks (int): Decisions reversed.
+        implications (int): Wire values changed by implying the decisions.
+        evaluations (int): Gate evaluations of the implication engine.
+        dead_ends (dict): Branches given up by cause: "conflict" (the fault
+            site is at the stuck value), "no_x_path" (no D-frontier gate or
+            fault site has an X-path to a primary output) and "no_input" (no
+            unassigned input left).
+        times (dict): Seconds spent in each of PHASES, and "total".
+    """
+
+    def __init__(self, fault):
+        self.fault = fault
+        self.status = None
+        self.abort_reason = None
+        self.decisions = 0
+        self.backtracks = 0
+        self.implications = 0
+        self.evaluations = 0
+        self.dead_ends = dict.fromkeys(DEAD_ENDS, 0)
+        self.times = dict.fromkeys(PHASES + ("total",), 0.0)
+
+    def to_dict(self):
+        return {
+            "fault": repr(self.fault),
+            "gate_no": self.fault.gate_no,
+            "stuck_at": self.fault.stuck_at,
+            "branch": self.fault.branch,
+            "status": self.status,
+            "abort_reason": self.abort_reason,
+            **{name: getattr(self, name) for name in COUNTERS},
+            "dead_ends": dict(self.dead_ends),
+            "times": dict(self.times),
+        }
+
+    def __repr__(self):
+        return (
+            f"FaultMetrics({self.fault!r}, {self.status}, "
+            f"decisions={self.decisions}, backtracks={self.backtracks}, "
+            f"time={self.times['total'] * 1e3:.2f}ms)"
+        )
+
+
+class ATPGMetrics:
+    """
+    Search statistics of a test generation run.
+
+    Attributes:
+        records (list): FaultMetrics of every search, in the order they ran.
+            A fault can appear more than once, e.g. when dynamic compaction
+            targets it again.
+    """
+
+    def __init__(self, records=()):
+        self.records = list(records)
+
+    def add(self, record):
+        self.records.append(record)
+
+    def extend(self, records):
+        self.records.extend(records)
+
+    def totals(self):
+        """
+        Aggregate counts over all records.
+
+        Returns:
+            dict: Number of searches, searches by status and by abort reason,
+            the sum of every counter, dead end and phase time, and the largest
+            backtrack count of a single search.
+        """
+        totals = {
+            "searches": len(self.records),
+            "status": {},
+            "abort_reasons": {},
+            **dict.fromkeys(COUNTERS, 0),
+            "max_backtracks": 0,
+            "dead_ends": dict.fromkeys(DEAD_ENDS, 0),
+            "times": dict.fromkeys(PHASES + ("total",), 0.0),
+        }
+        for record in self.records:
+            totals["status"][record.status] = totals["status"].get(record.status, 0) + 1
+            if record.abort_reason is not None:
+                reasons = totals["abort_reasons"]
+                reasons[record.abort_reason] = reasons.get(record.abort_reason, 0) + 1
+            for name in COUNTERS:
+                totals[name] += getattr(record, name)
+            totals["max_backtracks"] = max(totals["max_backtracks"], record.backtracks)
+            for cause, count in record.dead_ends.items():
+                totals["dead_ends"][cause] += count
+            for phase, seconds in record.times.items():
+                totals["times"][phase] += seconds
+        return totals
+
+    def hardest(self, count=10, key="backtracks"):
+        """The count records with the largest value of a counter or "time"."""
+        if key == "time":
+            return sorted(self.records, key=lambda r: -r.times["total"])[:count]
+        return sorted(self.records, key=lambda r: -getattr(r, key))[:count]
+
+    def to_dict(self):
+        return {
+            "totals": self.totals(),
+            "faults": [record.to_dict() for record in self.records],
+        }
+
+    def write_json(self, stream):
+        """Write the totals and every record as one JSON document."""
+        json.dump(self.to_dict(), stream, indent=1)
+        stream.write("\n")
+
+    def write_csv(self, stream):
+        """Write one CSV row per record, dead ends and times in own columns."""
+        fields = (
+            ["fault", "gate_no", "stuck_at", "branch", "status", "abort_reason"]
+            + list(COUNTERS)
+            + [f"dead_ends_{cause}" for cause in DEAD_ENDS]
+            + [f"time_{phase}" for phase in PHASES + ("total",)]
+        )
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+        for record in self.records:
+            row = record.to_dict()
+            for cause, count in row.pop("dead_ends").items():
+                row[f"dead_ends_{cause}"] = count
+            for phase, seconds in row.pop("times").items():
+                row[f"time_{phase}"] = seconds
+            writer.writerow(row)
+
+    def save(self, path, fmt=None):
+        """
+        Write the metrics to a file.
+
+        Args:
+            path (str): Output file.
+            fmt (str): "json" or "csv"; inferred from the extension of path
+                when None.
+        """
+        fmt = fmt or os.path.splitext(path)[1].lower().lstrip(".")
+        if fmt not in ("json", "csv"):
+            raise ValueError(
+                f"ATPGMetrics.save: Cannot write format {fmt!r} ({path}), expected json or csv"
+            )
+        with open(path, "w", newline="") as f:
+            if fmt == "json":
+                self.write_json(f)
+            else:
+                self.write_csv(f)
+        return path
+
+    def __len__(self):
+        return len(self.records)
+
+    def __repr__(self):
+        totals = self.totals()
+        return (
+            f"ATPGMetrics(searches={totals['searches']}, status={totals['status']}, "
+            f"decisions={totals['decisions']}, backtracks={totals['backtracks']}, "
+            f"evaluations={totals['evaluations']})"
+        )
@@ -0,0 +1,258 @@
+"""Compiled, integer-indexed representation of a parsed netlist.
+
+The Parser produces dictionaries keyed by gate numbers and wire names which are
+convenient to print but slow to walk. ``Netlist`` interns every wire to a dense
+integer id, stores gate types as a small enum and keeps the fanin/fanout
+connectivity in flat CSR-style arrays, along with a precomputed topological
+order. The simulation, fault simulation and ATPG engines run on this object.
+"""
+
+from array import array
+from collections import deque
+from enum import IntEnum
+
+
+class GateType(IntEnum):
+    BUF = 0
+    NOT = 1
+    AND = 2
+    NAND = 3
+    OR = 4
+    NOR = 5
+    XOR = 6
+    XNOR = 7
+    DFF = 8
+    DFFSR = 9
+
+
+SEQUENTIAL_TYPES = (GateType.DFF, GateType.DFFSR)
+
+
+class Netlist:
+    """
+    Read-only compiled netlist.
+
+    Attributes:
+        wire_names (list): Wire name for each wire id.
+        wire_index (dict): Maps wire names to wire ids.
+        gate_nos (list): Original gate number (gates_map key) for each gate id.
+        gate_index (dict): Maps original gate numbers to gate ids.
+        gate_type (array): GateType code for each gate id.
+        fanin_ptr, fanin (array): CSR arrays, inputs of gate g are
+            fanin[fanin_ptr[g]:fanin_ptr[g + 1]] (wire ids, in pin order).
+        gate_output (array): Output wire id of each gate (-1 if unconnected).
+        driver (array): Driving gate id of each wire (-1 for primary inputs).
+        fanout_ptr, fanout (array): CSR arrays, gates reading wire w are
+            fanout[fanout_ptr[w]:fanout_ptr[w + 1]].
+        pis, pos (array): Wire ids of the primary inputs and outputs.
+        dffs (array): Gate ids of the sequential elements.
+        order (array): Gate ids in topological order. Flip-flop outputs are
+            treated as pseudo primary inputs, so flip-flops come first.
+        level (array): Level of each gate (0 for gates fed only by PIs/FFs).
+        compiled (dict): Functions generated for this netlist by
+            atpg.codegen, by name. Not pickled.
+    """
+
+    def __init__(self):
+        self.wire_names = []
+        self.wire_index = {}
+        self.gate_nos = []
+        self.gate_index = {}
+        self.gate_type = array("b")
+        self.fanin_ptr = array("l", [0])
+        self.fanin = array("l")
+        self.gate_output = array("l")
+        self.driver = array("l")
+        self.fanout_ptr = array("l")
+        self.fanout = array("l")
+        self.pis = array("l")
+        self.pos = array("l")
+        self.dffs = array("l")
+        self.order = array("l")
+        self.level = array("l")
+        self.compiled = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("compiled", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.compiled = {}
+
+    @classmethod
+    def from_maps(cls, gates_map, wires_map, primary_inputs, primary_outputs):
+        """
+        Compile the Parser dictionaries into a Netlist.
+
+        Args:
+            gates_map (dict): Gate number -> {"gate_type", "inputs", "outputs"}.
+            wires_map (dict): Wire name -> {gate number: "input"/"output"}.
+            primary_inputs (list): Primary input wire names.
+            primary_outputs (list): Primary output wire names.
+
+        Returns:
+            Netlist: The compiled netlist.
+        """
+        net = cls()
+
+        for wire in wires_map:
+            net._intern(wire)
+        for wire in list(primary_inputs) + list(primary_outputs):
+            net._intern(wire)
+
+        for gate_no, gate in gates_map.items():
+            try:
+                gate_type = GateType[gate["gate_type"]]
+            except KeyError:
+                raise ValueError(
+                    f"Netlist.from_maps: Unsupported gate type {gate['gate_type']!r} "
+                    f"for gate {gate_no}"
+                ) from None
+
+            net.gate_index[gate_no] = len(net.gate_nos)
+            net.gate_nos.append(gate_no)
+            net.gate_type.append(gate_type)
+            net.fanin.extend(net._intern(wire) for wire in gate["inputs"])
+            net.fanin_ptr.append(len(net.fanin))
+            outputs = gate["outputs"]
+            net.gate_output.append(net._intern(outputs[0]) if outputs else -1)
+            if gate_type in SEQUENTIAL_TYPES:
+                net.dffs.append(len(net.gate_nos) - 1)
+
+        net.pis = array("l", (net.wire_index[w] for w in primary_inputs))
+        net.pos = array("l", (net.wire_index[w] for w in primary_outputs))
+
+        net._build_fanout()
+        net._levelize()
+        return net
+
+    @classmethod
+    def from_parser(cls, parser):
+        """Compile the netlist held by an already parsed Parser."""
+        return cls.from_maps(
+            parser.gates_map, parser.wires_map, parser.INPUTS, parser.OUTPUTS
+        )
+
+    def _intern(self, wire):
+        wire_id = self.wire_index.get(wire)
+        if wire_id is None:
+            wire_id = len(self.wire_names)
+            self.wire_index[wire] = wire_id
+            self.wire_names.append(wire)
+        return wire_id
+
+    def _build_fanout(self):
+        num_wires = len(self.wire_names)
+        driver = array("l", [-1]) * num_wires
+        counts = array("l", [0]) * (num_wires + 1)
+
+        for g in range(self.num_gates):
+            out = self.gate_output[g]
+            if out >= 0:
+                driver[out] = g
+            for i in range(self.fanin_ptr[g], self.fanin_ptr[g + 1]):
+                counts[self.fanin[i] + 1] += 1
+
+        for w in range(num_wires):
+            counts[w + 1] += counts[w]
+
+        fanout = array("l", [0]) * len(self.fanin)
+        fill = array("l", counts[:num_wires])
+        for g in range(self.num_gates):
+            for i in range(self.fanin_ptr[g], self.fanin_ptr[g + 1]):
+                w = self.fanin[i]
+                fanout[fill[w]] = g
+                fill[w] += 1
+
+        self.driver = driver
+        self.fanout_ptr = counts
+        self.fanout = fanout
+
+    def _levelize(self):
+        """Kahn's algorithm over combinational fanin counts."""
+        num_gates = self.num_gates
+        pending = array("l", [0]) * num_gates
+        level = array("l", [0]) * num_gates
+        # Flip-flops go first: their outputs are the pseudo primary inputs
+        # read by gates which may otherwise be scheduled before them.
+        queue = deque(
+            g for g in range(num_gates) if self.gate_type[g] in SEQUENTIAL_TYPES
+        )
+
+        for g in range(num_gates):
+            if self.gate_type[g] in SEQUENTIAL_TYPES:
+                continue
+            count = 0
+            for w in self.fanin_of(g):
+                d = self.driver[w]
+                if d >= 0 and self.gate_type[d] not in SEQUENTIAL_TYPES:
+                    count += 1
+            pending[g] = count
+            if count == 0:
+                queue.append(g)
+
+        order = array("l")
+        while queue:
+            g = queue.popleft()
+            order.append(g)
+            out = self.gate_output[g]
+            # Flip-flop outputs are not counted in the fanin counts above.
+            if out < 0 or self.gate_type[g] in SEQUENTIAL_TYPES:
+                continue
+            for reader in self.fanout_of(out):
+                if self.gate_type[reader] in SEQUENTIAL_TYPES:
+                    continue
+                if level[g] + 1 > level[reader]:
+                    level[reader] = level[g] + 1
+                pending[reader] -= 1
+                if pending[reader] == 0:
+                    queue.append(reader)
+
+        if len(order) != num_gates:
+            looped = [self.gate_nos[g] for g in range(num_gates) if pending[g] > 0]
+            raise ValueError(
+                f"Netlist: Combinational loop detected through gates {looped}"
+            )
+
+        self.order = order
+        self.level = level
+
+    @property
+    def num_gates(self):
+        return len(self.gate_nos)
+
+    @property
+    def num_wires(self):
+        return len(self.wire_names)
+
+    def level_map(self):
+        """
+        Gate numbers by level, {level: [gate numbers]}, each level in
+        topological order (the form of Parser.gate_level_map).
+        """
+        levels = {}
+        for g in self.order:
+            levels.setdefault(self.level[g], []).append(self.gate_nos[g])
+        return dict(sorted(levels.items()))
+
+    def fanin_of(self, gate_id):
+        """Wire ids feeding the gate, in pin order."""
+        return self.fanin[self.fanin_ptr[gate_id] : self.fanin_ptr[gate_id + 1]]
+
+    def fanout_of(self, wire_id):
+        """Gate ids reading the wire."""
+        return self.fanout[self.fanout_ptr[wire_id] : self.fanout_ptr[wire_id + 1]]
+
+    def wire_id(self, name):
+        return self.wire_index[name]
+
+    def is_sequential(self):
+        return len(self.dffs) > 0
+
+    def __repr__(self):
+        return (
+            f"Netlist(gates={self.num_gates}, wires={self.num_wires}, "
+            f"pis={len(self.pis)}, pos={len(self.pos)}, dffs={len(self.dffs)})"
+        )
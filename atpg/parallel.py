@@ -0,0 +1,322 @@
+"""Fault-partitioned test generation on a pool of worker processes."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .atpg import ATPG
+from .compaction import compact_result, dynamic_compaction, fill_cube
+from .faults import generate_faults
+from .faultsim import PPSFPSimulator
+from .metrics import ATPGMetrics
+from .utils import get_logger
+
+log = get_logger("parallel")
+
+# Per-process ATPG instance and secondary fault limit, set by _init_worker.
+_worker_atpg = None
+_worker_secondary = 0
+
+
+def _init_worker(
+    netlist, state_vars, backtrack_limit, secondary_faults=0, collect_metrics=False
+):
+    global _worker_atpg, _worker_secondary
+    _worker_atpg = ATPG.from_netlist(netlist, state_vars)
+    _worker_atpg.backtrack_limit = backtrack_limit
+    _worker_secondary = secondary_faults
+    if collect_metrics:
+        _worker_atpg.enable_metrics()
+
+
+def _generate_batch(batch):
+    """
+    Run test generation for [(fault index, fault)] in the current process.
+
+    Returns:
+        tuple: (results, records). results holds (index, cube, status) per
+        fault, status being "test", "untestable", "aborted" or "merged"
+        (targeted as a secondary fault by an earlier cube of the batch);
+        records holds the FaultMetrics of the batch's searches, if the worker
+        collects metrics.
+    """
+    atpg = _worker_atpg
+    if atpg.metrics is not None:
+        atpg.metrics.records = []
+    merged = set()
+    results = []
+    for pos, (index, fault) in enumerate(batch):
+        if index in merged:
+            results.append((index, None, "merged"))
+            continue
+
+        cube = atpg.generate_test(fault)
+        if cube is None:
+            results.append((index, None, "aborted" if atpg.aborted else "untestable"))
+            continue
+
+        if _worker_secondary:
+            others = [f for i, f in batch[pos + 1 :] if i not in merged]
+            cube, targeted = dynamic_compaction(
+                atpg, cube, others, max_faults=_worker_secondary
+            )
+            targeted = set(targeted)
+            merged.update(i for i, f in batch[pos + 1 :] if f in targeted)
+        results.append((index, cube, "test"))
+    records = atpg.metrics.records if atpg.metrics is not None else []
+    return results, records
+
+
+class ATPGResult:
+    """
+    Test set produced for a fault list.
+
+    Attributes:
+        faults (list): The targeted faults.
+        tests (list): Test vectors ({pi: 0/1}), in the order they were kept.
+        cubes (list): The test cubes ({pi: '0'/'1'/'x'}) the tests were
+            filled from, parallel to tests.
+        detected (dict): Fault -> index of the first test detecting it.
+        untestable (list): Faults proven redundant by the search.
+        aborted (list): Faults given up on after backtrack_limit backtracks.
+        phases (dict): Statistics of each phase of the flow which produced
+            the result, by phase name.
+        metrics (ATPGMetrics): Search statistics of the deterministic
+            phase, when collected (collect_metrics=True), else None.
+    """
+
+    def __init__(self, faults):
+        self.faults = list(faults)
+        self.tests = []
+        self.cubes = []
+        self.detected = {}
+        self.untestable = []
+        self.aborted = []
+        self.phases = {}
+        self.metrics = None
+
+    @property
+    def undetected(self):
+        return [f for f in self.faults if f not in self.detected]
+
+    @property
+    def coverage(self):
+        if not self.faults:
+            return 1.0
+        return len(self.detected) / len(self.faults)
+
+    @property
+    def test_coverage(self):
+        """Coverage of the faults which are not proven untestable."""
+        testable = len(self.faults) - len(self.untestable)
+        if testable <= 0:
+            return 1.0
+        return len(self.detected) / testable
+
+    def __repr__(self):
+        return (
+            f"ATPGResult(tests={len(self.tests)}, "
+            f"detected={len(self.detected)}/{len(self.faults)}, "
+            f"untestable={len(self.untestable)}, aborted={len(self.aborted)}, "
+            f"coverage={self.coverage:.2%})"
+        )
+
+
+class ParallelATPG:
+    """
+    Runs single-fault test generation over a fault list on several processes.
+
+    The netlist is pickled once per worker through the pool initializer, and
+    each worker keeps its own ATPG instance for the whole run. Faults are
+    handled in rounds of round_size, split into tasks of batch_size. After
+    every round the new test cubes are filled, fault simulated together with
+    PPSFP against all undetected faults, and accepted in fault-list order: a
+    cube is only kept when it detects a fault no earlier test detects. Faults
+    detected this way are dropped before the next round.
+
+    The round structure does not depend on the number of workers or on the
+    order in which tasks finish, so the test set is the same for any
+    max_workers (max_workers=0 runs everything in-process).
+
+    With secondary_faults, each new cube is extended by dynamic compaction
+    with up to that many other faults of its batch; with static_compaction,
+    the final test set is merged and reduced by reverse-order fault
+    simulation (see atpg.compaction). With collect_metrics, the search
+    statistics of every worker are gathered in ATPGResult.metrics (see
+    atpg.metrics).
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        state_vars (dict): Flip-flop state used by the workers' ATPG.
+        max_workers (int): Worker processes (defaults to the CPU count).
+        batch_size (int): Faults per task.
+        round_size (int): Faults generated between two fault dropping passes.
+        backtrack_limit (int): Backtracks allowed per fault.
+        fill (int): Value given to 'x' inputs of the test cubes.
+        secondary_faults (int): Dynamic compaction limit per cube (0 = off).
+        static_compaction (bool): Compact the final test set.
+        collect_metrics (bool): Record per-fault search statistics.
+    """
+
+    def __init__(
+        self,
+        netlist,
+        state_vars=None,
+        max_workers=None,
+        batch_size=16,
+        round_size=256,
+        backtrack_limit=1000,
+        fill=0,
+        secondary_faults=0,
+        static_compaction=False,
+        collect_metrics=False,
+    ):
+        self.netlist = netlist
+        self.state_vars = state_vars or {}
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self.batch_size = batch_size
+        self.round_size = round_size
+        self.backtrack_limit = backtrack_limit
+        self.fill = fill
+        self.secondary_faults = secondary_faults
+        self.static_compaction = static_compaction
+        self.collect_metrics = collect_metrics
+
+        self._state = {
+            gate_no: int(saved.get("D", 0))
+            for gate_no, saved in self.state_vars.items()
+        }
+        self._faultsim = PPSFPSimulator(netlist, state=self._state)
+
+    def run(self, faults=None):
+        """
+        Generate a test set for the fault list.
+
+        Args:
+            faults (list): Faults to target; the collapsed fault list from
+                generate_faults by default.
+
+        Returns:
+            ATPGResult: The tests and the status of every fault.
+        """
+        if faults is None:
+            faults = generate_faults(self.netlist)
+        result = ATPGResult(faults)
+        if self.collect_metrics:
+            result.metrics = ATPGMetrics()
+        index_of = {fault: i for i, fault in enumerate(result.faults)}
+        pending = list(result.faults)
+        if not pending:
+            return result
+
+        with self._executor() as executor:
+            while pending:
+                chunk, pending = pending[: self.round_size], pending[self.round_size :]
+                batches = [
+                    [(index_of[f], f) for f in chunk[k : k + self.batch_size]]
+                    for k in range(0, len(chunk), self.batch_size)
+                ]
+                if executor is None:
+                    outcomes = [_generate_batch(b) for b in batches]
+                else:
+                    outcomes = list(executor.map(_generate_batch, batches))
+
+                cubes = []
+                merged = []
+                for batch, records in outcomes:
+                    if result.metrics is not None:
+                        result.metrics.extend(records)
+                    for index, cube, status in batch:
+                        fault = result.faults[index]
+                        if status == "test":
+                            cubes.append((index, cube))
+                        elif status == "merged":
+                            merged.append(fault)
+                        elif status == "aborted":
+                            result.aborted.append(fault)
+                        else:
+                            result.untestable.append(fault)
+                cubes.sort(key=lambda item: item[0])
+
+                self._accept(result, chunk, cubes, pending)
+                # Secondary targets are detected by their cube unless it was
+                # dropped; those go back to the queue as primary targets.
+                pending = [f for f in merged if f not in result.detected] + pending
+                pending = [f for f in pending if f not in result.detected]
+                log.info(
+                    "ParallelATPG.run: %d tests, %d/%d faults detected, %d left",
+                    len(result.tests),
+                    len(result.detected),
+                    len(result.faults),
+                    len(pending),
+                )
+
+        if self.static_compaction:
+            compact_result(self.netlist, result, self.fill, self._state)
+        if result.metrics is not None:
+            log.info("ParallelATPG.run: %r", result.metrics)
+        return result
+
+    def _executor(self):
+        if self.max_workers and self.max_workers > 1:
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=self._worker_args(),
+            )
+        _init_worker(*self._worker_args())
+        return _InProcess()
+
+    def _worker_args(self):
+        return (
+            self.netlist,
+            self.state_vars,
+            self.backtrack_limit,
+            self.secondary_faults,
+            self.collect_metrics,
+        )
+
+    def _accept(self, result, chunk, cubes, pending):
+        """Fault simulate the cubes of a round and keep the useful ones."""
+        if not cubes:
+            return
+        vectors = [fill_cube(cube, self.fill) for _, cube in cubes]
+        untestable = set(result.untestable)
+        # Faults aborted in earlier rounds may still be caught by new tests.
+        candidates = [
+            f
+            for f in dict.fromkeys(result.aborted + chunk + pending)
+            if f not in result.detected and f not in untestable
+        ]
+        masks = self._faultsim.detection_masks(vectors, candidates)
+
+        for k, (index, cube) in enumerate(cubes):
+            bit = 1 << k
+            hits = [f for f, bits in masks.items() if bits & bit]
+            if not hits:
+                continue
+            test_index = len(result.tests)
+            result.tests.append(vectors[k])
+            result.cubes.append(cube)
+            for f in hits:
+                result.detected[f] = test_index
+                del masks[f]
+
+        for index, _ in cubes:
+            fault = result.faults[index]
+            if fault not in result.detected:
+                # The filled cube does not detect its own target; count the
+                # fault as aborted rather than keep a wrong test.
+                result.aborted.append(fault)
+
+        # Faults given up on by the search may still be caught by other tests.
+        result.aborted = [f for f in result.aborted if f not in result.detected]
+
+
+class _InProcess:
+    """Stand-in for an executor when running without worker processes."""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
@@ -1,138 +1,162 @@
 """Module which return the levelised gate level map along with the gates map and wires map"""
 
+import logging
 import os
 import re
-import time
-import sys
 from enum import Enum
-from collections import defaultdict
-import json
-import textwrap
-import copy
 
-from .utils import print_structured_design, GIN, ERR
+from .utils import print_structured_design, get_logger, GIN, ERR
+from . import logic
+from .netlist import Netlist, GateType, SEQUENTIAL_TYPES
+from .cache import NetlistCache, CACHED_FIELDS, file_digest
+from .batch import simulate_file
 
 
 gate = Enum("GATE", ["BUF", "NAND", "NOR", "OR", "NOT", "DFF", "DFFSR"])
 
-comment_re = r"\(\*.*?\*\)"
-comment2_re = r"\/\*.*?\*\/"
-module_re = r"module\s+(\w+)\s*\(([^)]+)\);"
-wire_re = r"wire\s+([\w\d_]+)\s*;"
-input_re = r"input\s*(\[\d+:\d+\])?\s*([\w\d_]+)\s*;"
-output_re = r"output\s*(\[\d+:\d+\])?\s*([\w\d_]+)\s*;"
-assign_re = r"assign\s+(\w+)\s*=\s*(\w+);"
-input_output_re = re.compile(r"(input|output|inout)\s*(?:\[\d+:\d+\])?\s*(\w+);")
-multival_wire = r"wire\s*\[(\d+):\d+\]\s*(\w+)\s*;"
-multival_input = r"input\s*\[(\d+):\d+\]\s*(\w+)\s*;"
-multival_output = r"output\s*\[(\d+):\d+\]\s*(\w+)\s*;"
+COMBINATIONAL_GATES = {t.name: t for t in GateType if t not in SEQUENTIAL_TYPES}
+
+# One alternation per token class; block comments and attributes may span lines
+# and are tracked by tokenize() itself.
+token_re = re.compile(
+    r"""
+    (?P<space>\s+)
+  | (?P<comment>//.*)
+  | (?P<open>/\*|\(\*)
+  | (?P<escaped>\\\S+)
+  | (?P<name>[A-Za-z_][\w$]*)
+  | (?P<number>\d*'[sS]?[bBoOdDhH][0-9a-fA-FxXzZ_?]+|\d+)
+  | (?P<punct>[()\[\]{};,.:=\#])
+    """,
+    re.VERBOSE,
+)
+
+
+def tokenize(lines):
+    """
+    Yield the tokens of a Verilog netlist from an iterable of lines.
+
+    Comments and (* attributes *) are dropped, including ones spanning several
+    lines, and escaped identifiers are returned without their leading backslash.
+    """
+    closing = None
+    for line_no, line in enumerate(lines, 1):
+        pos = 0
+        end = len(line)
+        while pos < end:
+            if closing:
+                idx = line.find(closing, pos)
+                if idx < 0:
+                    break
+                pos = idx + 2
+                closing = None
+                continue
+
+            match = token_re.match(line, pos)
+            if not match:
+                raise ValueError(
+                    f"tokenize: Unexpected character {line[pos]!r} on line {line_no}"
+                )
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == "space" or kind == "comment":
+                continue
+            if kind == "open":
+                closing = "*/" if match.group() == "/*" else "*)"
+            elif kind == "escaped":
+                yield match.group()[1:]
+            else:
+                yield match.group()
+
+
+log = get_logger("parser")
+
+
+class TokenStream:
+    """Token iterator with one token of lookahead."""
+
+    def __init__(self, tokens):
+        self._tokens = iter(tokens)
+        self._peeked = None
+
+    def peek(self):
+        if self._peeked is None:
+            self._peeked = next(self._tokens, None)
+        return self._peeked
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise ValueError("Parser: Unexpected end of file")
+        self._peeked = None
+        return token
+
+    def expect(self, expected):
+        token = self.next()
+        if token != expected:
+            raise ValueError(f"Parser: Expected {expected!r}, found {token!r}")
+        return token
+
+    def skip_past(self, stop):
+        while self.next() != stop:
+            pass
 
 
 class Parser:
-    def __init__(self, filepath) -> None:
+    def __init__(self, filepath, cache_dir=None) -> None:
         self.file_path = filepath
+        self.cache = NetlistCache(cache_dir) if cache_dir else None
         self.INPUTS = {}
         self.OUTPUTS = {}
         self.gates_level_map = {}
         self.wires_map = {}
         self.state_vars = {}  # Store the variables for DFF/DFFSR.
+        self.netlist = None  # Compiled integer-indexed netlist.
 
     def read_parse_file(self):
-        filepath = self.file_path
-        gate_level_map = {}
-        INPUTS = []
-        OUTPUTS = []
-        with open(filepath, "r") as f:
-            code = []
-            lines = f.readlines()
-
-            code_str = ""
-            for line in lines:
-                line = re.sub(comment_re, " ", line).strip()
-                line = re.sub(comment2_re, " ", line).strip()
-                line = line.strip()
-                if line:
-                    code_str += line
-                    code_str += "\n"
-                    code.append(line)
-
-            with open(f"{filepath}.cleaned", "w") as f:
-                f.write(code_str)
-                print(GIN, "Parser.read_parse_file: Successfully cleaned the code.")
-
-            # ------------------- PARSING STARTS ----------------------------
-
-            module_name = ""
-            wires = []
-            inputs = []
-            outputs = []
-            wires_dict = {}
-
-            for i, line in enumerate(code):
-                if "module" in line:
-                    module_match = re.search(module_re, line)
-                    if module_match and module_name == "":
-                        module_name = module_match.group(1)
-                        top_level_params = module_match.group(2).split(",")
-
-                if re.search(wire_re, line):
-                    wire_name = re.search(wire_re, line).group(1)
-                    wires.append(wire_name)
-                    wires_dict[wire_name] = {}
-
-                io_match = input_output_re.search(line)
-                if io_match:
-                    io_type = io_match.group(1)
-                    io_name = io_match.group(2)
-                    if io_type == "input":
-                        if io_name not in inputs and io_name not in wires_dict:
-                            inputs.append(io_name)
-                            if io_name not in INPUTS:
-                                INPUTS.append(io_name)
-                            wires_dict[io_name] = {}
-                    elif io_type == "output":
-                        if io_name not in outputs and io_name not in wires_dict:
-                            outputs.append(io_name)
-
-                            if io_name not in OUTPUTS:
-                                OUTPUTS.append(io_name)
-
-                            wires_dict[io_name] = {}
-                    elif io_type == "inout":
-                        wires_dict[io_name] = {}
-
-                # TODO: deal with this later
-                # assign_match = re.search(assign_re, line)
-                # if assign_match:
-                #     lhs = assign_match.group(1)
-                #     rhs = assign_match.group(2)
-                #     wires_dict[lhs] = {"type": "assign", "source": rhs}
-
-            # --------------- Code cleaned and Wires dict initiated.
-
-            gates_map, wires_map = self.parse_gates(code, wires_dict, self.state_vars)
-            self.gates_map = gates_map
-            self.wires_map = wires_map
-            self.INPUTS = INPUTS
-            self.OUTPUTS = OUTPUTS
-
-            # print("-" * 10, "GATES_MAP", "_" * 10)
-            # print(json.dumps(self.gates_map, indent=4))
-            # print("-" * 10, "WIRES_MAP", "_" * 10)
-            # print(json.dumps(self.wires_map, indent=4))
-
-            copied_wires_map = copy.deepcopy(wires_map)
-            copied_gates_map = copy.deepcopy(gates_map)
-            self.gate_level_map = self.level_graph(
-                inputs, outputs, copied_gates_map, copied_wires_map
+        """
+        Parse the Yosys netlist in a single streaming pass, then levelize it.
+
+        With a cache_dir, the parsed and levelized design is reloaded from the
+        cache when the file contents are unchanged, and stored otherwise.
+        """
+        digest = None
+        if self.cache:
+            digest = file_digest(self.file_path)
+            fields = self.cache.load(self.file_path, digest)
+            if fields is not None:
+                for name in CACHED_FIELDS:
+                    setattr(self, name, fields[name])
+                log.info("Parser.read_parse_file: Loaded the netlist from cache.")
+                return
+
+        with open(self.file_path, "r") as f:
+            gates_map, wires_map, INPUTS, OUTPUTS = self.parse_tokens(
+                TokenStream(tokenize(f)), self.state_vars
             )
+        log.info("Parser.read_parse_file: Successfully parsed the netlist.")
+
+        self.gates_map = gates_map
+        self.wires_map = wires_map
+        self.INPUTS = INPUTS
+        self.OUTPUTS = OUTPUTS
 
-            print_structured_design(
-                gates_map=gates_map,
-                wires_map=wires_map,
-                level_map=self.gate_level_map,
+        self.netlist = Netlist.from_parser(self)
+        self.gate_level_map = self.netlist.level_map()
+
+        if self.cache:
+            self.cache.store(
+                self.file_path,
+                {name: getattr(self, name) for name in CACHED_FIELDS},
+                digest,
             )
 
+        print_structured_design(
+            gates_map=gates_map,
+            wires_map=wires_map,
+            level_map=self.gate_level_map,
+        )
+
     def simulate(self):
         print(GIN, "Parser.simulate: Starting Simulation.")
         print("   ", "==" * 20)
@@ -142,10 +166,10 @@ class Parser:
         print("     HELP: Enter q to exit")
         print("   ", "==" * 20, end="\n\n")
 
-        dict_inputs = {}
         if not self.INPUTS:
-            print(ERR, "Invalid Graph. Error parsing the graph.")
+            log.error("Invalid Graph. Error parsing the graph.")
         while True:
+            dict_inputs = {}
             for i in self.INPUTS:
                 inp = input(f"Enter the input {i}: ")
                 if inp.lower() == "q":
@@ -156,145 +180,153 @@ class Parser:
                 else:
                     dict_inputs[i] = inp
 
-            self.evaluate_graph(
+            wires = self.evaluate_graph(
                 self.INPUTS,
                 self.gate_level_map,
                 self.gates_map,
                 dict_inputs,
                 self.state_vars,
             )
+            for o in self.OUTPUTS:
+                print(f"      {o} :   {wires[o]}")
+
+    def simulate_batch(
+        self,
+        vector_path,
+        output_path,
+        fmt=None,
+        include_inputs=True,
+        vcd_path=None,
+        vcd_signals=None,
+    ):
+        """
+        Simulate a stimulus file without prompting and stream the primary
+        output values of every cycle to a CSV or JSON-lines file, and
+        optionally the value changes of selected wires to a VCD file.
+
+        Flip-flop state is carried across cycles, starting from a copy of
+        state_vars. See atpg.batch.read_vectors for the stimulus format and
+        atpg.vcd.select_signals for picking VCD signals.
+
+        Returns:
+            int: Number of vectors simulated.
+        """
+        return simulate_file(
+            self,
+            vector_path,
+            output_path,
+            fmt=fmt,
+            include_inputs=include_inputs,
+            vcd_path=vcd_path,
+            vcd_signals=vcd_signals,
+        )
 
     @staticmethod
-    def parse_gates(code, wires_dict, state_vars):
-        gate_re = re.compile(r"(\w+)\s+(\w+)\s*\(\s*")
-        wire_re = re.compile(r"\.(\w+)\((\w+)\)")
+    def parse_tokens(tokens, state_vars):
+        """
+        Build the gates and wires maps from a TokenStream.
 
+        Handles port/wire declarations (including [msb:lsb] ranges, expanded to
+        one wire per bit), `assign a = b;` (as a BUF) and cell instances with
+        named connections, which may span any number of lines. Gate inputs are
+        stored in the pin order of get_gate_params.
+
+        Returns:
+            tuple: (gates_map, wires_map, INPUTS, OUTPUTS)
+        """
         gates_dict = {}
-        j = 0
-        for i, line in enumerate(code):
-            gate_match = gate_re.search(line)
-            if gate_match:
-                gate_type = gate_match.group(1)
-                gate_no = j
-                j += 1
-
-                if gate_no in gates_dict:
-                    gate_no += 1
-                    j += 1
-
-                if gate_type == "module":
-                    continue
-                gates_dict[gate_no] = {
-                    "gate_type": gate_type,
-                    "inputs": [],
-                    "outputs": [],
-                }
-
-                gate_params = get_gate_params(gate_type)
-
-                for j in range(i + 1, len(code)):
-                    wire_match = wire_re.search(code[j])
-
-                    if wire_match:
-                        pin_type = wire_match.group(1)
-                        wire_name = wire_match.group(2)
-
-                        if pin_type in gate_params["inputs"]:
-                            gates_dict[gate_no]["inputs"].append(wire_name)
-                            wires_dict[wire_name][str(gate_no)] = "input"
-                        elif pin_type in gate_params["outputs"]:
-                            gates_dict[gate_no]["outputs"].append(wire_name)
-                            wires_dict[wire_name][str(gate_no)] = "output"
-
-                    if ");" in code[j]:
-                        break
-                # NOTE: The inputs for DFF and DFFSR where order is considered for diff inputs pins
-                # C = 0 and D= 0 for DFF initial states.
-                # inputs[1] = D
-                if gate_type == "DFF" or "DFFSR":
-                    state_vars[gate_no] = {"C": 0, "D": 0}
-
-        return gates_dict, wires_dict
+        wires_dict = {}
+        INPUTS = []
+        OUTPUTS = []
+
+        def add_gate(gate_type, pins):
+            gate_no = len(gates_dict)
+            gate_params = get_gate_params(gate_type)
+            gates_dict[gate_no] = {
+                "gate_type": gate_type,
+                "inputs": [pins[p] for p in gate_params["inputs"] if p in pins],
+                "outputs": [pins[p] for p in gate_params["outputs"] if p in pins],
+            }
+            for wire_name in gates_dict[gate_no]["inputs"]:
+                wires_dict.setdefault(wire_name, {})[str(gate_no)] = "input"
+            for wire_name in gates_dict[gate_no]["outputs"]:
+                wires_dict.setdefault(wire_name, {})[str(gate_no)] = "output"
+
+            # NOTE: The inputs for DFF and DFFSR where order is considered for diff inputs pins
+            # C = 0 and D= 0 for DFF initial states.
+            # inputs[1] = D
+            if gate_type in ("DFF", "DFFSR"):
+                state_vars[gate_no] = {"C": 0, "D": 0}
+
+        while tokens.peek() is not None:
+            token = tokens.next()
+
+            if token == "module":
+                tokens.skip_past(";")
+
+            elif token == "endmodule":
+                continue
+
+            elif token in ("input", "output", "inout", "wire", "reg"):
+                for wire_name in read_declaration(tokens):
+                    wires_dict.setdefault(wire_name, {})
+                    if token == "input" and wire_name not in INPUTS:
+                        INPUTS.append(wire_name)
+                    elif token == "output" and wire_name not in OUTPUTS:
+                        OUTPUTS.append(wire_name)
+
+            elif token == "assign":
+                lhs = read_net(tokens)
+                tokens.expect("=")
+                rhs = read_net(tokens)
+                tokens.expect(";")
+                add_gate("BUF", {"A": rhs, "Y": lhs})
+
+            elif token in (";", "endcase", "end"):
+                continue
+
+            else:
+                # Cell instance: TYPE [#(...)] NAME ( .PIN(NET), ... );
+                if tokens.peek() == "#":
+                    tokens.next()
+                    skip_balanced(tokens)
+                tokens.next()  # instance name
+                tokens.expect("(")
+                pins = {}
+                while tokens.peek() != ")":
+                    if tokens.peek() == ",":
+                        tokens.next()
+                        continue
+                    tokens.expect(".")
+                    pin = tokens.next()
+                    tokens.expect("(")
+                    if tokens.peek() != ")":
+                        pins[pin] = read_net(tokens)
+                    tokens.expect(")")
+                tokens.expect(")")
+                tokens.expect(";")
+                add_gate(token, pins)
+
+        return gates_dict, wires_dict, INPUTS, OUTPUTS
 
     @staticmethod
     def level_graph(inputs, outputs, gates_dict, wires_map):
-        """Returns the levelized map"""
-        # FIXME: Bug: Doesn't work where primary outputs are inputs to other gates.
-        gate_level_map = {}
-
-        print(GIN, "Parser.level_graph: LEVELISING THE GATES.")
-        level = 0
-        while outputs:
-            # Iterate over a copy of inputs to avoid modifying the list while iterating
-            inputs_to_delete = []
-            for input_wire in list(inputs):
-                del_input = True
-
-                if level not in gate_level_map:
-                    gate_level_map[level] = []
-
-                gates_to_remove = []
-
-                for gate in wires_map[input_wire]:
-                    if wires_map[input_wire][gate] == "input":
-                        gate_inputs = gates_dict[int(gate)]["inputs"]
-
-                        if all(gate_input in inputs for gate_input in gate_inputs):
-                            if level == 0:
-                                if int(gate) not in gate_level_map[level]:
-                                    gate_level_map[level].append(int(gate))
-
-                                    gates_to_remove.append(gate)
-
-                            else:
-                                if (
-                                    int(gate) not in gate_level_map[level - 1]
-                                    and int(gate) not in gate_level_map[level]
-                                ):
-                                    gate_level_map[level].append(int(gate))
-
-                                    gates_to_remove.append(gate)
-                        else:
-                            del_input = False
-
-                for gate in gates_to_remove:
-                    wires_map[input_wire].pop(gate)
-
-                # Only remove the input wire if all conditions are met
-                if del_input:
-                    inputs_to_delete.append(input_wire)
-
-                # Check if the input_wire is also an output and handle it
-                if input_wire in outputs:
-                    # print("Matched Output:", input_wire)
-                    outputs.remove(input_wire)
-
-            for input in inputs_to_delete:
-                inputs.remove(input)
-
-            # Prepare new inputs for the next level
-            new_inputs = []
-            level += 1
-
-            if outputs:
-                for gate in gate_level_map[level - 1]:
-                    gate_dict = gates_dict[gate]
-                    # print("Processing Gate:", gate, gate_dict)
-                    for output_wire in gate_dict["outputs"]:
-                        if output_wire in outputs:
-                            outputs.remove(output_wire)
-                        elif (
-                            output_wire not in new_inputs and output_wire not in inputs
-                        ):
-                            new_inputs.append(output_wire)
-
-            inputs.extend(new_inputs)
-
-        print(GIN, "Parser.level_graph : Gates Levelised Successfully.")
-        # non_idented_output = json.dumps(gate_level_map, indent=4)
-        # print(textwrap.indent(non_idented_output, "        "))
-        # print("===" * 10)
-
+        """
+        Returns the levelized map {level: [gate numbers]}.
+
+        The levels come from Netlist, whose Kahn levelization runs over the
+        combinational fanin counts in O(gates + pins). A gate is at level 0
+        when all of its inputs are primary inputs (or undriven), otherwise at
+        1 + the highest level among its driving gates. Flip-flops are placed
+        at level 0 and their outputs act as pseudo primary inputs, so
+        sequential feedback does not create a cycle. A purely combinational
+        loop raises a ValueError naming the gates involved.
+        """
+        log.info("Parser.level_graph: LEVELISING THE GATES.")
+        gate_level_map = Netlist.from_maps(
+            gates_dict, wires_map, inputs, outputs
+        ).level_map()
+        log.info("Parser.level_graph : Gates Levelised Successfully.")
         return gate_level_map
 
     @staticmethod
@@ -348,38 +380,48 @@ class Parser:
 
         HEIGHT = 2 * max_height
 
+        trace = log.isEnabledFor(logging.DEBUG)
+        clocked = []
         for level in gate_level_graph:
             for gate in gate_level_graph[level]:
                 gi = gates_dict[gate]["inputs"]
                 go = gates_dict[gate]["outputs"]
                 gtype = gates_dict[gate]["gate_type"]
 
-                gi_values = [wires[i] for i in gi]
-
                 if go[0] in wires:
                     # NOTE: Values are preset for the Fault Simulation and hene don't change
                     continue
 
                 if not (gtype == "DFF" or gtype == "DFFSR"):
+                    gi_values = [wires[i] for i in gi]
                     wires[go[0]] = Parser.evaluate_gate(gtype, gi_values)
 
                 else:
-                    if gtype == "DFF":
-                        c_prev = state_vars[gate]["C"]
-                        d_prev = state_vars[gate]["D"]
-                        c = gi_values[0]
-                        state_vars[gate]["C"] = c
-                        d = gi_values[1]
-                        if c and not c_prev:
-                            state_vars[gate]["D"] = d
-                            wires[go[0]] = d_prev
-                        else:
-                            wires[go[0]] = d_prev
-                    if gtype == "DummyGate":
-                        # Assign a dummy value to the output so that it doesn't interfere during PODEM.
-                        wires[go[0]] = "S"
-
-                print("   " * (level + 2) + f"{go[0]} :   {wires[go[0]]}")
+                    # Flip-flops sit at level 0 and drive the stored state; D is
+                    # captured below, once the logic feeding it has settled.
+                    wires[go[0]] = state_vars[gate]["D"]
+                    clocked.append(gate)
+
+                if trace:
+                    log.debug("   " * (level + 2) + f"{go[0]} :   {wires[go[0]]}")
+
+        # Inputs are in get_gate_params pin order: C, D and, for DFFSR, the
+        # active-high S (preset, wins over R) and R (clear).
+        for gate in clocked:
+            gi_values = [wires[i] for i in gates_dict[gate]["inputs"]]
+            state = state_vars[gate]
+            c_prev = state["C"]
+            c = gi_values[0]
+            state["C"] = c
+            if gates_dict[gate]["gate_type"] == "DFFSR" and len(gi_values) >= 4:
+                if gi_values[2] == 1:
+                    state["D"] = 1
+                    continue
+                if gi_values[3] == 1:
+                    state["D"] = 0
+                    continue
+            if c == 1 and c_prev != 1:
+                state["D"] = gi_values[1]
         # print(wires)
         return wires
 
@@ -388,209 +430,27 @@ class Parser:
         """
         Evaluate the output of a single gate given its inputs.
         Also, supports the 'x', 'D', or '~D' state for the input.
-        """
-
-        for i in range(len(inputs)):
-            try:
-                inputs[i] = int(inputs[i])
-            except ValueError:
-                continue
-
-        if gate == "BUF":
-            return inputs[0]
-
-        elif gate == "NOT":
-            if inputs[0] == "x" or inputs[0] == "D" or inputs[0] == "~D":
-                return inversion[inputs[0]]
-
-            return 1 - inputs[0]
-
-        elif gate == "NAND":
-            if inputs[0] == 0 or inputs[1] == 0:
-                return 1
-
-            elif inputs[0] == "x" or inputs[1] == "x":
-                return "x"
 
-            elif (inputs[0] == "D" and inputs[1] == "~D") or (
-                inputs[0] == "~D" and inputs[1] == "D"
-            ):
-                return 1
-
-            elif inputs[0] == "D" or inputs[1] == "D":
-                return "~D"
-            elif inputs[0] == "~D" or inputs[1] == "~D":
-                return "D"
-
-            return 1 - (inputs[0] & inputs[1])
-
-        elif gate == "AND":
-            if inputs[0] == 0 or inputs[1] == 0:
-                return 0
-
-            elif inputs[0] == "x" or inputs[1] == "x":
-                return "x"
-
-            elif (inputs[0] == "D" and inputs[1] == "~D") or (
-                inputs[0] == "~D" and inputs[1] == "D"
-            ):
-                return 0
-
-            elif inputs[0] == "D" or inputs[1] == "D":
-                return "D"
-
-            elif inputs[0] == "~D" or inputs[1] == "~D":
-                return "~D"
-            return inputs[0] & inputs[1]
-
-        elif gate == "OR":
-            if inputs[0] == 1 or inputs[1] == 1:
-                return 1
-
-            elif inputs[0] == "x" or inputs[1] == "x":
-                return "x"
-            elif (inputs[0] == "D" and inputs[1] == "~D") or (
-                inputs[0] == "~D" and inputs[1] == "D"
-            ):
-                return 1
-
-            elif inputs[0] == "~D" or inputs[1] == "~D":
-                return "~D"
-
-            elif inputs[0] == "D" or inputs[1] == "x":
-                return "D"
-
-            return 0
-
-        elif gate == "XOR":
-            if inputs[0] == "x" or inputs[1] == "x":
-                return "x"
-
-            elif inputs[0] == "D":
-                if inputs[1] == 1:
-                    return "~D"
-                elif inputs[1] == 0:
-                    return "D"
-                elif inputs[1] == "D":
-                    return 0
-                elif inputs[1] == "~D":
-                    return 1
-            elif inputs[1] == "D":
-                if inputs[0] == 1:
-                    return "~D"
-                elif inputs[0] == 0:
-                    return "D"
-                elif inputs[0] == "D":
-                    return 0
-                elif inputs[0] == "~D":
-                    return 1
-
-            elif inputs[1] == "~D":
-                if inputs[0] == 1:
-                    return "D"
-                elif inputs[0] == 0:
-                    return "~D"
-                elif inputs[0] == "D":
-                    return 1
-                elif inputs[0] == "~D":
-                    return 0
-
-            elif inputs[0] == "~D":
-                if inputs[1] == 1:
-                    return "D"
-                elif inputs[1] == 0:
-                    return "~D"
-                elif inputs[1] == "D":
-                    return 1
-                elif inputs[1] == "~D":
-                    return 0
-
-            return inputs[0] ^ inputs[1]
-
-        # modification: Added XNOR gate
-        elif gate == "XNOR":
-            if inputs[0] == "x" or inputs[1] == "x":
-                return "x"
-
-            elif inputs[0] == "D":
-                if inputs[1] == 1:
-                    return "D"
-                elif inputs[1] == 0:
-                    return "~D"
-                elif inputs[1] == "D":
-                    return 1
-                elif inputs[1] == "~D":
-                    return 0
-            elif inputs[1] == "D":
-                if inputs[0] == 1:
-                    return "D"
-                elif inputs[0] == 0:
-                    return "~D"
-                elif inputs[0] == "D":
-                    return 1
-                elif inputs[0] == "~D":
-                    return 0
-
-            elif inputs[1] == "~D":
-                if inputs[0] == 1:
-                    return "~D"
-                elif inputs[0] == 0:
-                    return "D"
-                elif inputs[0] == "D":
-                    return 0
-                elif inputs[0] == "~D":
-                    return 1
-
-            elif inputs[0] == "~D":
-                if inputs[1] == 1:
-                    return "~D"
-                elif inputs[1] == 0:
-                    return "D"
-                elif inputs[1] == "D":
-                    return 0
-                elif inputs[1] == "~D":
-                    return 1
-
-            return 1 - (inputs[0] ^ inputs[1])
-
-        elif gate == "NOR":
-            if inputs[0] == 1 or inputs[1] == 1:
-                return 0
-
-            elif inputs[0] == "x" or inputs[1] == "x":
-                return "x"
-
-            elif (inputs[0] == "D" and inputs[1] == "~D") or (
-                inputs[0] == "~D" and inputs[1] == "D"
-            ):
-                return 0
-            ## modification: this case was added as this no longer remains D-frontier
-
-            elif inputs[0] == "~D" or inputs[1] == "~D":
-                return "D"
-            # modification: this case was NOT considered earlier
-
-            elif inputs[0] == "D" or inputs[1] == "x":
-                return "~D"
-            # modification: this case was NOT considered earlier
-
-            return 1 - (inputs[0] | inputs[1])
-            # modification: return ((1-inputs[0])&(1-inputs[1]))
+        Combinational gates are looked up in the five-valued tables of
+        atpg.logic, for any number of inputs.
+        """
+        if gate in COMBINATIONAL_GATES:
+            return logic.evaluate(COMBINATIONAL_GATES[gate], inputs)
 
-        elif gate == "DFF":
+        if gate == "DFF":
             # Assuming the DFF captures input "D" on clock "C" (rising edge), we'll just return the value of D
             return inputs[1]
 
         elif gate == "DFFSR":
             # DFFSR logic, simplified for now:
-            # S = Set, R = Reset, C = Clock, D = Data
-            # We'll assume positive logic, i.e., S=1 sets Q to 1, R=1 resets Q to 0, otherwise D determines Q.
-            if inputs[1] == 1:
+            # Pins are C, D, S, R (get_gate_params order), active-high:
+            # S=1 sets Q to 1, R=1 resets Q to 0, otherwise D determines Q.
+            if inputs[2] == 1:
                 return 1
-            elif inputs[2] == 1:
+            elif inputs[3] == 1:
                 return 0
             else:
-                return inputs[3]
+                return inputs[1]
 
         else:
             raise ValueError(f"Unknown gate: {gate}")
@@ -604,6 +464,65 @@ class Parser:
         return False
 
 
+def read_range(tokens):
+    """Read an optional [msb:lsb] range, returning the bit indices or None."""
+    if tokens.peek() != "[":
+        return None
+    tokens.expect("[")
+    msb = int(tokens.next())
+    tokens.expect(":")
+    lsb = int(tokens.next())
+    tokens.expect("]")
+    step = -1 if msb >= lsb else 1
+    return range(msb, lsb + step, step)
+
+
+def read_declaration(tokens):
+    """Read the wire names of an input/output/wire declaration up to ';'."""
+    if tokens.peek() in ("wire", "reg"):
+        tokens.next()
+    bits = read_range(tokens)
+    names = []
+    while True:
+        name = tokens.next()
+        if bits is None:
+            names.append(name)
+        else:
+            names.extend(f"{name}[{bit}]" for bit in bits)
+        if tokens.next() == ";":
+            return names
+
+
+def read_net(tokens):
+    """Read a net reference: a name or a single bit select."""
+    name = tokens.next()
+    if name == "{":
+        raise ValueError("Parser: Concatenations are not supported in netlists")
+    if name[0].isdigit() or name[0] == "'":
+        raise ValueError(
+            f"Parser: Constant {name!r} is not supported; drive the pin from a "
+            "primary input instead"
+        )
+    if tokens.peek() == "[":
+        tokens.expect("[")
+        bit = tokens.next()
+        tokens.expect("]")
+        name = f"{name}[{bit}]"
+    return name
+
+
+def skip_balanced(tokens):
+    """Skip a parenthesised group, e.g. a parameter list."""
+    tokens.expect("(")
+    depth = 1
+    while depth:
+        token = tokens.next()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+
+
 def get_gate_params(gate):
     """Returns a dict containing the inputs and outputs of the gate."""
     gate_params = {
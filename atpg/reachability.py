@@ -0,0 +1,54 @@
+"""Precomputed structural reachability of a compiled Netlist."""
+
+from .netlist import GateType
+
+
+class ReachabilityIndex:
+    """
+    Bitset index of which primary inputs and outputs each wire is connected to.
+
+    Bit i of ``pi_support[w]`` is set when PI i (netlist.pis order) is in the
+    combinational fanin cone of wire w, and bit j of ``po_reach[w]`` when PO j
+    (netlist.pos order) is in its fanout cone, w itself included. Both are
+    built in one topological pass each. Flip-flops end the cones: their
+    outputs are pseudo primary inputs and their pins are not followed.
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        pi_support (list): PI bitset per wire id.
+        po_reach (list): PO bitset per wire id.
+    """
+
+    def __init__(self, netlist):
+        self.netlist = netlist
+
+        num_wires = netlist.num_wires
+        combinational = [
+            g for g in netlist.order if netlist.gate_type[g] < GateType.DFF
+        ]
+
+        support = [0] * num_wires
+        for i, w in enumerate(netlist.pis):
+            support[w] |= 1 << i
+        for g in combinational:
+            out = netlist.gate_output[g]
+            if out < 0:
+                continue
+            bits = 0
+            for w in netlist.fanin_of(g):
+                bits |= support[w]
+            support[out] |= bits
+
+        reach = [0] * num_wires
+        for j, w in enumerate(netlist.pos):
+            reach[w] |= 1 << j
+        for g in reversed(combinational):
+            out = netlist.gate_output[g]
+            if out < 0:
+                continue
+            bits = reach[out]
+            for w in netlist.fanin_of(g):
+                reach[w] |= bits
+
+        self.pi_support = support
+        self.po_reach = reach
@@ -0,0 +1,312 @@
+"""Full-scan test generation.
+
+In a full-scan design every flip-flop can be loaded and unloaded through a
+scan chain, so test generation only has to deal with the combinational logic
+between flip-flops: each flip-flop output Q becomes a pseudo primary input,
+controlled by the scan load, and the value it would capture becomes a pseudo
+primary output, observed by the scan unload. This replaces the time-frame
+expansion of SequentialATPG with a single combinational problem.
+
+For a DFFSR the captured value is S | (~R & D), which the scan view models
+with three extra gates so that a set or reset asserted by a test is taken into
+account.
+"""
+
+from collections import defaultdict
+
+from .faults import generate_faults
+from .flow import ATPGFlow
+from .netlist import GateType, Netlist, SEQUENTIAL_TYPES
+from .seqsim import SequentialSimulator
+from .simulator import BitParallelSimulator, pack_vectors
+from .utils import get_logger
+
+log = get_logger("scan")
+
+
+def find_clocks(netlist):
+    """
+    Primary inputs clocking the flip-flops of a netlist.
+
+    Raises:
+        ValueError: If a clock pin is not driven by a primary input, or a
+            clock input also drives a data pin or combinational logic.
+
+    Returns:
+        list: Clock input names, in flip-flop order.
+    """
+    pis = set(netlist.pis)
+    clocks = []
+    for g in netlist.dffs:
+        c = netlist.fanin_of(g)[0]
+        if c not in pis:
+            raise ValueError(
+                f"find_clocks: The clock of flip-flop {netlist.gate_nos[g]} "
+                f"({netlist.wire_names[c]}) is not a primary input"
+            )
+        if netlist.wire_names[c] not in clocks:
+            clocks.append(netlist.wire_names[c])
+
+    for name in clocks:
+        w = netlist.wire_id(name)
+        for reader in netlist.fanout_of(w):
+            if reader not in netlist.dffs or w in netlist.fanin_of(reader)[1:]:
+                raise ValueError(
+                    f"find_clocks: Clock {name} also drives gate "
+                    f"{netlist.gate_nos[reader]} as data"
+                )
+    return clocks
+
+
+class ScanPattern:
+    """
+    One scan test.
+
+    Chain values are strings of 0/1 in chain order, cell 0 being the cell
+    next to the scan input; the value of the last cell is shifted in first
+    and the value of cell 0 comes out last.
+
+    Attributes:
+        load (str): Values shifted into the chain.
+        inputs (dict): Values forced on the primary inputs ({pi: 0/1}).
+        outputs (dict): Expected primary outputs before the capture clock.
+        unload (str): Expected chain contents after the capture clock.
+    """
+
+    def __init__(self, load, inputs, outputs, unload):
+        self.load = load
+        self.inputs = inputs
+        self.outputs = outputs
+        self.unload = unload
+
+    def procedure(self, clocks):
+        """
+        The tester steps applying the pattern.
+
+        Returns:
+            list: (operation, argument) tuples: ("load", chain values),
+            ("force", inputs), ("measure", outputs), ("pulse", clocks) and
+            ("unload", expected chain values).
+        """
+        return [
+            ("load", self.load),
+            ("force", self.inputs),
+            ("measure", self.outputs),
+            ("pulse", list(clocks)),
+            ("unload", self.unload),
+        ]
+
+    def __repr__(self):
+        return f"ScanPattern(load={self.load}, unload={self.unload})"
+
+
+class FullScanATPG:
+    """
+    Combinational test generation for a full-scan sequential netlist.
+
+    Clock pins must be driven directly by primary inputs used for nothing
+    else; those inputs are pulsed once per pattern to capture and are left out
+    of the scan view. Set and reset pins are ordinary inputs of the scan view.
+
+    Attributes:
+        netlist (Netlist): The sequential circuit.
+        chain (list): Flip-flop gate numbers in scan chain order.
+        clocks (list): Primary inputs clocking the flip-flops.
+        view (Netlist): The combinational scan view.
+        pseudo_pis (list): Scan view input of each chain cell (its Q wire,
+            or None when Q is unconnected).
+        pseudo_pos (list): Scan view output of each chain cell (the value
+            it captures).
+        pi_names (list): Primary inputs of the original circuit which remain
+            inputs of the scan view.
+        po_names (list): Primary outputs of the original circuit.
+        flow_options (dict): Keyword arguments for ATPGFlow.
+    """
+
+    def __init__(self, netlist, chain=None, **flow_options):
+        self.netlist = netlist
+        self.flow_options = flow_options
+
+        flops = [netlist.gate_nos[g] for g in netlist.dffs]
+        if chain is None:
+            chain = flops
+        elif sorted(chain) != sorted(flops):
+            raise ValueError(
+                f"FullScanATPG: The scan chain must hold each flip-flop {flops} once"
+            )
+        self.chain = list(chain)
+        self.clocks = find_clocks(netlist)
+
+        self.pi_names = [
+            netlist.wire_names[w]
+            for w in netlist.pis
+            if netlist.wire_names[w] not in self.clocks
+        ]
+        self.po_names = [netlist.wire_names[w] for w in netlist.pos]
+        self.view, self._synthetic = self._build_view()
+        log.info(
+            "FullScanATPG: %d scan cells, clocks %s, scan view %r",
+            len(self.chain),
+            self.clocks,
+            self.view,
+        )
+
+    def _build_view(self):
+        """Compile the scan view, returning it and its synthetic wires."""
+        netlist = self.netlist
+        names = netlist.wire_names
+        gates_map = {}
+        wires_map = defaultdict(dict)
+
+        def add_gate(gate_no, gate_type, inputs, output):
+            gates_map[gate_no] = {
+                "gate_type": gate_type,
+                "inputs": inputs,
+                "outputs": [output] if output is not None else [],
+            }
+            for wire in inputs:
+                wires_map[wire][str(gate_no)] = "input"
+            if output is not None:
+                wires_map[output][str(gate_no)] = "output"
+
+        for g in netlist.order:
+            if netlist.gate_type[g] in SEQUENTIAL_TYPES:
+                continue
+            out = netlist.gate_output[g]
+            add_gate(
+                netlist.gate_nos[g],
+                GateType(netlist.gate_type[g]).name,
+                [names[w] for w in netlist.fanin_of(g)],
+                names[out] if out >= 0 else None,
+            )
+
+        next_gate_no = max(netlist.gate_nos, default=-1) + 1
+        synthetic = set()
+        self.pseudo_pis = []
+        self.pseudo_pos = []
+        for gate_no in self.chain:
+            g = netlist.gate_index[gate_no]
+            out = netlist.gate_output[g]
+            pins = [names[w] for w in netlist.fanin_of(g)]
+            self.pseudo_pis.append(names[out] if out >= 0 else None)
+
+            if netlist.gate_type[g] == GateType.DFFSR and len(pins) >= 4:
+                _, d, s, r = pins[:4]
+                not_r, hold, captured = (
+                    f"{gate_no}$not_r",
+                    f"{gate_no}$hold",
+                    f"{gate_no}$capture",
+                )
+                add_gate(next_gate_no, "NOT", [r], not_r)
+                add_gate(next_gate_no + 1, "AND", [d, not_r], hold)
+                add_gate(next_gate_no + 2, "OR", [s, hold], captured)
+                next_gate_no += 3
+                synthetic.update((not_r, hold, captured))
+                self.pseudo_pos.append(captured)
+            else:
+                self.pseudo_pos.append(pins[1])
+
+        pis = self.pi_names + [q for q in self.pseudo_pis if q is not None]
+        pos = list(dict.fromkeys(self.po_names + self.pseudo_pos))
+        view = Netlist.from_maps(gates_map, dict(wires_map), pis, pos)
+        return view, synthetic
+
+    def faults(self):
+        """
+        Collapsed stuck-at faults of the scan view, without the faults on the
+        wires added to model set/reset; the pin faults of the flip-flops are
+        kept as faults on the scan view gates reading those pins.
+        """
+        return [
+            f for f in generate_faults(self.view) if f.gate_no not in self._synthetic
+        ]
+
+    def run(self, faults=None):
+        """
+        Generate tests on the scan view with ATPGFlow.
+
+        Returns:
+            ATPGResult: Tests over the scan view inputs; see scan_patterns.
+        """
+        if faults is None:
+            faults = self.faults()
+        return ATPGFlow(self.view, **self.flow_options).run(faults)
+
+    def scan_patterns(self, tests):
+        """
+        Turn scan view tests into scan load / capture / unload patterns.
+
+        Args:
+            tests (list): {input: 0/1} vectors over the scan view inputs,
+                e.g. ATPGResult.tests.
+
+        Returns:
+            list: ScanPattern per test, with the fault-free responses.
+        """
+        simulator = BitParallelSimulator(self.view)
+        responses = simulator.simulate(tests)
+        patterns = []
+        for k, test in enumerate(tests):
+            load = "".join(
+                str(test.get(q, 0)) if q is not None else "0" for q in self.pseudo_pis
+            )
+            inputs = {pi: test[pi] for pi in self.pi_names}
+            outputs = {po: responses[po] >> k & 1 for po in self.po_names}
+            unload = "".join(str(responses[w] >> k & 1) for w in self.pseudo_pos)
+            patterns.append(ScanPattern(load, inputs, outputs, unload))
+        return patterns
+
+    def verify(self, patterns, width=64):
+        """
+        Apply scan patterns to the sequential circuit with SequentialSimulator.
+
+        The chain is loaded directly into the flip-flop state, the inputs are
+        forced, the clocks pulsed once and the outputs and state compared to
+        the pattern.
+
+        Returns:
+            list: Indexes of the patterns whose responses do not match.
+        """
+        simulator = SequentialSimulator(self.netlist, width, clocks=self.clocks)
+        cell_of = {gate_no: i for i, gate_no in enumerate(self.chain)}
+        cells = [cell_of[gate_no] for gate_no in simulator.gate_nos]
+        pos = list(zip(self.po_names, self.netlist.pos))
+        failing = []
+
+        for start in range(0, len(patterns), width):
+            batch = patterns[start : start + width]
+            mask = (1 << len(batch)) - 1
+            simulator.state = [
+                sum(int(p.load[cell]) << k for k, p in enumerate(batch)) for cell in cells
+            ]
+            simulator.clock = [0] * len(cells)
+            pi_words = pack_vectors([p.inputs for p in batch], simulator.pi_names)
+            values = simulator.step_words(pi_words, mask)
+
+            for k, pattern in enumerate(batch):
+                ok = all(values[w] >> k & 1 == pattern.outputs[po] for po, w in pos)
+                ok = ok and all(
+                    str(simulator.state[i] >> k & 1) == pattern.unload[cell]
+                    for i, cell in enumerate(cells)
+                )
+                if not ok:
+                    failing.append(start + k)
+        return failing
+
+    def write_patterns(self, stream, patterns):
+        """
+        Write scan patterns as a text test procedure, one step per line.
+        """
+        cells = " ".join(
+            f"{gate_no}({q})" for gate_no, q in zip(self.chain, self.pseudo_pis)
+        )
+        stream.write(f"# scan chain (scan-in first): {cells}\n")
+        stream.write(f"# clocks: {' '.join(self.clocks)}\n")
+        for index, pattern in enumerate(patterns):
+            stream.write(f"pattern {index}\n")
+            for operation, argument in pattern.procedure(self.clocks):
+                if isinstance(argument, dict):
+                    argument = " ".join(f"{k}={v}" for k, v in argument.items())
+                elif isinstance(argument, list):
+                    argument = " ".join(argument)
+                stream.write(f"  {operation} {argument}\n")
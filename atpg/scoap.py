@@ -0,0 +1,152 @@
+"""SCOAP controllability and observability measures."""
+
+import math
+
+from .logic import ZERO, ONE, X
+from .netlist import GateType
+
+
+class Scoap:
+    """
+    SCOAP testability measures of every wire.
+
+    Attributes:
+        cc0 (list): Combinational 0-controllability per wire id.
+        cc1 (list): Combinational 1-controllability per wire id.
+        co (list): Combinational observability per wire id (math.inf when no
+            primary output can observe the wire).
+    """
+
+    def __init__(self, cc0, cc1, co):
+        self.cc0 = cc0
+        self.cc1 = cc1
+        self.co = co
+
+    def controllability(self, wire_id, value):
+        """Cost of setting a wire to 0 or 1."""
+        return self.cc1[wire_id] if int(value) else self.cc0[wire_id]
+
+    def backtrace_step(self, gate_type, fanin, values, value):
+        """
+        One step of a PODEM backtrace through a combinational gate.
+
+        Follows an unassigned input: the easiest one to control (lowest CC)
+        when a single controlling input sets the output, or the hardest one
+        when every input must be non-controlling, so that conflicts surface
+        early.
+
+        Args:
+            gate_type (GateType): Type of the gate driving the objective.
+            fanin (sequence): Input wire ids of the gate.
+            values (sequence): Current logic code of every wire, by wire id.
+            value (int): Value (0 or 1) wanted on the gate output.
+
+        Returns:
+            tuple: (input wire id, value wanted on it), or None if no
+            unassigned input can justify the value.
+        """
+        unassigned = [i for i in fanin if values[i] == X]
+        if not unassigned:
+            return None
+
+        if gate_type == GateType.BUF:
+            return unassigned[0], value
+        if gate_type == GateType.NOT:
+            return unassigned[0], 1 - value
+        if gate_type in (GateType.XOR, GateType.XNOR):
+            known = [values[i] for i in fanin if values[i] != X]
+            if any(k not in (ZERO, ONE) for k in known):
+                return None
+            parity = sum(known) % 2
+            w = min(unassigned, key=lambda i: min(self.cc0[i], self.cc1[i]))
+            return w, value ^ parity ^ (gate_type == GateType.XNOR)
+
+        controlling = 0 if gate_type in (GateType.AND, GateType.NAND) else 1
+        if gate_type in (GateType.NAND, GateType.NOR):
+            value = 1 - value
+        if value == controlling:
+            return min(unassigned, key=lambda i: self.controllability(i, value)), value
+        return max(unassigned, key=lambda i: self.controllability(i, value)), value
+
+
+def _xor_controllability(cc0, cc1, fanin):
+    zero, one = cc0[fanin[0]], cc1[fanin[0]]
+    for w in fanin[1:]:
+        zero, one = (
+            min(zero + cc0[w], one + cc1[w]),
+            min(zero + cc1[w], one + cc0[w]),
+        )
+    return zero, one
+
+
+def compute_scoap(netlist):
+    """
+    Compute CC0/CC1 in topological order and CO in reverse topological order.
+
+    Primary inputs and flip-flop outputs (pseudo primary inputs) have a
+    controllability of 1; primary outputs have an observability of 0.
+
+    Returns:
+        Scoap: The measures, indexed by wire id.
+    """
+    num_wires = netlist.num_wires
+    cc0 = [1] * num_wires
+    cc1 = [1] * num_wires
+
+    combinational = [
+        g
+        for g in netlist.order
+        if netlist.gate_type[g] < GateType.DFF and netlist.gate_output[g] >= 0
+    ]
+
+    for g in combinational:
+        gate_type = netlist.gate_type[g]
+        fanin = netlist.fanin_of(g)
+        out = netlist.gate_output[g]
+
+        if gate_type == GateType.BUF:
+            zero, one = cc0[fanin[0]], cc1[fanin[0]]
+        elif gate_type == GateType.NOT:
+            zero, one = cc1[fanin[0]], cc0[fanin[0]]
+        elif gate_type in (GateType.AND, GateType.NAND):
+            zero = min(cc0[w] for w in fanin)
+            one = sum(cc1[w] for w in fanin)
+            if gate_type == GateType.NAND:
+                zero, one = one, zero
+        elif gate_type in (GateType.OR, GateType.NOR):
+            zero = sum(cc0[w] for w in fanin)
+            one = min(cc1[w] for w in fanin)
+            if gate_type == GateType.NOR:
+                zero, one = one, zero
+        else:
+            zero, one = _xor_controllability(cc0, cc1, fanin)
+            if gate_type == GateType.XNOR:
+                zero, one = one, zero
+
+        cc0[out] = zero + 1
+        cc1[out] = one + 1
+
+    co = [math.inf] * num_wires
+    for w in netlist.pos:
+        co[w] = 0
+
+    for g in reversed(combinational):
+        gate_type = netlist.gate_type[g]
+        fanin = netlist.fanin_of(g)
+        out_co = co[netlist.gate_output[g]]
+        if out_co == math.inf:
+            continue
+
+        for k, w in enumerate(fanin):
+            others = fanin[:k] + fanin[k + 1 :]
+            if gate_type in (GateType.AND, GateType.NAND):
+                cost = sum(cc1[o] for o in others)
+            elif gate_type in (GateType.OR, GateType.NOR):
+                cost = sum(cc0[o] for o in others)
+            elif gate_type in (GateType.XOR, GateType.XNOR):
+                cost = sum(min(cc0[o], cc1[o]) for o in others)
+            else:
+                cost = 0
+            co[w] = min(co[w], out_co + cost + 1)
+
+    return Scoap(cc0, cc1, co)
@@ -0,0 +1,190 @@
+"""Cycle-based two-valued simulation of sequential circuits.
+
+``SequentialSimulator`` keeps the state of the circuit as one packed word per
+flip-flop (in Netlist.dffs order) instead of the Parser's state_vars dict over
+every gate, and evaluates the combinational logic of each cycle with the
+compiled evaluator of atpg.codegen. Bit ``k`` of every word belongs to an
+independent stimulus stream, so up to ``width`` streams are simulated together
+for the cost of one.
+
+A cycle follows Parser.evaluate_graph: the combinational logic is evaluated
+with the current flip-flop outputs, then every flip-flop is clocked with the
+values of its C, D (and S, R) pins in that cycle.
+"""
+
+from itertools import zip_longest
+
+from .codegen import compile_netlist
+from .netlist import GateType
+from .simulator import pack_vectors
+
+_END = object()
+
+
+class SequentialSimulator:
+    """
+    Simulates many clock cycles of one or more stimulus streams.
+
+    Flip-flops capture D on a rising edge of C, i.e. when C is 1 in a cycle
+    and was not in the previous one. A DFFSR is preset by an active-high S and
+    cleared by an active-high R whatever the clock does; S wins when both are
+    set.
+
+    Clock inputs listed in clocks are not part of the vectors: they are
+    pulsed every cycle, so each vector is applied with exactly one active
+    edge on those clocks.
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        width (int): Maximum number of streams simulated together.
+        clocks (tuple): Primary inputs pulsed every cycle.
+        pi_names (list): Primary inputs given by the vectors, in order.
+        po_names (list): Primary outputs, in netlist order.
+        gate_nos (list): Gate number of each flip-flop, in netlist.dffs order.
+        state (list): Packed output value of each flip-flop.
+        clock (list): Packed value of each flip-flop's C pin in the previous
+            cycle.
+        cycles (int): Cycles simulated since the last reset.
+    """
+
+    def __init__(self, netlist, width=64, state_vars=None, clocks=()):
+        self.netlist = netlist
+        self.width = width
+        self.clocks = tuple(clocks)
+        self.mask = (1 << width) - 1
+        self._function = compile_netlist(netlist, state_words=True)
+
+        all_pis = [netlist.wire_names[w] for w in netlist.pis]
+        unknown = [c for c in self.clocks if c not in all_pis]
+        if unknown:
+            raise ValueError(
+                f"SequentialSimulator: Clocks {unknown} are not primary inputs"
+            )
+        self.pi_names = [pi for pi in all_pis if pi not in self.clocks]
+        self.po_names = [netlist.wire_names[w] for w in netlist.pos]
+        self._data_slots = [i for i, pi in enumerate(all_pis) if pi not in self.clocks]
+        self._clock_slots = [i for i, pi in enumerate(all_pis) if pi in self.clocks]
+        pulsed = {netlist.pis[i] for i in self._clock_slots}
+
+        self.gate_nos = [netlist.gate_nos[g] for g in netlist.dffs]
+        self._flops = []
+        for g in netlist.dffs:
+            fanin = tuple(netlist.fanin_of(g))
+            has_set_reset = netlist.gate_type[g] == GateType.DFFSR and len(fanin) >= 4
+            self._flops.append((fanin, has_set_reset, fanin[0] in pulsed))
+
+        self.reset(state_vars)
+
+    def reset(self, state_vars=None):
+        """
+        Load the same state into every stream.
+
+        Args:
+            state_vars (dict): {gate_no: {"C": value, "D": value}} as kept by
+                the Parser; missing flip-flops start at 0.
+        """
+        state_vars = state_vars or {}
+        self.state = []
+        self.clock = []
+        for gate_no in self.gate_nos:
+            saved = state_vars.get(gate_no, {})
+            self.state.append(self.mask if str(saved.get("D", 0)) == "1" else 0)
+            self.clock.append(self.mask if str(saved.get("C", 0)) == "1" else 0)
+        self.cycles = 0
+
+    def state_vars(self, stream=0):
+        """
+        Current state of one stream in the Parser's state_vars format.
+
+        Returns:
+            dict: {gate_no: {"C": 0/1, "D": 0/1}}.
+        """
+        return {
+            gate_no: {"C": clock >> stream & 1, "D": state >> stream & 1}
+            for gate_no, state, clock in zip(self.gate_nos, self.state, self.clock)
+        }
+
+    def step_words(self, pi_words, mask=None):
+        """
+        Simulate one cycle and clock the flip-flops.
+
+        Args:
+            pi_words (list): One packed word per input of pi_names.
+            mask (int): Streams in use; all width streams by default.
+
+        Returns:
+            list: Packed value of every wire during the cycle, before the
+            clock edge, indexed by wire id.
+        """
+        if mask is None:
+            mask = self.mask
+        if self._clock_slots:
+            words = [mask] * len(self.netlist.pis)
+            for slot, word in zip(self._data_slots, pi_words):
+                words[slot] = word
+            pi_words = words
+        values = self._function(pi_words, mask, self.state)
+
+        state = self.state
+        clock = self.clock
+        for i, (fanin, has_set_reset, pulsed) in enumerate(self._flops):
+            c = values[fanin[0]]
+            edge = c if pulsed else c & ~clock[i]
+            new = (state[i] & ~edge) | (values[fanin[1]] & edge)
+            if has_set_reset:
+                new = (new & ~values[fanin[3]]) | values[fanin[2]]
+            state[i] = new & mask
+            clock[i] = 0 if pulsed else c
+        self.cycles += 1
+        return values
+
+    def iter_cycles(self, streams):
+        """
+        Simulate independent streams of vectors side by side.
+
+        Args:
+            streams (list): Up to width iterables of vectors (see
+                pack_vectors), all of the same length. Stream k is simulated
+                in bit k.
+
+        Yields:
+            tuple: (cycle, {po: packed word}) for every cycle.
+        """
+        if len(streams) > self.width:
+            raise ValueError(
+                f"SequentialSimulator: {len(streams)} streams, width is {self.width}"
+            )
+        mask = (1 << len(streams)) - 1
+        pos = self.netlist.pos
+        for cycle, vectors in enumerate(zip_longest(*streams, fillvalue=_END)):
+            if any(v is _END for v in vectors):
+                raise ValueError(
+                    f"SequentialSimulator: Streams end at different cycles ({cycle})"
+                )
+            values = self.step_words(pack_vectors(vectors, self.pi_names), mask)
+            yield cycle, {po: values[w] for po, w in zip(self.po_names, pos)}
+
+    def run(self, vectors):
+        """
+        Simulate one stream of vectors, one per cycle.
+
+        Returns:
+            list: {po: 0/1} for every cycle.
+        """
+        return [
+            {po: word & 1 for po, word in outputs.items()}
+            for _, outputs in self.iter_cycles([vectors])
+        ]
+
+    def run_streams(self, streams):
+        """
+        Simulate independent streams of vectors bit-parallel.
+
+        Returns:
+            list: For every stream, the list of {po: 0/1} of each cycle.
+        """
+        results = [[] for _ in streams]
+        for _, outputs in self.iter_cycles(streams):
+            for k, cycles in enumerate(results):
+                cycles.append({po: word >> k & 1 for po, word in outputs.items()})
+        return results
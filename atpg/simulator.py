@@ -0,0 +1,358 @@
+"""Bit-parallel two-valued logic simulation on a compiled Netlist.
+
+Each wire holds a Python int whose bit ``i`` is the value of the wire for
+pattern ``i`` of the current batch, so every gate is evaluated once per batch
+with bitwise operations instead of once per vector.
+
+``NumpySimulator`` is an optional backend for very large pattern sets which
+keeps one ``uint64`` array per wire; it needs NumPy to be installed.
+"""
+
+from .netlist import GateType
+from .codegen import compile_netlist
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def pack_vectors(vectors, pi_names):
+    """
+    Pack a batch of input vectors into one word per primary input.
+
+    Args:
+        vectors (list): Each vector is a dict {pi: 0/1}, a sequence of 0/1 values
+            in primary input order, or a string such as "101".
+        pi_names (list): Primary input names, in netlist order.
+
+    Returns:
+        list: One int per primary input, bit i holding the value in vectors[i].
+    """
+    words = [0] * len(pi_names)
+    for bit, vector in enumerate(vectors):
+        if isinstance(vector, dict):
+            values = [vector[name] for name in pi_names]
+        else:
+            values = vector
+        if len(values) != len(pi_names):
+            raise ValueError(
+                f"pack_vectors: Expected {len(pi_names)} values, got {len(values)}"
+            )
+        for i, value in enumerate(values):
+            value = str(value)
+            if value == "1":
+                words[i] |= 1 << bit
+            elif value != "0":
+                raise ValueError(
+                    f"pack_vectors: Two-valued simulation needs 0/1, got {value!r} "
+                    f"for {pi_names[i]}"
+                )
+    return words
+
+
+def evaluate_word(gate_type, words, mask):
+    """Evaluate one gate over a batch of packed patterns."""
+    if gate_type == GateType.BUF:
+        return words[0]
+    if gate_type == GateType.NOT:
+        return ~words[0] & mask
+
+    result = words[0]
+    if gate_type == GateType.AND or gate_type == GateType.NAND:
+        for w in words[1:]:
+            result &= w
+        return result if gate_type == GateType.AND else ~result & mask
+    if gate_type == GateType.OR or gate_type == GateType.NOR:
+        for w in words[1:]:
+            result |= w
+        return result if gate_type == GateType.OR else ~result & mask
+    if gate_type == GateType.XOR or gate_type == GateType.XNOR:
+        for w in words[1:]:
+            result ^= w
+        return result if gate_type == GateType.XOR else ~result & mask
+    raise ValueError(f"evaluate_word: Cannot evaluate {GateType(gate_type).name}")
+
+
+def next_flop_state(gate_type, clock_prev, state, inputs):
+    """
+    Clock a single flip-flop for one cycle with two-valued inputs.
+
+    Inputs are in get_gate_params pin order: C, D for DFF and C, D, S, R for
+    DFFSR. D is captured on a rising edge of C (as in Parser.evaluate_graph);
+    for DFFSR an active-high S presets and an active-high R clears the state.
+
+    Returns:
+        tuple: (clock, state) to remember for the next cycle.
+    """
+    clock = inputs[0]
+    if gate_type == GateType.DFFSR and len(inputs) >= 4:
+        if inputs[2]:
+            return clock, 1
+        if inputs[3]:
+            return clock, 0
+    if clock and not clock_prev:
+        state = inputs[1]
+    return clock, state
+
+
+class BitParallelSimulator:
+    """
+    Simulates many input vectors at once by packing them into machine words.
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        width (int): Number of patterns packed per word (batch size).
+        state (dict): Flip-flop output value (0/1) by gate number. Flip-flop
+            outputs are treated as pseudo primary inputs holding this value for
+            every pattern in the batch; missing entries default to 0.
+        compiled (bool): Evaluate batches with the straight-line function
+            generated by atpg.codegen instead of the interpreted gate loop.
+    """
+
+    def __init__(self, netlist, width=64, state=None, compiled=True):
+        self.netlist = netlist
+        self.width = width
+        self.state = state or {}
+        self.compiled = compiled
+        self._compiled = compile_netlist(netlist) if compiled else None
+        self.pi_names = [netlist.wire_names[w] for w in netlist.pis]
+        self.po_names = [netlist.wire_names[w] for w in netlist.pos]
+
+        # Flatten the netlist into (type, fanin, output) tuples in topological
+        # order so the hot loop does no array slicing or attribute lookups.
+        self._schedule = [
+            (
+                netlist.gate_type[g],
+                tuple(netlist.fanin_of(g)),
+                netlist.gate_output[g],
+                netlist.gate_nos[g],
+            )
+            for g in netlist.order
+            if netlist.gate_output[g] >= 0
+        ]
+
+    def simulate_words(self, pi_words, mask):
+        """
+        Run one batch through the circuit.
+
+        Args:
+            pi_words (list): One packed word per primary input.
+            mask (int): Bits in use, e.g. (1 << n) - 1 for n patterns.
+
+        Returns:
+            list: Packed value of every wire, indexed by wire id.
+        """
+        if self._compiled is not None:
+            return self._compiled(pi_words, mask, self.state)
+
+        values = [0] * self.netlist.num_wires
+        for w, word in zip(self.netlist.pis, pi_words):
+            values[w] = word & mask
+
+        for gate_type, fanin, out, gate_no in self._schedule:
+            if gate_type >= GateType.DFF:
+                values[out] = mask if self.state.get(gate_no, 0) else 0
+            else:
+                values[out] = evaluate_word(gate_type, [values[w] for w in fanin], mask)
+        return values
+
+    def iter_batches(self, vectors):
+        """
+        Simulate a (possibly unbounded) stream of vectors one batch at a time.
+
+        Yields:
+            tuple: (offset, count, {po: packed word}) for every batch, where bit i
+            of a word is the output for vector offset + i.
+        """
+        batch = []
+        offset = 0
+        for vector in vectors:
+            batch.append(vector)
+            if len(batch) == self.width:
+                yield offset, len(batch), self._run_batch(batch)
+                offset += len(batch)
+                batch = []
+        if batch:
+            yield offset, len(batch), self._run_batch(batch)
+
+    def simulate(self, vectors):
+        """
+        Simulate a list or stream of vectors.
+
+        Returns:
+            dict: {po: int}, where bit i is the value of the output for vector i.
+        """
+        results = {po: 0 for po in self.po_names}
+        for offset, _, po_words in self.iter_batches(vectors):
+            for po, word in po_words.items():
+                results[po] |= word << offset
+        return results
+
+    def _run_batch(self, batch):
+        mask = (1 << len(batch)) - 1
+        values = self.simulate_words(pack_vectors(batch, self.pi_names), mask)
+        return {
+            name: values[w] for name, w in zip(self.po_names, self.netlist.pos)
+        }
+
+
+def pack_vectors_numpy(matrix):
+    """
+    Pack a (patterns x primary inputs) 0/1 matrix into uint64 words.
+
+    Args:
+        matrix: Array-like of shape (n, len(PI)) holding 0/1 values.
+
+    Returns:
+        numpy.ndarray: uint64 array of shape (len(PI), ceil(n / 64)); bit i of
+        word j in row k is the value of PI k in pattern 64 * j + i.
+    """
+    if np is None:
+        raise ImportError("pack_vectors_numpy: NumPy is not installed")
+
+    matrix = np.asarray(matrix, dtype=np.uint8)
+    n = matrix.shape[0]
+    n_words = (n + 63) // 64
+    packed = np.packbits(matrix, axis=0, bitorder="little")
+    padded = np.zeros((n_words * 8, matrix.shape[1]), dtype=np.uint8)
+    padded[: packed.shape[0]] = packed
+    return np.ascontiguousarray(padded.T).view("<u8").astype(np.uint64)
+
+
+class NumpySimulator:
+    """
+    Bit-parallel simulator backed by one NumPy uint64 array per wire.
+
+    Gives the same results as BitParallelSimulator, but each gate is evaluated
+    with a single vectorized kernel over all words, so millions of patterns can
+    be simulated in one pass. Wire arrays are released as soon as their last
+    reader has been evaluated to keep the peak memory close to the widest level.
+
+    Attributes:
+        netlist (Netlist): The compiled circuit.
+        state (dict): Flip-flop output value (0/1) by gate number.
+    """
+
+    _kernels = {
+        GateType.AND: "bitwise_and",
+        GateType.NAND: "bitwise_and",
+        GateType.OR: "bitwise_or",
+        GateType.NOR: "bitwise_or",
+        GateType.XOR: "bitwise_xor",
+        GateType.XNOR: "bitwise_xor",
+    }
+    _inverting = (GateType.NOT, GateType.NAND, GateType.NOR, GateType.XNOR)
+
+    def __init__(self, netlist, state=None):
+        if np is None:
+            raise ImportError("NumpySimulator: NumPy is not installed")
+
+        self.netlist = netlist
+        self.state = state or {}
+        self.pi_names = [netlist.wire_names[w] for w in netlist.pis]
+        self.po_names = [netlist.wire_names[w] for w in netlist.pos]
+
+        schedule = [
+            (
+                netlist.gate_type[g],
+                tuple(netlist.fanin_of(g)),
+                netlist.gate_output[g],
+                netlist.gate_nos[g],
+            )
+            for g in netlist.order
+            if netlist.gate_output[g] >= 0
+        ]
+
+        # Wires that may be freed after each step of the schedule.
+        keep = set(netlist.pos)
+        last_use = {}
+        for step, (_, fanin, _, _) in enumerate(schedule):
+            for w in fanin:
+                last_use[w] = step
+        release = [[] for _ in schedule]
+        for w, step in last_use.items():
+            if w not in keep:
+                release[step].append(w)
+
+        self._schedule = schedule
+        self._release = release
+        driven = set(netlist.pis)
+        driven.update(out for _, _, out, _ in schedule)
+        self._undriven = [w for w in range(netlist.num_wires) if w not in driven]
+
+    def simulate_packed(self, pi_words):
+        """
+        Run packed patterns through the circuit.
+
+        Args:
+            pi_words: uint64 array of shape (len(PI), n_words), e.g. from
+                pack_vectors_numpy.
+
+        Returns:
+            dict: {po: uint64 array of n_words}. Bits beyond the last pattern in
+            the final word are unspecified.
+        """
+        pi_words = np.asarray(pi_words, dtype=np.uint64)
+        n_words = pi_words.shape[1]
+        values = [None] * self.netlist.num_wires
+        for row, w in enumerate(self.netlist.pis):
+            values[w] = pi_words[row]
+
+        ones = np.full(n_words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        zeros = np.zeros(n_words, dtype=np.uint64)
+        # Undriven wires read as 0, as in BitParallelSimulator.
+        for w in self._undriven:
+            values[w] = zeros
+
+        for step, (gate_type, fanin, out, gate_no) in enumerate(self._schedule):
+            if gate_type >= GateType.DFF:
+                values[out] = ones if self.state.get(gate_no, 0) else zeros
+            else:
+                values[out] = self._evaluate(gate_type, [values[w] for w in fanin])
+            for w in self._release[step]:
+                values[w] = None
+
+        return {name: values[w] for name, w in zip(self.po_names, self.netlist.pos)}
+
+    def _evaluate(self, gate_type, words):
+        if len(words) == 1 or gate_type in (GateType.BUF, GateType.NOT):
+            result = words[0]
+        else:
+            kernel = getattr(np, self._kernels[gate_type])
+            result = kernel(words[0], words[1])
+            for w in words[2:]:
+                kernel(result, w, out=result)
+
+        if gate_type in self._inverting:
+            return np.invert(result)
+        return result
+
+    def simulate(self, vectors):
+        """
+        Simulate a list of vectors (dicts, sequences or strings in PI order).
+
+        Returns:
+            dict: {po: int}, where bit i is the value of the output for vector i,
+            the same format as BitParallelSimulator.simulate.
+        """
+        rows = []
+        for vector in vectors:
+            if isinstance(vector, dict):
+                vector = [vector[name] for name in self.pi_names]
+            rows.append([int(v) for v in vector])
+
+        n = len(rows)
+        if n == 0:
+            return {po: 0 for po in self.po_names}
+
+        matrix = np.array(rows, dtype=np.uint8).reshape(n, len(self.pi_names))
+        if matrix.size and matrix.max() > 1:
+            raise ValueError("NumpySimulator.simulate: Inputs must be 0 or 1")
+
+        packed = self.simulate_packed(pack_vectors_numpy(matrix))
+        mask = (1 << n) - 1
+        return {
+            po: int.from_bytes(words.astype("<u8").tobytes(), "little") & mask
+            for po, words in packed.items()
+        }
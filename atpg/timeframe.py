@@ -0,0 +1,521 @@
+"""Sequential test generation by lazy time-frame expansion.
+
+The circuit is not copied per time frame. Every frame is a bytearray of
+five-valued codes (see atpg.logic), one per wire of the single compiled
+Netlist, and frame t + 1 reads its flip-flop outputs from the values captured
+at the end of frame t. Frames are allocated when the search first needs them
+and reused for the following faults.
+
+The number of frames grows by iterative deepening: a fault is first targeted
+in a single frame and one frame is added each time the search over the current
+window fails, up to max_frames. The stuck-at fault is present in every frame.
+"""
+
+import heapq
+
+from . import logic
+from .logic import ZERO, ONE, X, D, DBAR
+from .netlist import GateType
+from .reachability import ReachabilityIndex
+from .scan import find_clocks
+from .scoap import compute_scoap
+from .utils import get_logger
+
+log = get_logger("timeframe")
+
+
+class TimeFrameATPG:
+    """
+    PODEM over a window of time frames of a sequential circuit.
+
+    The decisions are the values of the primary inputs in each frame; clock
+    inputs are not decided but pulsed once per frame. A backtrace which
+    reaches a flip-flop output continues from its D pin in the previous frame,
+    and the fault effect crosses frames through the captured state. A test
+    must detect the fault at a primary output of some frame.
+
+    Attributes:
+        netlist (Netlist): The sequential circuit.
+        initial_state (dict): Flip-flop state before the first frame, as
+            {gate_no: {"D": value}} like Parser.state_vars; None leaves it
+            unknown ('x'), so tests work from any power-up state.
+        max_frames (int): Largest window tried by iterative deepening.
+        backtrack_limit (int): Backtracks allowed per fault, over all windows.
+        clocks (list): Clock inputs, pulsed in every frame.
+        pi_names (list): Inputs decided by the search, in netlist order.
+        frames (list): Frame value arrays allocated so far (bytearrays of
+            codes indexed by wire id); only the first window_size are in use.
+        window_size (int): Frames in the current window.
+        aborted (bool): True when the last generate_test hit backtrack_limit.
+        backtracks (int): Backtracks made for the last fault.
+        evaluations (int): Gate evaluations performed so far.
+    """
+
+    def __init__(self, netlist, initial_state=None, max_frames=8, backtrack_limit=1000):
+        self.netlist = netlist
+        self.initial_state = initial_state
+        self.max_frames = max_frames
+        self.backtrack_limit = backtrack_limit
+        self.clocks = find_clocks(netlist)
+        self.pi_names = [
+            netlist.wire_names[w]
+            for w in netlist.pis
+            if netlist.wire_names[w] not in self.clocks
+        ]
+        self._pi_ids = {netlist.wire_index[pi] for pi in self.pi_names}
+        self._clock_ids = {netlist.wire_index[c] for c in self.clocks}
+        self.scoap = compute_scoap(netlist)
+        self.reach = ReachabilityIndex(netlist)
+
+        self._position = [0] * netlist.num_gates
+        for pos, g in enumerate(netlist.order):
+            self._position[g] = pos
+        self._gates = []
+        for g in range(netlist.num_gates):
+            gate_type = netlist.gate_type[g]
+            fanin = tuple(netlist.fanin_of(g))
+            table = None
+            if gate_type < GateType.DFF and len(fanin) <= logic.MAX_TABLE_ARITY:
+                table = logic.gate_table(gate_type, len(fanin))
+            self._gates.append((gate_type, fanin, netlist.gate_output[g], table))
+        self._readers = [
+            tuple(
+                g for g in netlist.fanout_of(w) if netlist.gate_type[g] < GateType.DFF
+            )
+            for w in range(netlist.num_wires)
+        ]
+        self._combinational = [
+            g
+            for g in netlist.order
+            if netlist.gate_type[g] < GateType.DFF and netlist.gate_output[g] >= 0
+        ]
+        # Wires from which a fault effect can reach a PO or a flip-flop pin
+        # in the same frame; D-frontier gates driving anything else are dead.
+        self._live = bytearray(netlist.num_wires)
+        for w in netlist.pos:
+            self._live[w] = 1
+        for g in netlist.dffs:
+            for w in netlist.fanin_of(g)[1:]:
+                self._live[w] = 1
+        for g in reversed(self._combinational):
+            if self._live[netlist.gate_output[g]]:
+                for w in netlist.fanin_of(g):
+                    self._live[w] = 1
+
+        self.frames = []
+        self.window_size = 0
+        self.aborted = False
+        self.backtracks = 0
+        self.evaluations = 0
+        self._fault = None
+        self._cone_fault = None
+        self._cone = ([], [])
+        self._trail = []
+        self._decisions = {}
+
+    def generate_test(self, fault):
+        """
+        Generate a test sequence for a single stem or branch fault.
+
+        Returns:
+            list: One cube {pi: '0'/'1'/'x'} per frame, or None if no test
+            was found within max_frames frames or the search was aborted.
+        """
+        self.backtracks = 0
+        self.aborted = False
+        self._target(fault)
+        gates, flops = self._cone
+        pos = set(self.netlist.pos)
+        at_po = fault.branch is None and self._site in pos
+        if not at_po and not any(self._gates[g][2] in pos for g in gates + flops):
+            log.debug("TimeFrameATPG.generate_test: %s is unobservable", fault)
+            return None
+        for size in range(1, self.max_frames + 1):
+            self._start(fault, size)
+            if self._search():
+                log.debug(
+                    "TimeFrameATPG.generate_test: %s detected in %d frames", fault, size
+                )
+                return self._cubes()
+            if self.backtracks > self.backtrack_limit:
+                self.aborted = True
+                break
+        log.debug(
+            "TimeFrameATPG.generate_test: No test for %s (aborted=%s)",
+            fault,
+            self.aborted,
+        )
+        return None
+
+    def fill_sequence(self, cubes, fill=0):
+        """Concrete {pi: 0/1} vectors, one per frame, from a test sequence."""
+        return [
+            {pi: fill if value == "x" else int(value) for pi, value in cube.items()}
+            for cube in cubes
+        ]
+
+    def value(self, frame, wire):
+        """Current value (0, 1, 'x', 'D' or '~D') of a wire in a frame, by name."""
+        return logic.VALUES[self.frames[frame][self.netlist.wire_index[wire]]]
+
+    def _target(self, fault):
+        """Make fault the injected fault and compute its cone, once per fault."""
+        net = self.netlist
+        self._fault = fault
+        self._site = net.wire_index[fault.gate_no]
+        self._fault_gate = net.gate_index[fault.branch] if fault.branch is not None else -1
+        if self._cone_fault != fault:
+            self._cone = self._fault_cone(fault)
+            self._cone_fault = fault
+
+    def _start(self, fault, size):
+        """Open a window of size frames for the fault, all inputs at 'x'."""
+        net = self.netlist
+        self._target(fault)
+        self._trail = []
+        self._decisions = {}
+        while len(self.frames) < size:
+            self.frames.append(bytearray(net.num_wires))
+        self.window_size = size
+
+        for t in range(size):
+            values = self.frames[t]
+            values[:] = bytes([X]) * net.num_wires
+            for w in net.pis:
+                values[w] = self._stem(w, ONE if w in self._clock_ids else X)
+            for g, code in self._state_codes(t):
+                values[self._gates[g][2]] = self._stem(self._gates[g][2], code)
+            for g in self._combinational:
+                values[self._gates[g][2]] = self._evaluate(values, g)
+
+    def _state_codes(self, t):
+        """(flip-flop gate id, output code) at the start of frame t."""
+        net = self.netlist
+        state = self.initial_state
+        for g in net.dffs:
+            if self._gates[g][2] < 0:
+                continue
+            if t > 0:
+                code = self._capture(self.frames[t - 1], g, t - 1)
+            elif state is None:
+                code = X
+            else:
+                code = logic.encode(state.get(net.gate_nos[g], {}).get("D", "x"))
+            yield g, code
+
+    def _pin(self, values, g, w):
+        """Value of wire w as seen by gate g, with a branch fault applied."""
+        if g == self._fault_gate and w == self._site:
+            return self._faulty(values[w])
+        return values[w]
+
+    def _capture(self, values, g, t):
+        """Code flip-flop g holds after the clock pulse ending frame t."""
+        code = self._next_state(values, g, self._pin(values, g, self._gates[g][1][1]))
+        if self._clock_fault(g):
+            # A stuck clock does not pulse, so the faulty machine keeps its
+            # state, except for the first edge of a clock stuck at 1 which
+            # starts low; set and reset still act.
+            out = self._gates[g][2]
+            faulty = self._next_state(values, g, values[out] if out >= 0 else X)
+            if t == 0 and self._fault.stuck_at == 1:
+                if self.initial_state is None:
+                    faulty = X
+                else:
+                    saved = self.initial_state.get(self.netlist.gate_nos[g], {})
+                    if str(saved.get("C", 0)) == "0":
+                        faulty = code
+            code = logic.combine(code, faulty)
+        return code
+
+    def _next_state(self, values, g, data):
+        """S | (~R & data) for a DFFSR, data for a DFF."""
+        gate_type, fanin, _, _ = self._gates[g]
+        if gate_type != GateType.DFFSR or len(fanin) < 4:
+            return data
+        not_reset = logic.evaluate_codes(GateType.NOT, [self._pin(values, g, fanin[3])])
+        return logic.evaluate_codes(
+            GateType.OR,
+            [
+                self._pin(values, g, fanin[2]),
+                logic.evaluate_codes(GateType.AND, [data, not_reset]),
+            ],
+        )
+
+    def _stem(self, w, good):
+        if w != self._site or self._fault_gate >= 0:
+            return good
+        return self._faulty(good)
+
+    def _faulty(self, good):
+        if self._fault.stuck_at == 0:
+            return D if good == ONE else good
+        return DBAR if good == ZERO else good
+
+    def _evaluate(self, values, g):
+        gate_type, fanin, out, table = self._gates[g]
+        if g == self._fault_gate:
+            codes = [self._pin(values, g, w) for w in fanin]
+        else:
+            codes = [values[w] for w in fanin]
+        self.evaluations += 1
+        if table is None:
+            code = logic.evaluate_codes(gate_type, codes)
+        else:
+            index = 0
+            for c in codes:
+                index = index * logic.NUM_VALUES + c
+            code = table[index]
+        return self._stem(out, code)
+
+    def _set(self, t, w, code):
+        values = self.frames[t]
+        old = values[w]
+        if old != code:
+            self._trail.append((t, w, old))
+            values[w] = code
+            return True
+        return False
+
+    def _assign(self, t, w, code):
+        """Assign a primary input in frame t and imply forward in time."""
+        self._decisions[(t, w)] = code
+        changed = [w] if self._set(t, w, self._stem(w, code)) else []
+        while changed and t < self.window_size:
+            self._propagate(t, [g for w in changed for g in self._readers[w]])
+            t += 1
+            if t == self.window_size:
+                break
+            changed = [
+                self._gates[g][2]
+                for g, code in self._state_codes(t)
+                if self._set(t, self._gates[g][2], self._stem(self._gates[g][2], code))
+            ]
+
+    def _propagate(self, t, gates):
+        values = self.frames[t]
+        position = self._position
+        heap = [(position[g], g) for g in gates]
+        heapq.heapify(heap)
+        queued = set(gates)
+        while heap:
+            _, g = heapq.heappop(heap)
+            out = self._gates[g][2]
+            if out >= 0 and self._set(t, out, self._evaluate(values, g)):
+                for reader in self._readers[out]:
+                    if reader not in queued:
+                        queued.add(reader)
+                        heapq.heappush(heap, (position[reader], reader))
+
+    def _undo(self, mark, key):
+        trail = self._trail
+        while len(trail) > mark:
+            t, w, old = trail.pop()
+            self.frames[t][w] = old
+        del self._decisions[key]
+
+    def _detected(self):
+        pos = self.netlist.pos
+        return any(
+            self.frames[t][w] >= D for t in range(self.window_size) for w in pos
+        )
+
+    def _search(self):
+        if self._detected():
+            return True
+        for t, w, value in self._objectives():
+            decision = self._backtrace(t, w, value)
+            if decision is not None:
+                break
+        else:
+            return False
+
+        t, w, value = decision
+        for trial in (value, 1 - value):
+            mark = len(self._trail)
+            self._assign(t, w, trial)
+            if self._search():
+                return True
+            self._undo(mark, (t, w))
+            self.backtracks += 1
+            if self.backtracks > self.backtrack_limit:
+                return False
+        return False
+
+    def _objectives(self):
+        """
+        Candidate (frame, wire, value) objectives, best first: propagate the
+        fault effect through the most observable D-frontier gate of any
+        frame, move it into the state of a flip-flop, then activate the fault
+        in a frame where it is not activated yet.
+        """
+        co = self.scoap.co
+        last = self.window_size - 1
+        gates, flops = self._cone
+        frontier = []
+        for t in range(self.window_size):
+            values = self.frames[t]
+            for g in gates:
+                out = self._gates[g][2]
+                if values[out] != X or not self._live[out]:
+                    continue
+                if t == last and not self.reach.po_reach[out]:
+                    continue
+                if any(self._pin(values, g, w) >= D for w in self._gates[g][1]):
+                    frontier.append((co[out], t, g))
+            if t < last:
+                for g in flops:
+                    if self._capture(values, g, t) == X and self._capture_blocked(values, g):
+                        frontier.append((0, t, g))
+
+        objectives = []
+        for _, t, g in sorted(frontier):
+            gate_type, fanin, _, _ = self._gates[g]
+            values = self.frames[t]
+            if gate_type >= GateType.DFF:
+                objectives += self._capture_objectives(t, g)
+                continue
+            # Non-controlling value; either value propagates through XOR/XNOR.
+            value = 1 if gate_type in (GateType.AND, GateType.NAND) else 0
+            objectives += [(t, w, value) for w in fanin if values[w] == X][:1]
+
+        good = 1 - self._fault.stuck_at
+        for t in range(self.window_size):
+            if self.frames[t][self._site] == X:
+                objectives.append((t, self._site, good))
+        return objectives
+
+    def _clock_fault(self, g):
+        """True if the fault stops flip-flop g from being clocked."""
+        return self._gates[g][1][0] == self._site and self._fault_gate in (-1, g)
+
+    def _capture_blocked(self, values, g):
+        """True if an error reaches a pin of flip-flop g but not its state."""
+        fanin = self._gates[g][1]
+        return self._clock_fault(g) or any(
+            self._pin(values, g, w) >= D for w in fanin[1:4]
+        )
+
+    def _capture_objectives(self, t, g):
+        """
+        Objectives letting flip-flop g capture the error on one of its pins:
+        S and R inactive for an error on D, S inactive and D at 1 for an
+        error on R, R active or D at 0 for an error on S, and D opposite to
+        the held value for a clock which cannot pulse.
+        """
+        gate_type, fanin, out, _ = self._gates[g]
+        values = self.frames[t]
+
+        def error(w):
+            return self._pin(values, g, w) >= D
+
+        d = fanin[1]
+        wanted = []
+        if gate_type == GateType.DFFSR and len(fanin) >= 4:
+            s, r = fanin[2], fanin[3]
+            if error(s):
+                wanted += [(r, 1), (d, 0)]
+            else:
+                wanted.append((s, 0))
+                wanted.append((d, 1) if error(r) else (r, 0))
+        if self._clock_fault(g) and out >= 0:
+            if values[out] in (ZERO, ONE):
+                wanted.append((d, 1 - values[out]))
+            elif values[d] in (ZERO, ONE):
+                wanted.append((out, 1 - values[d]))
+            else:
+                wanted.append((d, 1))
+        return [(t, w, v) for w, v in wanted if values[w] == X]
+
+    def _fault_cone(self, fault):
+        """
+        Combinational gates and flip-flops (ids, in topological order) a
+        fault effect can reach in some frame, found by one search over the
+        readers of the wires reached so far.
+        """
+        net = self.netlist
+        gates = set()
+        flops = set()
+        seen = set()
+        pending = []
+
+        def reach_gate(g):
+            target = flops if net.gate_type[g] >= GateType.DFF else gates
+            if g in target:
+                return
+            target.add(g)
+            out = self._gates[g][2]
+            if out >= 0 and out not in seen:
+                seen.add(out)
+                pending.append(out)
+
+        # A stuck clock disturbs its flip-flops without any error on D.
+        for g in net.dffs:
+            if self._clock_fault(g):
+                reach_gate(g)
+        if fault.branch is not None:
+            reach_gate(self._fault_gate)
+        else:
+            seen.add(self._site)
+            pending.append(self._site)
+        while pending:
+            w = pending.pop()
+            for g in net.fanout_of(w):
+                gate_type, fanin, out, _ = self._gates[g]
+                if gate_type < GateType.DFF:
+                    if out >= 0:
+                        reach_gate(g)
+                elif w in fanin[1:]:
+                    reach_gate(g)
+
+        position = self._position
+        return (
+            sorted(gates, key=position.__getitem__),
+            [g for g in net.dffs if g in flops],
+        )
+
+    def _backtrace(self, t, w, v):
+        """
+        Trace the objective (frame t, wire w, value v) back to an unassigned
+        primary input, crossing into the previous frame at flip-flops and
+        following Scoap.backtrace_step through combinational gates.
+
+        Returns:
+            tuple: (frame, wire id, value) to decide, or None.
+        """
+        net = self.netlist
+        while True:
+            values = self.frames[t]
+            if values[w] != X:
+                return None
+            g = net.driver[w]
+            if g < 0:
+                break
+            gate_type, fanin, _, _ = self._gates[g]
+            if gate_type >= GateType.DFF:
+                if t == 0:
+                    return None
+                t, w = t - 1, fanin[1]
+                if gate_type == GateType.DFFSR and len(fanin) >= 4:
+                    # Q = S | (~R & D): clear the pin blocking D first.
+                    _, d, s, r = fanin[:4]
+                    order = ((r, 0), (d, 1), (s, 1)) if v else ((s, 0), (d, 0), (r, 1))
+                    previous = self.frames[t]
+                    w, v = next(((i, k) for i, k in order if previous[i] == X), (d, v))
+                continue
+
+            step = self.scoap.backtrace_step(gate_type, fanin, values, v)
+            if step is None:
+                return None
+            w, v = step
+
+        if w not in self._pi_ids:
+            return None
+        return t, w, v
+
+    def _cubes(self):
+        names = self.netlist.wire_names
+        cubes = [{pi: "x" for pi in self.pi_names} for _ in range(self.window_size)]
+        for (t, w), code in self._decisions.items():
+            cubes[t][names[w]] = str(code)
+        return cubes
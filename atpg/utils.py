@@ -1,5 +1,8 @@
 """Modules containing helper functions for ATPG."""
 
+import json
+import logging
+
 GREEN = "\033[32m"
 RED = "\033[31m"
 RESET = "\033[0m"
@@ -8,16 +11,95 @@ GIN = f"{GREEN}[INFO]:  {RESET} "
 ERR = f"{RED}[ERROR]:   {RESET} "
 TST = f"{GREEN}[TEST]:  {RESET} "
 
+# Every module logs below the "atpg" logger. Nothing is printed until
+# configure_logging() installs handlers; hot paths check isEnabledFor() first so
+# a disabled level costs a single comparison.
+logger = logging.getLogger("atpg")
+logger.addHandler(logging.NullHandler())
+
+
+def get_logger(name):
+    """Logger for a module of the package, e.g. get_logger("parser")."""
+    return logger.getChild(name)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Formats records with the [INFO]/[ERROR] prefixes used across the tool."""
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.levelno >= logging.ERROR:
+            return f"{ERR}{message}"
+        if record.levelno >= logging.INFO:
+            return f"{GIN}{message}"
+        return message
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per record. Structured data passed as
+    ``extra={"fields": {...}}`` is merged into the object.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
 
-def print_structured_design(gates_map, wires_map, level_map):
-    print("\n=== CIRCUIT HIERARCHY ===")
 
+def configure_logging(level="INFO", trace_path=None, trace_level="DEBUG"):
+    """
+    Configure the console output and an optional JSON-lines trace file.
+
+    Args:
+        level (str): Console level ("DEBUG", "INFO", "WARNING", ...); None
+            disables console output.
+        trace_path (str): File receiving one JSON object per record.
+        trace_level (str): Level of the records written to the trace file.
+    """
+    for handler in list(logger.handlers):
+        if not isinstance(handler, logging.NullHandler):
+            logger.removeHandler(handler)
+            handler.close()
+
+    levels = []
+    if level:
+        console = logging.StreamHandler()
+        console.setLevel(level)
+        console.setFormatter(ConsoleFormatter())
+        logger.addHandler(console)
+        levels.append(console.level)
+
+    if trace_path:
+        trace = logging.FileHandler(trace_path, mode="w")
+        trace.setLevel(trace_level)
+        trace.setFormatter(JsonLinesFormatter())
+        logger.addHandler(trace)
+        levels.append(trace.level)
+
+    logger.setLevel(min(levels) if levels else logging.CRITICAL + 1)
+    logger.propagate = False
+
+
+def print_structured_design(gates_map, wires_map, level_map):
     for level, gates in level_map.items():
         for gate in gates:
             gates_map[gate]["level"] = int(level)
 
+    log = get_logger("design")
+    if not log.isEnabledFor(logging.DEBUG):
+        return
+    emit = log.debug
+
+    emit("\n=== CIRCUIT HIERARCHY ===")
+
     for level in sorted(level_map.keys(), key=int):
-        print(f"\n── LEVEL {level} ──")
+        emit(f"\n── LEVEL {level} ──")
         for gate_id in level_map[level]:
             gate = gates_map[gate_id]
             inputs = [
@@ -25,11 +107,11 @@ def print_structured_design(gates_map, wires_map, level_map):
                 for inp in gate["inputs"]
             ]
 
-            print(f"  GATE {gate_id} [{gate['gate_type']}]")
-            print(f"    Inputs: {', '.join(inputs)}")
-            print(f"    Outputs: {', '.join(gate['outputs'])}")
+            emit(f"  GATE {gate_id} [{gate['gate_type']}]")
+            emit(f"    Inputs: {', '.join(inputs)}")
+            emit(f"    Outputs: {', '.join(gate['outputs'])}")
 
-    print("\n=== WIRE TRACING ===")
+    emit("\n=== WIRE TRACING ===")
     for wire, connections in wires_map.items():
         sources = [k for k, v in connections.items() if v == "output"]
         destinations = [k for k, v in connections.items() if v == "input"]
@@ -37,11 +119,11 @@ def print_structured_design(gates_map, wires_map, level_map):
         source_info = [f"GATE {s} (L{gates_map[int(s)]['level']})" for s in sources]
         dest_info = [f"GATE {d} (L{gates_map[int(d)]['level']})" for d in destinations]
 
-        print(f"\nWire {wire}:")
+        emit(f"\nWire {wire}:")
         if not source_info:
             source_info = ["INPUT"]
-        print(f"  Sources: {', '.join(source_info)}")
-        print(f"  Destinations: {', '.join(dest_info)}")
+        emit(f"  Sources: {', '.join(source_info)}")
+        emit(f"  Destinations: {', '.join(dest_info)}")
 
 
 def find_wire_level(wire, wires_map, gates_map):
@@ -0,0 +1 @@
+"""Netlist generators and timing benchmarks (see benchmarks.run)."""
@@ -0,0 +1,261 @@
+"""Generators of synthetic gate-level benchmark netlists.
+
+Every generator builds a NetlistBuilder and the netlists are written in the
+same form as the Yosys output under test/, using only the cells of
+cmoscells.lib (BUF, NOT, NAND, AND, OR, NOR, DFF, DFFSR); XOR is built from
+four NAND gates. Cells are kept as small tuples and the Verilog text is
+streamed to the file, so netlists of a million gates stay cheap to write.
+
+    python -m benchmarks.generators multiplier 10000 -o mult.v
+"""
+
+import argparse
+import math
+import random
+
+from atpg.parser import get_gate_params
+
+COMBINATIONAL_CELLS = ("BUF", "NOT", "NAND", "AND", "OR", "NOR")
+
+
+class NetlistBuilder:
+    """
+    Collects the ports and cells of a flat gate-level module.
+
+    Attributes:
+        module (str): Module name.
+        inputs (list): Primary input names.
+        outputs (list): Primary output names.
+        cells (list): (cell type, input wires, output wire) in creation
+            order, inputs in get_gate_params pin order.
+        wires (int): Number of internal wires allocated.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.inputs = []
+        self.outputs = []
+        self.cells = []
+        self.wires = 0
+
+    @property
+    def num_gates(self):
+        return len(self.cells)
+
+    def input(self, name):
+        self.inputs.append(name)
+        return name
+
+    def output(self, name, wire):
+        """Declare an output driven by wire, through a BUF cell if renamed."""
+        if wire != name:
+            self.cell("BUF", wire, out=name)
+        self.outputs.append(name)
+        return name
+
+    def wire(self):
+        """Allocate a new internal wire, named like Yosys does (_12_)."""
+        name = f"_{self.wires}_"
+        self.wires += 1
+        return name
+
+    def cell(self, cell_type, *inputs, out=None):
+        """
+        Add a cell; inputs are given in get_gate_params pin order.
+
+        Returns:
+            str: The wire driven by the cell.
+        """
+        params = get_gate_params(cell_type)
+        if len(inputs) != len(params["inputs"]):
+            raise ValueError(
+                f"NetlistBuilder.cell: {cell_type} takes {len(params['inputs'])} "
+                f"inputs, got {len(inputs)}"
+            )
+        if out is None:
+            out = self.wire()
+        self.cells.append((cell_type, inputs, out))
+        return out
+
+    def xor(self, a, b):
+        """a ^ b from four NAND gates."""
+        n = self.cell("NAND", a, b)
+        return self.cell("NAND", self.cell("NAND", a, n), self.cell("NAND", b, n))
+
+    def write(self, stream):
+        """Write the module as Yosys-style structural Verilog."""
+        ports = self.inputs + self.outputs
+        stream.write("/* Generated by benchmarks.generators */\n\n")
+        stream.write(f'(* top =  1  *)\nmodule {self.module}({", ".join(ports)});\n')
+        for name in self.inputs:
+            stream.write(f"  input {name};\n  wire {name};\n")
+        for name in self.outputs:
+            stream.write(f"  output {name};\n  wire {name};\n")
+        for k in range(self.wires):
+            stream.write(f"  wire _{k}_;\n")
+        for k, (cell_type, inputs, out) in enumerate(self.cells):
+            params = get_gate_params(cell_type)
+            pins = list(zip(params["inputs"], inputs)) + [(params["outputs"][0], out)]
+            connections = ",\n".join(f"    .{pin}({wire})" for pin, wire in pins)
+            stream.write(f"  {cell_type} _c{k}_ (\n{connections}\n  );\n")
+        stream.write("endmodule\n")
+
+    def save(self, path):
+        with open(path, "w") as f:
+            self.write(f)
+        return path
+
+
+def full_adder(builder, a, b, carry_in):
+    """Sum and carry of a + b + carry_in (11 NAND gates)."""
+    half = builder.xor(a, b)
+    total = builder.xor(half, carry_in)
+    carry = builder.cell(
+        "NAND",
+        builder.cell("NAND", a, b),
+        builder.cell("NAND", half, carry_in),
+    )
+    return total, carry
+
+
+def ripple_carry_adder(bits):
+    """bits-wide adder with carry in: inputs a0.., b0.., cin; outputs s0.., cout."""
+    builder = NetlistBuilder(f"adder{bits}")
+    a = [builder.input(f"a{i}") for i in range(bits)]
+    b = [builder.input(f"b{i}") for i in range(bits)]
+    carry = builder.input("cin")
+    for i in range(bits):
+        total, carry = full_adder(builder, a[i], b[i], carry)
+        builder.output(f"s{i}", total)
+    builder.output("cout", carry)
+    return builder
+
+
+def array_multiplier(bits):
+    """Unsigned bits x bits array multiplier: inputs a0.., b0..; outputs p0.."""
+    builder = NetlistBuilder(f"multiplier{bits}")
+    a = [builder.input(f"a{i}") for i in range(bits)]
+    b = [builder.input(f"b{i}") for i in range(bits)]
+
+    # row[i] holds the partial sum bits of weight i and up, carried down the array.
+    row = [builder.cell("AND", a[i], b[0]) for i in range(bits)]
+    builder.output("p0", row[0])
+    for j in range(1, bits):
+        carry = None
+        next_row = []
+        for i in range(bits):
+            product = builder.cell("AND", a[i], b[j])
+            above = row[i + 1] if i + 1 < len(row) else None
+            if above is None and carry is None:
+                next_row.append(product)
+            elif above is None or carry is None:
+                other = above if carry is None else carry
+                total = builder.xor(product, other)
+                carry = builder.cell("AND", product, other)
+                next_row.append(total)
+            else:
+                total, carry = full_adder(builder, product, above, carry)
+                next_row.append(total)
+        next_row.append(carry)
+        builder.output(f"p{j}", next_row[0])
+        row = next_row
+    for i in range(1, len(row)):
+        if row[i] is not None:
+            builder.output(f"p{bits - 1 + i}", row[i])
+    return builder
+
+
+def random_dag(gates, inputs=32, window=256, seed=0):
+    """
+    Random combinational DAG of the given number of gates.
+
+    Each gate reads wires drawn from the primary inputs and the last window
+    gate outputs, which keeps the depth and the fanout realistic. Every wire
+    nothing reads becomes a primary output.
+    """
+    rng = random.Random(seed)
+    builder = NetlistBuilder(f"random{gates}")
+    pis = [builder.input(f"i{k}") for k in range(inputs)]
+    recent = []
+    read = set()
+    for _ in range(gates):
+        cell_type = rng.choice(COMBINATIONAL_CELLS)
+        arity = len(get_gate_params(cell_type)["inputs"])
+        sources = []
+        while len(sources) < arity:
+            if recent and rng.random() < 0.8:
+                wire = recent[-1 - rng.randrange(min(window, len(recent)))]
+            else:
+                wire = rng.choice(pis)
+            if wire not in sources:
+                sources.append(wire)
+        read.update(sources)
+        recent.append(builder.cell(cell_type, *sources))
+    sinks = [w for w in recent if w not in read]
+    for k, wire in enumerate(sinks):
+        builder.output(f"o{k}", wire)
+    return builder
+
+
+def counter(bits):
+    """
+    Synchronous up-counter with enable, asynchronous reset and set.
+
+    Inputs C (clock), EN, S, R; outputs q0.., the count. Every bit is a DFFSR
+    toggled when EN and all lower bits are 1.
+    """
+    builder = NetlistBuilder(f"counter{bits}")
+    clock = builder.input("C")
+    toggle = builder.input("EN")
+    preset = builder.input("S")
+    reset = builder.input("R")
+    outputs = [f"q{i}" for i in range(bits)]
+    for i, q in enumerate(outputs):
+        builder.cell("DFFSR", clock, builder.xor(q, toggle), preset, reset, out=q)
+        if i + 1 < bits:
+            toggle = builder.cell("AND", toggle, q)
+    builder.outputs.extend(outputs)
+    return builder
+
+
+GENERATORS = {
+    "adder": ripple_carry_adder,
+    "multiplier": array_multiplier,
+    "random": random_dag,
+    "counter": counter,
+}
+
+
+def build(kind, target_gates, seed=0):
+    """
+    Build a benchmark of roughly target_gates gates.
+
+    Returns:
+        NetlistBuilder: The generated circuit.
+    """
+    if kind == "adder":
+        return ripple_carry_adder(max(1, target_gates // 12))
+    if kind == "multiplier":
+        return array_multiplier(max(2, math.isqrt(max(target_gates // 13, 4))))
+    if kind == "random":
+        return random_dag(max(1, target_gates), seed=seed)
+    if kind == "counter":
+        return counter(max(1, target_gates // 6))
+    raise ValueError(f"build: Unknown benchmark kind {kind!r}, expected {list(GENERATORS)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("kind", choices=list(GENERATORS))
+    parser.add_argument("gates", type=int, help="approximate number of gates")
+    parser.add_argument("-o", "--output", required=True, help="Verilog file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    builder = build(args.kind, args.gates, args.seed)
+    builder.save(args.output)
+    print(f"{args.output}: {builder.num_gates} gates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Time the stages of the tool on generated netlists and keep a history.
+
+Each benchmark (a generator and a gate count) is written to a Verilog file,
+then every stage is timed on its own:
+
+    parse            Parser.parse_tokens over the tokenized file
+    compile          Netlist.from_maps (CSR arrays and levelization into
+                     topological order)
+    codegen          atpg.codegen.compile_netlist
+    simulate_vector  Parser.evaluate_graph, one vector at a time
+    simulate_batch   BitParallelSimulator, or SequentialSimulator for
+                     sequential designs
+    fault_sim        PPSFPSimulator over a sample of the collapsed faults
+    atpg             ParallelATPG, or FullScanATPG for sequential designs,
+                     over a sample of the collapsed faults
+
+Every run is appended to a JSON history file and compared with the previous
+run of the same benchmark, so that slowdowns stand out:
+
+    python -m benchmarks.run --kinds adder random --sizes 100 10000
+"""
+
+import argparse
+import copy
+from contextlib import contextmanager
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from atpg.codegen import compile_netlist
+from atpg.faults import generate_faults
+from atpg.faultsim import PPSFPSimulator
+from atpg.netlist import Netlist
+from atpg.parallel import ParallelATPG
+from atpg.parser import Parser, TokenStream, tokenize
+from atpg.scan import FullScanATPG, find_clocks
+from atpg.seqsim import SequentialSimulator
+from atpg.simulator import BitParallelSimulator
+from atpg.utils import get_logger
+
+from .generators import GENERATORS, build
+
+log = get_logger("benchmarks")
+
+PHASES = (
+    "parse",
+    "compile",
+    "codegen",
+    "simulate_vector",
+    "simulate_batch",
+    "fault_sim",
+    "atpg",
+)
+
+# Phases faster than this are too noisy to flag as regressions.
+MIN_SECONDS = 0.01
+
+
+@contextmanager
+def timed(times, phase):
+    """Record the wall-clock time of the with block as times[phase]."""
+    start = time.perf_counter()
+    yield
+    times[phase] = time.perf_counter() - start
+
+
+def random_vectors(names, count, rng):
+    return [{name: rng.getrandbits(1) for name in names} for _ in range(count)]
+
+
+def run_benchmark(path, options, skip=()):
+    """
+    Time every phase on one netlist file.
+
+    Args:
+        path (str): Verilog netlist.
+        options (argparse.Namespace): vectors, scalar_vectors, faults,
+            atpg_faults, workers and seed.
+        skip (tuple): Phases not to run.
+
+    Returns:
+        dict: {"times": {phase: seconds}, "sizes": {...}}.
+    """
+    rng = random.Random(options.seed)
+    times = {}
+    state_vars = {}
+
+    with timed(times, "parse"):
+        with open(path) as f:
+            gates_map, wires_map, inputs, outputs = Parser.parse_tokens(
+                TokenStream(tokenize(f)), state_vars
+            )
+    # Levelization is part of building the Netlist; Parser.level_graph would
+    # only build it a second time.
+    with timed(times, "compile"):
+        netlist = Netlist.from_maps(gates_map, wires_map, inputs, outputs)
+    level_map = netlist.level_map()
+    if "codegen" not in skip:
+        with timed(times, "codegen"):
+            compile_netlist(netlist, state_words=netlist.is_sequential())
+
+    sequential = netlist.is_sequential()
+    clocks = find_clocks(netlist) if sequential else []
+    data_inputs = [pi for pi in inputs if pi not in clocks]
+
+    if "simulate_vector" not in skip and options.scalar_vectors:
+        vectors = random_vectors(inputs, options.scalar_vectors, rng)
+        state = copy.deepcopy(state_vars)
+        with timed(times, "simulate_vector"):
+            for vector in vectors:
+                Parser.evaluate_graph(inputs, level_map, gates_map, dict(vector), state)
+
+    if "simulate_batch" not in skip and options.vectors:
+        vectors = random_vectors(data_inputs, options.vectors, rng)
+        with timed(times, "simulate_batch"):
+            if sequential:
+                SequentialSimulator(netlist, clocks=clocks).run(vectors)
+            else:
+                BitParallelSimulator(netlist).simulate(vectors)
+
+    faults = None
+    if "fault_sim" not in skip or "atpg" not in skip:
+        faults = generate_faults(netlist)
+
+    if "fault_sim" not in skip and options.faults and options.vectors:
+        sample = rng.sample(faults, min(options.faults, len(faults)))
+        vectors = random_vectors(inputs, options.vectors, rng)
+        with timed(times, "fault_sim"):
+            PPSFPSimulator(netlist).run(vectors, sample)
+
+    coverage = None
+    if "atpg" not in skip and options.atpg_faults:
+        with timed(times, "atpg"):
+            if sequential:
+                scan = FullScanATPG(netlist, max_workers=options.workers)
+                view_faults = scan.faults()
+                sample = rng.sample(view_faults, min(options.atpg_faults, len(view_faults)))
+                result = scan.run(sample)
+            else:
+                sample = rng.sample(faults, min(options.atpg_faults, len(faults)))
+                result = ParallelATPG(netlist, max_workers=options.workers).run(sample)
+        coverage = round(result.coverage, 4)
+
+    return {
+        "times": {phase: round(seconds, 6) for phase, seconds in times.items()},
+        "sizes": {
+            "gates": netlist.num_gates,
+            "wires": netlist.num_wires,
+            "pis": len(netlist.pis),
+            "pos": len(netlist.pos),
+            "dffs": len(netlist.dffs),
+            "faults": len(faults) if faults is not None else None,
+        },
+        "atpg_coverage": coverage,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def previous_result(history, name):
+    """The most recent recorded result of the named benchmark, if any."""
+    for run in reversed(history):
+        if name in run["results"]:
+            return run["results"][name]
+    return None
+
+
+def compare(result, previous, threshold):
+    """
+    Ratio of every phase time to the previous run of the benchmark.
+
+    Returns:
+        list: (phase, seconds, ratio or None, regressed) per timed phase.
+    """
+    rows = []
+    for phase in PHASES:
+        if phase not in result["times"]:
+            continue
+        seconds = result["times"][phase]
+        ratio = None
+        if previous and previous["times"].get(phase):
+            ratio = seconds / previous["times"][phase]
+        regressed = ratio is not None and ratio > threshold and seconds >= MIN_SECONDS
+        rows.append((phase, seconds, ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kinds", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000],
+        help="approximate gate counts (10 to 1000000)",
+    )
+    parser.add_argument("--vectors", type=int, default=1024, help="vectors for batched and fault simulation")
+    parser.add_argument("--scalar-vectors", type=int, default=16, help="vectors for per-vector simulation")
+    parser.add_argument("--faults", type=int, default=1000, help="faults sampled for fault simulation")
+    parser.add_argument("--atpg-faults", type=int, default=200, help="faults sampled for ATPG")
+    parser.add_argument("--workers", type=int, default=0, help="ATPG worker processes (0 = in-process)")
+    parser.add_argument("--skip", nargs="*", choices=PHASES, default=[])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--history", default=os.path.join(os.path.dirname(__file__), "history.json"),
+        help="JSON history of previous runs (default: benchmarks/history.json, not tracked by git)",
+    )
+    parser.add_argument("--out-dir", help="keep the generated netlists here")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25,
+        help="flag phases slower than this ratio to the previous run",
+    )
+    parser.add_argument("--no-record", action="store_true", help="do not append to the history")
+    options = parser.parse_args(argv)
+
+    history = load_history(options.history)
+    out_dir = options.out_dir or tempfile.mkdtemp(prefix="atpg-bench-")
+    os.makedirs(out_dir, exist_ok=True)
+
+    results = {}
+    regressions = []
+    for kind in options.kinds:
+        for size in options.sizes:
+            builder = build(kind, size, options.seed)
+            name = f"{kind}-{size}"
+            path = builder.save(os.path.join(out_dir, f"{name}.v"))
+            log.info("benchmarks: %s, %d gates", name, builder.num_gates)
+
+            result = run_benchmark(path, options, skip=set(options.skip))
+            results[name] = result
+            rows = compare(result, previous_result(history, name), options.threshold)
+            print(f"{name} ({result['sizes']['gates']} gates)")
+            for phase, seconds, ratio, regressed in rows:
+                change = f"  x{ratio:.2f}" if ratio is not None else ""
+                flag = "  REGRESSION" if regressed else ""
+                print(f"  {phase:<16} {seconds:10.4f} s{change}{flag}")
+                if regressed:
+                    regressions.append(f"{name}/{phase}")
+
+    if not options.no_record:
+        history.append(
+            {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                "options": {
+                    key: value
+                    for key, value in vars(options).items()
+                    if key not in ("history", "out_dir", "no_record")
+                },
+                "results": results,
+            }
+        )
+        with open(options.history, "w") as f:
+            json.dump(history, f, indent=1)
+        print(f"Recorded to {options.history}")
+
+    if regressions:
+        print(f"{len(regressions)} phase(s) slower than x{options.threshold}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
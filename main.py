@@ -1,23 +1,79 @@
+import csv
+import io
+import json
+import logging
+import os
+import pickle
+import random
+import tempfile
 import unittest
 
 import copy
-from atpg import SequentialATPG, ATPG, Objective, Parser, Fault, GIN, ERR, TST
+import itertools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from atpg import (
+    SequentialATPG,
+    ATPG,
+    Objective,
+    Parser,
+    Fault,
+    Netlist,
+    ReachabilityIndex,
+    BitParallelSimulator,
+    NumpySimulator,
+    SequentialSimulator,
+    PPSFPSimulator,
+    ConcurrentFaultSimulator,
+    fault_universe,
+    generate_faults,
+    read_vectors,
+    ParallelATPG,
+    ATPGFlow,
+    ImplicationEngine,
+    FullScanATPG,
+    TimeFrameATPG,
+    VcdWriter,
+    GateType,
+    compute_scoap,
+    logic,
+    configure_logging,
+    GIN,
+    ERR,
+    TST,
+)
+from atpg.cache import CACHE_VERSION, NetlistCache
+from atpg.compaction import fill_cube
+from atpg.parser import TokenStream, tokenize
+from atpg.simulator import evaluate_word
+from benchmarks.generators import ripple_carry_adder, array_multiplier, counter, random_dag
 
 
 def main():
+    # ATPG_LOG_LEVEL=DEBUG shows per-gate traces, ATPG_LOG_LEVEL=WARNING keeps the
+    # run quiet; ATPG_TRACE=<file> writes a JSON-lines trace for later analysis.
+    configure_logging(
+        os.environ.get("ATPG_LOG_LEVEL", "INFO"), os.environ.get("ATPG_TRACE")
+    )
+
     # Ask the user for file path or use the default one
     file_path = (
         input("Enter the file name (default: ./test/adder_and_or.v): ")
         or "./test/adder_and_or.v"
     )
 
-    parser = Parser(file_path)
+    parser = Parser(file_path, cache_dir=".atpg_cache")
     parser.read_parse_file()
 
     print("Choose an option:")
     print("1. Simulate")
     print("2. Test")
-    choice = input("Enter your choice (1 or 2): ")
+    print("3. Batch simulate a vector file")
+    choice = input("Enter your choice (1, 2 or 3): ")
 
     if choice == "1":
         print(GIN, "Running simulation...")
@@ -28,8 +84,18 @@ def main():
         print(GIN, "Running tests...")
         run_tests(parser)
 
+    elif choice == "3":
+        vector_path = input("Enter the vector file: ")
+        output_path = (
+            input("Enter the output file (.csv or .jsonl, default: sim.csv): ")
+            or "sim.csv"
+        )
+        vcd_path = input("Enter a VCD waveform file (optional): ") or None
+        count = parser.simulate_batch(vector_path, output_path, vcd_path=vcd_path)
+        print(GIN, f"Simulated {count} vectors into {output_path}.")
+
     else:
-        print(ERR, "Invalid choice. Please choose 1 or 2.")
+        print(ERR, "Invalid choice. Please choose 1, 2 or 3.")
         return
 
 
@@ -58,6 +124,7 @@ def run_tests(parser):
         primary_inputs,
         primary_outputs,
         state_vars,
+        netlist=parser.netlist,
     )
     seqATPG = SequentialATPG(
         gate_level_map_seq,
@@ -69,25 +136,179 @@ def run_tests(parser):
     )
 
     objective = Objective("_02_", "1", "D")
+    VALUES_WITH_X = (0, 1, "x", "D", "~D")
+
+    def floating_net_parser():
+        """Parser of a two-gate design reading the undriven wire f."""
+        path = os.path.join(tempfile.mkdtemp(), "floating.v")
+        with open(path, "w") as f:
+            f.write(
+                "module floating(a, b, y, z);\n"
+                "  input a, b;\n  output y, z;\n  wire f;\n"
+                "  NAND _0_ (.A(a), .B(f), .Y(y));\n"
+                "  OR _1_ (.A(f), .B(b), .Y(z));\n"
+                "endmodule\n"
+            )
+        floating = Parser(path)
+        floating.read_parse_file()
+        return floating
 
     class TestATPG(unittest.TestCase):
         def test_x_path_check(self):
             """Test the x_path_check function."""
             print("\n[TEST]: Testing X-path check...")
+            atpg.engine.reset()
             result = atpg.x_path_check("_02_")
             print(GIN, f"X-path check result before modification: {result}")
             self.assertTrue(result, f"{TST} X-path check should return True initially")
 
-            # Modify wire values and test again
-            atpg.wires_val["y"] = "1"
-            atpg.wires_val["carryout"] = "1"
+            # Once every primary output is known there is no X-path left.
+            atpg.engine.reset()
+            for pi, value in {"a": 1, "b": 0, "carryin": 0}.items():
+                atpg.engine.assign(pi, value)
             result_after = atpg.x_path_check("_02_")
+            atpg.engine.reset()
             print(GIN, f"X-path check result after modification: {result_after}")
             self.assertFalse(
                 result_after,
                 f"{TST} X-path check should return False after modification",
             )
 
+        def test_tokenizer(self):
+            """Comments and attributes are dropped, instances may span lines."""
+            print("\n[TEST]: Testing the netlist tokenizer...")
+            source = [
+                "(* top = 1 *) module m(a, \\b[0] , y); // ports\n",
+                "  input a; /* block\n",
+                "     comment */ input \\b[0] ;\n",
+                "  (* src = \"m.v:3\",\n",
+                "     keep *)\n",
+                "  output y;\n",
+                "  AND _0_ (\n",
+                "    .A(a), // first pin\n",
+                "    .B(\\b[0] ),\n",
+                "    .Y(y)\n",
+                "  );\n",
+                "endmodule\n",
+            ]
+            tokens = list(tokenize(source))
+            self.assertEqual(tokens[:6], ["module", "m", "(", "a", ",", "b[0]"])
+            self.assertNotIn("top", tokens)
+            self.assertNotIn("keep", tokens)
+            self.assertNotIn("comment", tokens)
+
+            gates, wires, inputs, outputs = Parser.parse_tokens(
+                TokenStream(tokens), {}
+            )
+            self.assertEqual(inputs, ["a", "b[0]"])
+            self.assertEqual(outputs, ["y"])
+            self.assertEqual(
+                gates,
+                {0: {"gate_type": "AND", "inputs": ["a", "b[0]"], "outputs": ["y"]}},
+            )
+
+            for constant in ("1'b1", "1'b0"):
+                source = (
+                    "module m(a, y); input a; output y; "
+                    f"AND _0_ (.A(a), .B({constant}), .Y(y)); endmodule"
+                )
+                with self.assertRaisesRegex(ValueError, "Constant"):
+                    Parser.parse_tokens(TokenStream(tokenize([source])), {})
+
+        def test_netlist_cache(self):
+            """The cache should hit on unchanged files and recover from bad entries."""
+            print("\n[TEST]: Testing the netlist cache...")
+            tmp = tempfile.mkdtemp()
+            cache_dir = os.path.join(tmp, "cache")
+            path = os.path.join(tmp, "netlist.v")
+            with open(parser.file_path) as f:
+                source = f.read()
+            with open(path, "w") as f:
+                f.write(source)
+
+            def parse():
+                fresh = Parser(path, cache_dir=cache_dir)
+                fresh.read_parse_file()
+                return fresh
+
+            first = parse()
+            cache = NetlistCache(cache_dir)
+            entry = cache.entry_path(path)
+            self.assertTrue(os.path.exists(entry))
+
+            # A hit returns the stored fields without parsing the file again.
+            fields = cache.load(path)
+            fields["INPUTS"] = ["from_cache"]
+            cache.store(path, fields)
+            self.assertEqual(parse().INPUTS, ["from_cache"])
+
+            # Changed contents miss, and replace the old entry.
+            with open(path, "a") as f:
+                f.write("// edited\n")
+            edited = parse()
+            self.assertEqual(edited.INPUTS, first.INPUTS)
+            self.assertEqual(os.listdir(cache_dir), [os.path.basename(cache.entry_path(path))])
+
+            # Corrupt, foreign and old-version entries are dropped and re-parsed.
+            entry = cache.entry_path(path)
+            bad_entries = (
+                b"\x80\x05garbage",
+                b"",
+                b"cno_such_module\nThing\n.",
+                pickle.dumps({"version": CACHE_VERSION - 1, "fields": {}}),
+                pickle.dumps(["not", "a", "dict"]),
+            )
+            for data in bad_entries:
+                with open(entry, "wb") as f:
+                    f.write(data)
+                self.assertIsNone(cache.load(path))
+                self.assertFalse(os.path.exists(entry))
+                with open(entry, "wb") as f:
+                    f.write(data)
+                self.assertEqual(parse().gates_map, first.gates_map)
+                self.assertIsNotNone(cache.load(path))
+
+        def test_netlist_levelize(self):
+            """Flip-flops come first and every gate follows its drivers."""
+            print("\n[TEST]: Testing netlist levelization...")
+            gates_map = {
+                0: {"gate_type": "OR", "inputs": ["n", "q"], "outputs": ["y"]},
+                1: {"gate_type": "AND", "inputs": ["q", "a"], "outputs": ["n"]},
+                2: {"gate_type": "DFF", "inputs": ["clk", "y"], "outputs": ["q"]},
+            }
+            wires_map = {
+                "a": {"1": "input"},
+                "clk": {"2": "input"},
+                "q": {"0": "input", "1": "input", "2": "output"},
+                "n": {"0": "input", "1": "output"},
+                "y": {"2": "input", "0": "output"},
+            }
+            net = Netlist.from_maps(gates_map, wires_map, ["a", "clk"], ["y"])
+            order = [net.gate_nos[g] for g in net.order]
+            self.assertEqual(order, [2, 1, 0])
+            self.assertEqual([net.level[net.gate_index[g]] for g in (0, 1, 2)], [1, 0, 0])
+
+        def test_level_graph_loop(self):
+            """A combinational loop should be reported, not levelized."""
+            print("\n[TEST]: Testing combinational loop detection...")
+            gates_map = {
+                0: {"gate_type": "NAND", "inputs": ["a", "y"], "outputs": ["n"]},
+                1: {"gate_type": "NOT", "inputs": ["n"], "outputs": ["y"]},
+            }
+            wires_map = {
+                "a": {"0": "input"},
+                "n": {"0": "output", "1": "input"},
+                "y": {"1": "output", "0": "input"},
+            }
+            with self.assertRaisesRegex(ValueError, r"loop detected through gates \[0, 1\]"):
+                Parser.level_graph(["a"], ["y"], gates_map, wires_map)
+
+            # Through a flip-flop the same feedback is sequential, not a loop.
+            gates_map[1] = {"gate_type": "DFF", "inputs": ["clk", "n"], "outputs": ["y"]}
+            wires_map["clk"] = {"1": "input"}
+            levels = Parser.level_graph(["a", "clk"], ["y"], gates_map, wires_map)
+            self.assertEqual(levels, {0: [1, 0]})
+
         def test_backtrace(self):
             """Test the backtrace function."""
             print("\n[TEST]: Testing backtrace function...")
@@ -109,6 +330,66 @@ def run_tests(parser):
 
             self.assertEqual(1, 1, "[TEST]: Imply with fault should return 1")
 
+        def test_implication_engine(self):
+            """Incremental implication and undo should match a full evaluation."""
+            print("\n[TEST]: Testing the implication engine...")
+            path = os.path.join(tempfile.mkdtemp(), "random.v")
+            generated = Parser(random_dag(60, inputs=8, seed=5).save(path))
+            generated.read_parse_file()
+            netlist = generated.netlist
+            names = netlist.wire_names
+
+            def evaluate_all(fault, assigned):
+                def inject(name, value, gate_no=None):
+                    if name != fault.gate_no or fault.branch != gate_no:
+                        return value
+                    code = logic.combine(logic.encode(value), fault.stuck_at)
+                    return logic.VALUES[code]
+
+                values = {
+                    names[w]: inject(names[w], assigned.get(names[w], "x"))
+                    for w in netlist.pis
+                }
+                for g in netlist.order:
+                    gate_no = netlist.gate_nos[g]
+                    inputs = [
+                        inject(names[w], values[names[w]], gate_no)
+                        for w in netlist.fanin_of(g)
+                    ]
+                    out = names[netlist.gate_output[g]]
+                    values[out] = inject(
+                        out, logic.evaluate(netlist.gate_type[g], inputs)
+                    )
+                return values
+
+            rng = random.Random(5)
+            engine = ImplicationEngine(netlist)
+            for fault in rng.sample(fault_universe(netlist), 20):
+                engine.reset(fault)
+                assigned = {}
+                history = []
+                for pi in rng.sample(generated.INPUTS, len(generated.INPUTS)):
+                    history.append((engine.mark(), dict(assigned)))
+                    assigned[pi] = rng.randint(0, 1)
+                    engine.assign(pi, assigned[pi])
+                    self.assertEqual(engine.values_dict(), evaluate_all(fault, assigned))
+                    self.assertEqual(
+                        engine.errors,
+                        {w for w, code in enumerate(engine.values) if code >= logic.D},
+                    )
+                    if rng.random() < 0.3:
+                        back = rng.randrange(len(history))
+                        mark, assigned = history[back]
+                        del history[back:]
+                        engine.undo(mark)
+                        self.assertEqual(
+                            engine.values_dict(), evaluate_all(fault, assigned)
+                        )
+                        self.assertEqual(
+                            engine.errors,
+                            {w for w, code in enumerate(engine.values) if code >= logic.D},
+                        )
+
         def test_sensitization(self):
             """Test the sensitization function."""
             fault = Fault("_01_", "D")
@@ -121,13 +402,527 @@ def run_tests(parser):
 
             self.assertTrue(test_vector, "[TEST]: Test vector should not be empty")
 
+        def test_trace_file(self):
+            """configure_logging should write one JSON object per record."""
+            print("\n[TEST]: Testing the JSON-lines trace...")
+            root = logging.getLogger("atpg")
+            saved = [
+                h for h in root.handlers if not isinstance(h, logging.NullHandler)
+            ]
+            saved_level = root.level
+            for handler in saved:
+                root.removeHandler(handler)
+
+            path = os.path.join(tempfile.mkdtemp(), "trace.jsonl")
+            try:
+                configure_logging(None, path)
+                atpg.sensitize_fault("_03_", "D")
+                configure_logging(None)
+            finally:
+                for handler in saved:
+                    root.addHandler(handler)
+                root.setLevel(saved_level)
+
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+            self.assertTrue(records)
+            for record in records:
+                self.assertLessEqual(
+                    {"time", "level", "logger", "message"}, set(record)
+                )
+                self.assertTrue(record["logger"].startswith("atpg."))
+            searches = [
+                r for r in records if r["message"].startswith("ATPG.try_sensitize")
+            ]
+            self.assertTrue(searches)
+            self.assertEqual(searches[0]["level"], "DEBUG")
+            self.assertEqual(searches[0]["location"], "_03_")
+            self.assertIsInstance(searches[0]["pi_values"], dict)
+
+        def test_vcd_writer(self):
+            """The VCD body should only hold the signals that changed."""
+            print("\n[TEST]: Testing VCD output...")
+            stream = io.StringIO()
+            vcd = VcdWriter(stream, ["a", "b", "y"], timescale="10ps", module="adder")
+            vcd.sample(0, {"a": 0, "b": 0, "y": 0})
+            vcd.sample(1, {"a": 1, "b": 0, "y": "D"})
+            vcd.sample(2, {"a": 1, "b": 0, "y": "D"})
+            vcd.sample(3, {"a": 1, "b": 1})
+            vcd.close(4)
+
+            header, body = stream.getvalue().split("$enddefinitions $end\n")
+            self.assertIn("$timescale 10ps $end\n", header)
+            self.assertIn("$scope module adder $end\n", header)
+            for code, name in (("!", "a"), ('"', "b"), ("#", "y")):
+                self.assertIn(f"$var wire 1 {code} {name} $end\n", header)
+            # Nothing changed at time 2, so it gets no timestamp at all; a
+            # missing wire is dumped as x.
+            self.assertEqual(
+                body,
+                '#0\n$dumpvars\n0!\n0"\n0#\n$end\n#1\n1!\n1#\n#3\n1"\nx#\n#4\n',
+            )
+            self.assertEqual(vcd.changes, 7)
+
+        def test_reachability(self):
+            """PI support and PO reach should match a walk of every cone."""
+            print("\n[TEST]: Testing the reachability index...")
+            path = os.path.join(tempfile.mkdtemp(), "random.v")
+            generated = Parser(random_dag(200, inputs=12, seed=4).save(path))
+            generated.read_parse_file()
+            path = os.path.join(tempfile.mkdtemp(), "counter.v")
+            sequential = Parser(counter(4).save(path))
+            sequential.read_parse_file()
+
+            def walk(net, start, step):
+                seen = {start}
+                stack = [start]
+                while stack:
+                    for w in step(net, stack.pop()):
+                        if w not in seen:
+                            seen.add(w)
+                            stack.append(w)
+                return seen
+
+            def fanin(net, w):
+                g = net.driver[w]
+                if g < 0 or net.gate_type[g] >= GateType.DFF:
+                    return []
+                return net.fanin_of(g)
+
+            def fanout(net, w):
+                return [
+                    net.gate_output[g]
+                    for g in net.fanout_of(w)
+                    if net.gate_type[g] < GateType.DFF and net.gate_output[g] >= 0
+                ]
+
+            for net in (parser.netlist, generated.netlist, sequential.netlist):
+                reach = ReachabilityIndex(net)
+                for w in range(net.num_wires):
+                    cone = walk(net, w, fanin)
+                    support = sum(1 << i for i, pi in enumerate(net.pis) if pi in cone)
+                    self.assertEqual(reach.pi_support[w], support, net.wire_names[w])
+                    cone = walk(net, w, fanout)
+                    pos = sum(1 << j for j, po in enumerate(net.pos) if po in cone)
+                    self.assertEqual(reach.po_reach[w], pos, net.wire_names[w])
+
+        def test_scoap(self):
+            """SCOAP measures of the full adder, computed by hand."""
+            print("\n[TEST]: Testing SCOAP measures...")
+            if set(primary_inputs) != {"a", "b", "carryin"}:
+                self.skipTest("hand-computed for test/adder_and_or.v")
+            net = parser.netlist
+            scoap = compute_scoap(net)
+            # wire: (CC0, CC1, CO)
+            expected = {
+                "a": (1, 1, 6),
+                "b": (1, 1, 5),
+                "carryin": (1, 1, 5),
+                "_02_": (3, 2, 5),
+                "_03_": (3, 2, 3),
+                "_04_": (5, 4, 5),
+                "_05_": (6, 2, 3),
+                "_00_": (7, 2, 3),
+                "_01_": (4, 2, 3),
+                "y": (5, 7, 0),
+                "carryout": (5, 4, 0),
+            }
+            for wire, measures in expected.items():
+                w = net.wire_id(wire)
+                self.assertEqual(
+                    (scoap.cc0[w], scoap.cc1[w], scoap.co[w]), measures, wire
+                )
+            # Stem a feeds _05_ (CO 3 + CC1(_04_) + 1 = 8), _00_ (3 + CC0(_04_)
+            # + 1 = 9) and _01_ (3 + CC1(_02_) + 1 = 6): the stem takes the min.
+            self.assertEqual(scoap.co[net.wire_id("a")], min(8, 9, 6))
+
+        def test_bit_parallel_simulation(self):
+            """Bit-parallel simulation should match the scalar evaluator."""
+            print("\n[TEST]: Testing bit-parallel simulation...")
+            n = len(primary_inputs)
+            vectors = [
+                {pi: (k >> i) & 1 for i, pi in enumerate(primary_inputs)}
+                for k in range(2**n)
+            ]
+            results = BitParallelSimulator(parser.netlist).simulate(vectors)
+
+            for k, vector in enumerate(vectors):
+                expected = Parser.evaluate_graph(
+                    primary_inputs,
+                    gate_level_map,
+                    gates_map,
+                    dict(vector),
+                    copy.deepcopy(state_vars),
+                )
+                for po in primary_outputs:
+                    self.assertEqual(
+                        (results[po] >> k) & 1,
+                        int(expected[po]),
+                        f"{TST} Mismatch on {po} for vector {vector}",
+                    )
+
+        def test_compiled_floating_net(self):
+            """Compiled code should read an undriven wire as 0, like the interpreter."""
+            print("\n[TEST]: Testing compiled simulation of a floating net...")
+            floating = floating_net_parser()
+            vectors = [{"a": a, "b": b} for a in (0, 1) for b in (0, 1)]
+            compiled = BitParallelSimulator(floating.netlist).simulate(vectors)
+            interpreted = BitParallelSimulator(
+                floating.netlist, compiled=False
+            ).simulate(vectors)
+            self.assertEqual(compiled, interpreted)
+            self.assertEqual(compiled, {"y": 0b1111, "z": 0b1010})
+
+        @unittest.skipIf(numpy is None, "NumPy is not installed")
+        def test_numpy_simulation(self):
+            """The NumPy backend should agree with BitParallelSimulator."""
+            print("\n[TEST]: Testing NumPy simulation...")
+            rng = random.Random(3)
+            path = os.path.join(tempfile.mkdtemp(), "random.v")
+            generated = Parser(random_dag(300, inputs=12, seed=3).save(path))
+            generated.read_parse_file()
+            floating = floating_net_parser()
+            for netlist, pis in (
+                (parser.netlist, primary_inputs),
+                (generated.netlist, generated.INPUTS),
+                (floating.netlist, floating.INPUTS),
+            ):
+                # 200 patterns span several words, the last one partly used.
+                vectors = [{pi: rng.randint(0, 1) for pi in pis} for _ in range(200)]
+                self.assertEqual(
+                    NumpySimulator(netlist).simulate(vectors),
+                    BitParallelSimulator(netlist).simulate(vectors),
+                )
+
+        def test_fault_simulation(self):
+            """Exhaustive patterns should detect every stuck-at fault."""
+            print("\n[TEST]: Testing PPSFP fault simulation...")
+            n = len(primary_inputs)
+            vectors = [[(k >> i) & 1 for i in range(n)] for k in range(2**n)]
+            result = PPSFPSimulator(parser.netlist).run(
+                vectors, fault_universe(parser.netlist)
+            )
+            self.assertEqual(
+                result.coverage, 1.0, f"{TST} Exhaustive patterns should reach 100%"
+            )
+            self.assertIn(Fault("_03_", "D"), result.detected)
+
+        def test_fault_collapsing(self):
+            """Collapsing should shrink the fault list without losing coverage."""
+            print("\n[TEST]: Testing fault list collapsing...")
+            # _23_ = AND(BUF(_16_), _16_) has redundant input s-a-1 faults, and
+            # its output s-a-1 is equivalent to i1 s-a-1 and _29_ s-a-0.
+            path = os.path.join(tempfile.mkdtemp(), "random.v")
+            generated = Parser(random_dag(40, inputs=7, seed=16).save(path))
+            generated.read_parse_file()
+            for netlist in (parser.netlist, generated.netlist):
+                universe = fault_universe(netlist)
+                n = len(netlist.pis)
+                vectors = [[(k >> i) & 1 for i in range(n)] for k in range(2**n)]
+                detects = PPSFPSimulator(netlist).detection_masks(vectors, universe)
+                for options in (
+                    {},
+                    {"dominance": False},
+                    {"checkpoint": True},
+                ):
+                    collapsed = generate_faults(netlist, **options)
+                    self.assertLess(len(collapsed), len(universe))
+                    self.assertTrue(set(collapsed) <= set(universe))
+                    # Any test set detecting the kept faults detects every
+                    # testable fault of the universe.
+                    for fault in universe:
+                        if not detects[fault]:
+                            continue
+                        self.assertTrue(
+                            any(
+                                detects[kept] and not detects[kept] & ~detects[fault]
+                                for kept in collapsed
+                            ),
+                            f"{TST} {fault} lost by generate_faults({options})",
+                        )
+            self.assertIn(Fault("i1", "~D"), generate_faults(generated.netlist, checkpoint=True))
+
+        def test_parallel_atpg(self):
+            """Worker processes should give the same complete test set."""
+            print("\n[TEST]: Testing parallel ATPG...")
+            serial = ParallelATPG(parser.netlist, state_vars, max_workers=0).run()
+            parallel = ParallelATPG(
+                parser.netlist, state_vars, max_workers=2, batch_size=2
+            ).run()
+            self.assertEqual(serial.tests, parallel.tests)
+            self.assertEqual(serial.detected, parallel.detected)
+
+            graded = PPSFPSimulator(parser.netlist).run(serial.tests, serial.faults)
+            self.assertEqual(set(graded.detected), set(serial.detected))
+            self.assertEqual(serial.coverage, 1.0)
+
+        def test_search_metrics(self):
+            """Search statistics should account for every generate_test call."""
+            print("\n[TEST]: Testing ATPG search metrics...")
+            search = ATPG.from_netlist(parser.netlist, state_vars)
+            metrics = search.enable_metrics()
+            faults = generate_faults(parser.netlist)
+            found = [search.generate_test(f) is not None for f in faults]
+
+            totals = metrics.totals()
+            self.assertEqual(totals["searches"], len(faults))
+            self.assertEqual(totals["status"].get("test", 0), sum(found))
+            self.assertGreater(totals["decisions"], 0)
+            self.assertGreater(totals["evaluations"], 0)
+            self.assertGreaterEqual(totals["decisions"], totals["backtracks"])
+            self.assertEqual([r.fault for r in metrics.records], faults)
+
+            result = ParallelATPG(
+                parser.netlist, state_vars, max_workers=2, collect_metrics=True
+            ).run()
+            self.assertEqual(len(result.metrics), len(result.faults))
+            stream = io.StringIO()
+            result.metrics.write_csv(stream)
+            stream.seek(0)
+            rows = list(csv.DictReader(stream))
+            self.assertEqual(len(rows), len(result.faults))
+            self.assertIsNone(
+                ParallelATPG(parser.netlist, state_vars, max_workers=0).run().metrics
+            )
+
+        def test_compaction(self):
+            """Compaction should shrink the test set and keep its coverage."""
+            print("\n[TEST]: Testing test set compaction...")
+            plain = ParallelATPG(parser.netlist, state_vars, max_workers=0).run()
+            compacted = ParallelATPG(
+                parser.netlist,
+                state_vars,
+                max_workers=0,
+                secondary_faults=8,
+                static_compaction=True,
+            ).run()
+            self.assertLessEqual(len(compacted.tests), len(plain.tests))
+            graded = PPSFPSimulator(parser.netlist).run(
+                compacted.tests, compacted.faults
+            )
+            self.assertEqual(graded.coverage, plain.coverage)
+
+        def test_random_pattern_flow(self):
+            """The random phase should be reproducible and drop most faults."""
+            print("\n[TEST]: Testing random-pattern ATPG flow...")
+            first = ATPGFlow(parser.netlist, state_vars, seed=7, max_workers=0).run()
+            second = ATPGFlow(parser.netlist, state_vars, seed=7, max_workers=0).run()
+            self.assertEqual(first.tests, second.tests)
+            self.assertEqual(first.coverage, 1.0)
+            self.assertGreater(first.phases["random"]["detected"], 0)
+            self.assertEqual(
+                first.phases["random"]["detected"]
+                + first.phases["deterministic"]["detected"],
+                len(first.detected),
+            )
+
+        def test_flow_compaction_fill(self):
+            """Static compaction should fill merged cubes with the ATPG fill value."""
+            print("\n[TEST]: Testing the fill of compacted flow tests...")
+            path = os.path.join(tempfile.mkdtemp(), "random.v")
+            generated = Parser(random_dag(200, inputs=16, seed=1).save(path))
+            generated.read_parse_file()
+            result = ATPGFlow(
+                generated.netlist,
+                seed=3,
+                batch_size=16,
+                max_random_patterns=64,
+                static_compaction=True,
+                fill=1,
+                max_workers=0,
+            ).run()
+            self.assertTrue(any("x" in cube.values() for cube in result.cubes))
+            for cube, test in zip(result.cubes, result.tests):
+                self.assertEqual(test, fill_cube(cube, 1))
+
+        def test_five_valued_tables(self):
+            """Each table entry should match the good and faulty machines."""
+            print("\n[TEST]: Testing five-valued gate tables...")
+            machines = {0: (0, 0), 1: (1, 1), "D": (1, 0), "~D": (0, 1)}
+            for gate_type in GateType:
+                if gate_type >= GateType.DFF:
+                    continue
+                arities = (1,) if gate_type <= GateType.NOT else (2, 3)
+                for arity in arities:
+                    for values in itertools.product(machines, repeat=arity):
+                        good = evaluate_word(
+                            gate_type, [machines[v][0] for v in values], 1
+                        )
+                        faulty = evaluate_word(
+                            gate_type, [machines[v][1] for v in values], 1
+                        )
+                        expected = {v: k for k, v in machines.items()}[(good, faulty)]
+                        self.assertEqual(
+                            logic.evaluate(gate_type, values),
+                            expected,
+                            f"{TST} {gate_type.name}{values}",
+                        )
+                    # An unknown input can never produce a known output that
+                    # differs between its 0 and 1 completions.
+                    for values in itertools.product(VALUES_WITH_X, repeat=arity):
+                        out = logic.evaluate(gate_type, values)
+                        if out == "x":
+                            continue
+                        for filled in itertools.product(
+                            *[(0, 1) if v == "x" else (v,) for v in values]
+                        ):
+                            self.assertEqual(logic.evaluate(gate_type, filled), out)
+
+        def test_batch_simulation(self):
+            """Batch simulation should stream one row per stimulus vector."""
+            print("\n[TEST]: Testing batch simulation...")
+            n = len(primary_inputs)
+            lines = [" ".join(reversed(primary_inputs))]
+            lines += [format(k, f"0{n}b") for k in range(2**n)]
+            with tempfile.TemporaryDirectory() as tmp:
+                vector_path = os.path.join(tmp, "vectors.txt")
+                output_path = os.path.join(tmp, "out.csv")
+                with open(vector_path, "w") as f:
+                    f.write("\n".join(lines) + "\n")
+
+                vectors = [v for _, v in read_vectors(vector_path, primary_inputs)]
+                count = parser.simulate_batch(vector_path, output_path)
+                with open(output_path) as f:
+                    rows = list(csv.DictReader(f))
+
+            self.assertEqual(count, 2**n)
+            self.assertEqual(len(rows), 2**n)
+            for vector, row in zip(vectors, rows):
+                expected = Parser.evaluate_graph(
+                    primary_inputs,
+                    gate_level_map,
+                    gates_map,
+                    dict(vector),
+                    copy.deepcopy(state_vars),
+                )
+                for po in primary_outputs:
+                    self.assertEqual(row[po], str(expected[po]))
+
+        def test_full_scan(self):
+            """Scan patterns should detect the scan view faults and match the circuit."""
+            print("\n[TEST]: Testing full-scan ATPG...")
+            counter = Parser("./test/dffsr.v")
+            counter.read_parse_file()
+            scan = FullScanATPG(counter.netlist, max_workers=0)
+            self.assertEqual(scan.clocks, ["C"])
+            self.assertFalse(scan.view.is_sequential())
+
+            faults = scan.faults()
+            result = scan.run(faults)
+            self.assertEqual(len(result.detected), len(faults))
+            patterns = scan.scan_patterns(result.tests)
+            self.assertEqual(len(patterns), len(result.tests))
+            self.assertEqual(scan.verify(patterns), [])
+
+            # A wrong expected unload value must be caught.
+            patterns[0].unload = "".join(
+                "1" if v == "0" else "0" for v in patterns[0].unload
+            )
+            self.assertEqual(scan.verify(patterns), [0])
+
+        def test_time_frame_atpg(self):
+            """Test sequences should detect their fault in the sequential circuit."""
+            print("\n[TEST]: Testing time-frame expansion ATPG...")
+            counter = Parser("./test/dffsr.v")
+            counter.read_parse_file()
+            tf = TimeFrameATPG(counter.netlist, counter.state_vars, max_frames=4)
+            for fault in generate_faults(counter.netlist):
+                cubes = tf.generate_test(fault)
+                self.assertIsNotNone(cubes, f"{TST} No test for {fault}")
+                self.assertLessEqual(len(tf.frames), 4)
+
+                # One cycle with the clock high, then low, per frame.
+                vectors = []
+                for vector in tf.fill_sequence(cubes):
+                    vectors += [dict(vector, C=1), dict(vector, C=0)]
+                simulator = ConcurrentFaultSimulator(
+                    counter.netlist, [fault], copy.deepcopy(counter.state_vars)
+                )
+                self.assertIn(fault, simulator.run(vectors).detected)
+
         def test_seq_atpg_unroll(self):
             """Test the sequential ATPG function."""
             print("\n[TEST]: Testing sequential ATPG function...")
             seqATPG.unroll_circuit()
-            self.assertTrue(
-                seqATPG.state_vars, "[TEST]: Test vectors should not be empty"
+            flops = [
+                g for g, gate in gates_map.items() if gate["gate_type"] in ("DFF", "DFFSR")
+            ]
+            self.assertEqual(
+                sorted(seqATPG.state_vars), sorted(flops),
+                "[TEST]: State should be kept for the flip-flops only",
+            )
+
+        def test_sequential_simulation(self):
+            """Cycle-based simulation should match Parser.evaluate_graph."""
+            print("\n[TEST]: Testing sequential simulation...")
+            counter = Parser("./test/dffsr.v")
+            counter.read_parse_file()
+            simulator = SequentialSimulator(counter.netlist, state_vars=counter.state_vars)
+            rng = random.Random(0)
+            streams = [
+                [{pi: rng.randint(0, 1) for pi in counter.INPUTS} for _ in range(40)]
+                for _ in range(8)
+            ]
+            results = simulator.run_streams(streams)
+
+            for stream, outputs in zip(streams, results):
+                state = copy.deepcopy(counter.state_vars)
+                for vector, output in zip(stream, outputs):
+                    expected = Parser.evaluate_graph(
+                        counter.INPUTS,
+                        counter.gate_level_map,
+                        counter.gates_map,
+                        dict(vector),
+                        state,
+                    )
+                    for po in counter.OUTPUTS:
+                        self.assertEqual(output[po], int(expected[po]))
+
+            # With C pulsed every cycle the 2-bit counter counts enabled cycles.
+            counting = SequentialSimulator(counter.netlist, clocks=["C"])
+            outputs = counting.run([{"EN": 1, "S": 0, "R": 0}] * 6)
+            self.assertEqual([2 * o["Q1"] + o["Q0"] for o in outputs], [0, 1, 2, 3, 0, 1])
+            counting.step_words([0, 0, 1], 1)
+            self.assertEqual(counting.state_vars(), {3: {"C": 0, "D": 0}, 4: {"C": 0, "D": 0}})
+
+        def test_benchmark_generators(self):
+            """Generated benchmark netlists should parse and compute their function."""
+            print("\n[TEST]: Testing benchmark netlist generators...")
+
+            def load(builder):
+                path = os.path.join(tempfile.mkdtemp(), f"{builder.module}.v")
+                generated = Parser(builder.save(path))
+                generated.read_parse_file()
+                return generated
+
+            def number(values, prefix, bits):
+                return sum(values[f"{prefix}{i}"] << i for i in range(bits))
+
+            adder = load(ripple_carry_adder(3))
+            multiplier = load(array_multiplier(3))
+            pairs = list(itertools.product(range(8), repeat=2))
+            vectors = [
+                {**{f"a{i}": x >> i & 1 for i in range(3)}, **{f"b{i}": y >> i & 1 for i in range(3)}}
+                for x, y in pairs
+            ]
+            sums = BitParallelSimulator(adder.netlist).simulate(
+                [{**v, "cin": 1} for v in vectors]
             )
+            products = BitParallelSimulator(multiplier.netlist).simulate(vectors)
+            for k, (x, y) in enumerate(pairs):
+                total = {po: word >> k & 1 for po, word in sums.items()}
+                product = {po: word >> k & 1 for po, word in products.items()}
+                self.assertEqual(number(total, "s", 3) + (total["cout"] << 3), x + y + 1)
+                self.assertEqual(number(product, "p", 6), x * y)
+
+            count = load(counter(4))
+            outputs = SequentialSimulator(count.netlist, clocks=["C"]).run(
+                [{"EN": 1, "S": 0, "R": 0}] * 20
+            )
+            self.assertEqual([number(o, "q", 4) for o in outputs], [k % 16 for k in range(20)])
+
+            dag = load(random_dag(200, seed=1))
+            self.assertEqual(dag.netlist.num_gates, 200 + len(dag.OUTPUTS))
 
     unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromTestCase(TestATPG))
 
@@ -0,0 +1,59 @@
+/* Generated by Yosys 0.44 (git sha1 80ba43d26, clang++ 15.0.0 -fPIC -O3) */
+
+(* hdlname = "Counter2" *)
+(* top =  1  *)
+(* src = "counter.v:2.1-18.10" *)
+module Counter2(C, EN, S, R, Q0, Q1);
+  (* src = "counter.v:3.16-3.17" *)
+  input C;
+  wire C;
+  (* src = "counter.v:4.16-4.18" *)
+  input EN;
+  wire EN;
+  (* src = "counter.v:5.16-5.17" *)
+  input S;
+  wire S;
+  (* src = "counter.v:6.16-6.17" *)
+  input R;
+  wire R;
+  (* src = "counter.v:7.17-7.19" *)
+  output Q0;
+  wire Q0;
+  (* src = "counter.v:8.17-8.19" *)
+  output Q1;
+  wire Q1;
+  wire _0_;
+  wire _1_;
+  wire _2_;
+  XOR _3_ (
+    .A(Q0),
+    .B(EN),
+    .Y(_0_)
+  );
+  AND _4_ (
+    .A(Q0),
+    .B(EN),
+    .Y(_1_)
+  );
+  XOR _5_ (
+    .A(Q1),
+    .B(_1_),
+    .Y(_2_)
+  );
+  (* src = "counter.v:12.5-16.8" *)
+  DFFSR _6_ (
+    .C(C),
+    .D(_0_),
+    .Q(Q0),
+    .R(R),
+    .S(S)
+  );
+  (* src = "counter.v:12.5-16.8" *)
+  DFFSR _7_ (
+    .C(C),
+    .D(_2_),
+    .Q(Q1),
+    .R(R),
+    .S(S)
+  );
+endmodule